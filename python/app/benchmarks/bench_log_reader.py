@@ -0,0 +1,160 @@
+"""
+로그 메시지 분리 벤치마크
+
+줄 단위로 읽으며 줄마다 정규식을 검사하던 기존 두 분리기
+(find_log_messages_by_file, process_log_file)와 공통 읽기 엔진(LogReader)을 비교합니다.
+
+실행:
+    python -m app.benchmarks.bench_log_reader [로그 파일 경로]
+"""
+import os
+import re
+import sys
+import tempfile
+import time
+
+from app.utils.log_parser_utils import iter_log_messages_by_file, start_pattern
+from app.utils.log_reader import LogReader, component_level_start_pattern
+from app.utils.regex_string_type_detector import iter_log_entries
+
+
+def build_short_log(path, count=200000):
+    """대부분 한 줄짜리 메시지인 로그"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            f.write(f'2025-07-01 10:00:{i % 60:02d}.{i % 1000:03d} [worker-{i % 8}] INFO message {i}\n')
+            if i % 5 == 0:
+                f.write(f'    at com.example.Service.call(Service.java:{i % 300})\n')
+                f.write('    <req><id>1</id></req>\n')
+
+
+def build_multiline_log(path, count=100000):
+    """스택 트레이스 / SQL / XML 이 섞인 여러 줄 메시지 로그"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            f.write(f'2025-07-01 10:00:{i % 60:02d}.{i % 1000:03d} [worker-{i % 8}] INFO '
+                    f'com.example.service.OrderService - processing request id={i}\n')
+            kind = i % 10
+            if kind < 3:
+                for depth in range(12):
+                    f.write(f'\tat com.example.layer{depth}.Handler.invoke(Handler.java:{100 + depth})\n')
+            elif kind < 5:
+                f.write('SELECT o.id, o.status FROM orders o\n WHERE o.id = 1 AND o.status = \'OPEN\'\n ORDER BY o.id;\n')
+            elif kind < 6:
+                f.write('<request><header><id>1</id></header>\n<body>\n  <item qty="1">A</item>\n</body></request>\n')
+
+
+def legacy_find_log_messages_by_file(log_file_path):
+    """비교용으로 남겨 둔 기존 구현 (줄마다 start_pattern 검사)"""
+    messages = []
+    current_message = []
+    start_pos = 0
+    line_num = 0
+    with open(log_file_path, 'r') as file:
+        for line_num, line in enumerate(file, 1):
+            if start_pattern.match(line):
+                if current_message:
+                    messages.append({'start_line': start_pos, 'end_line': line_num - 1,
+                                     'content': ''.join(current_message)})
+                    current_message = []
+                start_pos = line_num
+            current_message.append(line)
+    if current_message:
+        messages.append({'start_line': start_pos, 'end_line': line_num, 'content': ''.join(current_message)})
+    return messages
+
+
+def legacy_process_log_file(log_file_path):
+    """비교용으로 남겨 둔 기존 process_log_file 의 분리 부분 (줄마다 re.match 호출)"""
+    log_entries = []
+    with open(log_file_path, 'r', encoding='utf-8') as f:
+        current_entry = None
+        content_buffer = []
+        for line in f:
+            entry_start = re.match(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}.\d{3}) \[([^\]]+)\]', line)
+            if entry_start:
+                if current_entry is not None and content_buffer:
+                    current_entry['content'] = ''.join(content_buffer)
+                    log_entries.append(current_entry)
+                    content_buffer = []
+                current_entry = {'timestamp': entry_start.group(1), 'component': entry_start.group(2),
+                                 'content': '', 'content_type': 'UNKNOWN'}
+                content_part = line[entry_start.end():].strip()
+                if content_part:
+                    content_buffer.append(content_part + '\n')
+            elif current_entry is not None:
+                content_buffer.append(line)
+        if current_entry is not None and content_buffer:
+            current_entry['content'] = ''.join(content_buffer)
+            log_entries.append(current_entry)
+    return log_entries
+
+
+def new_process_log_file(log_file_path):
+    """process_log_file 의 분리 부분 (공통 읽기 엔진의 iter_entries)"""
+    return list(LogReader(component_level_start_pattern, 'utf-8', 'replace').iter_entries(log_file_path))
+
+
+def entry_fields(entries):
+    """기존 process_log_file 항목과 비교할 수 있도록 같은 키만 남김 (level / 줄 번호 / content_type 제외)"""
+    return [{key: entry[key] for key in ('timestamp', 'component', 'content')} for entry in entries]
+
+
+def stream_reader(log_file_path):
+    """헤더 정보(timestamp / component / level)를 포함한 레코드를 파일 객체로 읽음 (표준 입력 / 파이프와 같은 방식)"""
+    with open(log_file_path, 'rb') as f:
+        return list(LogReader(component_level_start_pattern, 'utf-8', 'replace').iter_records(f))
+
+
+def run_file(log_file_path, repeat=5):
+    """
+    각 방식을 repeat 번 실행해서 가장 빠른 시간을 출력합니다.
+    실행 순서에 따른 잡음(다른 프로세스, CPU 클럭 변화)이 한 방식에 몰리지 않도록 방식들을 번갈아 실행합니다.
+    """
+    size_mb = os.path.getsize(log_file_path) / (1024 * 1024)
+    print(f"파일: {log_file_path} ({size_mb:.1f} MB)")
+    print(f"{'method':<34}{'messages':>10}{'total(s)':>10}{'MB/s':>10}")
+
+    # (이름, 함수, 결과를 비교할 앞 항목 번호, 비교 전에 두 결과에 적용할 함수)
+    cases = (
+        ('find_log_messages_by_file (legacy)', legacy_find_log_messages_by_file, None, None),
+        ('iter_log_messages_by_file (reader)', lambda path: list(iter_log_messages_by_file(path)), 0, None),
+        ('process_log_file split (legacy)', legacy_process_log_file, None, None),
+        ('process_log_file split (reader)', new_process_log_file, 2, entry_fields),
+        ('iter_log_entries (reader)', lambda path: list(iter_log_entries(path)), 2, entry_fields),
+        ('LogReader records (level)', stream_reader, None, None),
+    )
+    best = [None] * len(cases)
+    results = [None] * len(cases)
+    for _ in range(repeat):
+        for index, (_, func, _, _) in enumerate(cases):
+            started = time.perf_counter()
+            results[index] = func(log_file_path)
+            elapsed = time.perf_counter() - started
+            best[index] = elapsed if best[index] is None else min(best[index], elapsed)
+
+    for (name, _, expected_index, project), result, elapsed in zip(cases, results, best):
+        if expected_index is not None:
+            expected = results[expected_index]
+            if project is not None:
+                assert project(result) == project(expected)
+            else:
+                assert result == expected
+        print(f"{name:<34}{len(result):>10}{elapsed:>10.3f}{size_mb / elapsed:>10.1f}")
+
+
+def run(log_file_path=None):
+    if log_file_path is not None:
+        run_file(log_file_path)
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, build in (('short.log', build_short_log), ('multiline.log', build_multiline_log)):
+            path = os.path.join(temp_dir, name)
+            build(path)
+            run_file(path)
+            print()
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,91 @@
+"""
+detect_xml_without_declaration 벤치마크
+
+기존 구현(findall 세 번 + 태그 이름별 목록 재생성 + DOTALL 역참조 패턴)과
+단일 패스 스택 구현을 병적인 입력에서 비교합니다.
+
+실행:
+    python -m app.benchmarks.bench_xml_detection
+"""
+import re
+import time
+
+from app.utils.regex_string_type_detector import detect_xml_without_declaration
+
+
+def legacy_detect_xml_without_declaration(text):
+    """비교용으로 남겨 둔 기존 구현"""
+    normalized_text = text.strip()
+
+    tag_pattern = r'<([a-zA-Z][a-zA-Z0-9_:-]*)[^>]*>.*?</\1>'
+    self_closing_pattern = r'<([a-zA-Z][a-zA-Z0-9_:-]*)[^>]*/>'
+
+    has_tags = re.search(tag_pattern, normalized_text, re.DOTALL) is not None
+    has_self_closing = re.search(self_closing_pattern, normalized_text) is not None
+
+    opening_tags = re.findall(r'<([a-zA-Z][a-zA-Z0-9_:-]*)[^>/]*>', normalized_text)
+    closing_tags = re.findall(r'</([a-zA-Z][a-zA-Z0-9_:-]*)>', normalized_text)
+    self_closed = re.findall(r'<([a-zA-Z][a-zA-Z0-9_:-]*)[^>]*/>', normalized_text)
+
+    tag_names = list(set(opening_tags + closing_tags))
+
+    balanced = True
+    for tag in tag_names:
+        tag_self_closed_count = len([t for t in self_closed if t == tag])
+        tag_open_count = len([t for t in opening_tags if t == tag])
+        tag_close_count = len([t for t in closing_tags if t == tag])
+        if tag_open_count - tag_self_closed_count != tag_close_count:
+            balanced = False
+            break
+
+    return (has_tags or has_self_closing) and balanced
+
+
+def unclosed_tags(count):
+    """닫히지 않은 태그만 반복 - 기존 tag_pattern 이 태그마다 끝까지 역추적"""
+    return '<item>' * count
+
+
+def distinct_tags(count):
+    """서로 다른 태그 이름이 많은 균형 잡힌 문서 - 기존 구현은 태그 수 x 이름 수"""
+    return ''.join(f'<t{i}>v</t{i}>' for i in range(count))
+
+
+def soap_dump(count):
+    """큰 SOAP 응답 (정상 입력)"""
+    rows = ''.join(f'<row id="{i}"><name>n{i}</name><value>{i}</value></row>' for i in range(count))
+    return f'<soap:Envelope><soap:Body><response>{rows}</response></soap:Body></soap:Envelope>'
+
+
+def measure(func, text, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(text)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run():
+    cases = [
+        ('unclosed_tags', unclosed_tags, (1000, 2000, 4000)),
+        ('distinct_tags', distinct_tags, (1000, 2000, 4000)),
+        ('soap_dump', soap_dump, (10000, 50000)),
+    ]
+
+    print(f"{'case':<16}{'size':>12}{'legacy(s)':>12}{'single-pass(s)':>16}")
+    for name, build, sizes in cases:
+        for size in sizes:
+            text = build(size)
+            legacy = measure(legacy_detect_xml_without_declaration, text)
+            current = measure(detect_xml_without_declaration, text)
+            print(f"{name:<16}{len(text):>12}{legacy:>12.4f}{current:>16.4f}")
+
+    # 50MB 덤프도 max_chars 제한 덕분에 앞부분만 검사
+    text = soap_dump(800000)
+    print(f"{'soap_dump(limit)':<16}{len(text):>12}{'-':>12}{measure(detect_xml_without_declaration, text, 1):>16.4f}")
+
+
+if __name__ == "__main__":
+    run()
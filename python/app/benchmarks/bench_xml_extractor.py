@@ -0,0 +1,60 @@
+"""
+XMLLogExtractor 메시지당 오버헤드 벤치마크
+
+메시지마다 XMLLogExtractor() 를 새로 만드는 기존 방식과
+get_xml_extractor() 로 공유 추출기를 재사용하는 방식, extract_many() 일괄 처리를 비교합니다.
+
+실행:
+    python -m app.benchmarks.bench_xml_extractor
+"""
+import time
+
+from app.utils.xml_utils import XMLLogExtractor, get_xml_extractor
+
+
+def build_messages(count):
+    messages = []
+    for i in range(count):
+        if i % 3 == 0:
+            messages.append(f'2025-07-01 10:00:00.000 [main] INFO request: <req id="{i}"><name>n{i}</name></req>')
+        else:
+            messages.append(f'2025-07-01 10:00:00.000 [main] INFO plain message {i}')
+    return messages
+
+
+def per_call_extractor(messages):
+    """기존 방식: 메시지마다 추출기를 새로 만듦"""
+    results = []
+    for message in messages:
+        extractor = XMLLogExtractor()
+        results.append([extractor.to_xml_string(block) for block in extractor.find_xml_blocks(message)])
+    return results
+
+
+def shared_extractor(messages):
+    """공유 추출기 재사용"""
+    return [get_xml_extractor().extract(message) for message in messages]
+
+
+def batch_extractor(messages):
+    """extract_many 일괄 처리"""
+    return get_xml_extractor().extract_many(messages)
+
+
+def run(count=100000):
+    messages = build_messages(count)
+    expected = per_call_extractor(messages)
+
+    print(f"{'method':<22}{'total(s)':>10}{'per message(us)':>18}")
+    for name, func in (('per-call extractor', per_call_extractor),
+                       ('shared extractor', shared_extractor),
+                       ('extract_many', batch_extractor)):
+        started = time.perf_counter()
+        result = func(messages)
+        elapsed = time.perf_counter() - started
+        assert result == expected
+        print(f"{name:<22}{elapsed:>10.3f}{elapsed / count * 1e6:>18.2f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,245 @@
+"""
+벤치마크용 nohup 로그 생성기
+
+일반 로그 줄, Hibernate SQL, 여러 줄 XML / SOAP, JSON, HTML 메시지를 지정한 비율로 섞어
+원하는 크기의 로그 파일을 만듭니다. 같은 설정(seed 포함)이면 항상 같은 파일이 만들어집니다.
+
+실행:
+    python -m app.benchmarks.corpus out.log --size 100MB --mix plain=60,sql=20,xml=10,json=5,html=5
+"""
+import argparse
+import datetime
+import json
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+# 기본 메시지 종류별 비율
+DEFAULT_MIX = {'plain': 60, 'sql': 20, 'xml': 10, 'json': 5, 'html': 5}
+
+# 생성 시작 시각 (결과를 재현할 수 있도록 고정)
+BASE_TIME = datetime.datetime(2025, 7, 1, 9, 0, 0)
+
+_SIZE_UNITS = {'': 1, 'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+_LEVELS = ('INFO', 'INFO', 'INFO', 'DEBUG', 'WARN', 'ERROR')
+_LOGGERS = ('c.e.order.OrderService', 'c.e.user.UserController', 'c.e.batch.SettleJob', 'o.s.web.DispatcherServlet')
+_WORDS = ('request', 'order', 'user', 'processed', 'queue', 'cache', 'retry', 'session', 'timeout', 'payment',
+          'account', 'item', 'stock', 'batch', 'completed', 'started', 'failed', 'id', 'status', 'result')
+_TABLES = ('orders', 'order_item', 'users', 'payment', 'stock', 'settlement')
+_COLUMNS = ('id', 'status', 'amount', 'user_id', 'created_at', 'updated_at', 'name', 'qty', 'price', 'memo')
+
+
+def parse_size(text: str) -> int:
+    """'1MB', '10GB', '512KB', '1000' 같은 크기 문자열을 바이트 수로 변환"""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?B?)\s*', text.upper())
+    if not match:
+        raise ValueError(f"잘못된 크기: {text}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """'plain=60,sql=20' 형식의 비율 문자열을 dict 로 변환"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"알 수 없는 메시지 종류: {name}")
+        mix[name] = int(weight)
+    return mix
+
+
+@dataclass
+class CorpusConfig:
+    """
+    로그 생성 설정
+
+    size_sigma 는 메시지 크기(항목 수)의 로그 정규 분포 표준편차이고,
+    size_scale 은 분포의 중앙값입니다. (SQL 컬럼 수, XML 자식 수, JSON 키 수 등)
+    """
+    size: int = 1024 * 1024
+    seed: int = 1
+    mix: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    max_depth: int = 4
+    size_scale: float = 4.0
+    size_sigma: float = 0.8
+    stack_trace_ratio: float = 0.05
+    # SQL 뒤에 실행 시간 메시지('SQL took N ms')를 붙이는 비율 (0 이면 붙이지 않음)
+    sql_timing_ratio: float = 0.0
+
+
+class CorpusGenerator:
+    """CorpusConfig 에 따라 로그 메시지를 만들어 파일에 씁니다."""
+
+    def __init__(self, config: CorpusConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.time = BASE_TIME
+        kinds = [kind for kind, weight in config.mix.items() if weight > 0]
+        self._kinds = kinds
+        self._weights = [config.mix[kind] for kind in kinds]
+        self._builders = {
+            'plain': self._plain,
+            'sql': self._sql,
+            'xml': self._xml,
+            'json': self._json,
+            'html': self._html,
+        }
+
+    def _count(self) -> int:
+        """메시지 크기 분포에서 항목 수를 하나 뽑음 (최소 1)"""
+        config = self.config
+        return max(1, int(config.size_scale * self.random.lognormvariate(0, config.size_sigma)))
+
+    def _words(self, count: int) -> str:
+        return ' '.join(self.random.choice(_WORDS) for _ in range(count))
+
+    def _header(self, level: str, logger: str) -> str:
+        self.time += datetime.timedelta(milliseconds=self.random.randint(0, 50))
+        thread = f"http-nio-8080-exec-{self.random.randint(1, 20)}"
+        return f"{self.time:%Y-%m-%d %H:%M:%S}.{self.time.microsecond // 1000:03d} {level:>5} 12345 --- [{thread}] {logger}"
+
+    def _plain(self) -> List[str]:
+        level = self.random.choice(_LEVELS)
+        lines = [f"{self._header(level, self.random.choice(_LOGGERS))} : {self._words(self._count() * 2)}"]
+        if level == 'ERROR' or self.random.random() < self.config.stack_trace_ratio:
+            lines.append('java.lang.IllegalStateException: ' + self._words(4))
+            for depth in range(self._count() * 2):
+                lines.append(f"\tat com.example.layer{depth}.Handler.invoke(Handler.java:{100 + depth})")
+        return lines
+
+    def _sql(self) -> List[str]:
+        random_ = self.random
+        table = random_.choice(_TABLES)
+        columns = [random_.choice(_COLUMNS) for _ in range(self._count())]
+        lines = [f"{self._header('DEBUG', 'org.hibernate.SQL')} : "]
+        kind = random_.random()
+        if kind < 0.7:
+            lines.append('    select')
+            lines.append(',\n'.join(f"        t0_.{column} as {column}{i}_0_" for i, column in enumerate(columns)))
+            lines.append('    from')
+            lines.append(f"        {table} t0_")
+            lines.append('    where')
+            lines.append(f"        t0_.id=? and t0_.status='OPEN'")
+        elif kind < 0.9:
+            lines.append('    insert')
+            lines.append(f"    into {table}")
+            lines.append(f"        ({', '.join(columns)})")
+            lines.append('    values')
+            lines.append(f"        ({', '.join('?' * len(columns))})")
+        else:
+            lines.append('    update')
+            lines.append(f"        {table}")
+            lines.append('    set')
+            lines.append(',\n'.join(f"        {column}=?" for column in columns))
+            lines.append('    where')
+            lines.append('        id=?')
+
+        if self.config.sql_timing_ratio and random_.random() < self.config.sql_timing_ratio:
+            # 테이블마다 실행 시간 분포를 다르게 해서 느린 테이블이 드러나도록 함
+            millis = random_.lognormvariate(_TABLES.index(table) * 0.5, 1.0)
+            lines.append(f"{self._header('DEBUG', 'o.h.e.j.s.SqlStatementLogger')} : SQL took {millis:.3f} ms")
+        return lines
+
+    def _element(self, lines: List[str], depth: int, indent: str) -> None:
+        name = self.random.choice(_COLUMNS)
+        if depth <= 1 or self.random.random() < 0.3:
+            lines.append(f"{indent}<{name}>{self._words(2)}</{name}>")
+            return
+        lines.append(f'{indent}<{name} seq="{self.random.randint(1, 999)}">')
+        for _ in range(min(self._count(), 6)):
+            self._element(lines, depth - 1, indent + '  ')
+        lines.append(f"{indent}</{name}>")
+
+    def _xml(self) -> List[str]:
+        random_ = self.random
+        depth = random_.randint(1, self.config.max_depth)
+        lines = [f"{self._header('INFO', random_.choice(_LOGGERS))} : SOAP request"]
+        if random_.random() < 0.5:
+            lines.append('<?xml version="1.0" encoding="UTF-8"?>')
+        lines.append('<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/">')
+        lines.append('  <soapenv:Header/>')
+        lines.append('  <soapenv:Body>')
+        self._element(lines, depth, '    ')
+        lines.append('  </soapenv:Body>')
+        lines.append('</soapenv:Envelope>')
+        return lines
+
+    def _json_value(self, depth: int):
+        if depth <= 1 or self.random.random() < 0.5:
+            return self._words(1) if self.random.random() < 0.5 else self.random.randint(0, 100000)
+        return {self.random.choice(_COLUMNS): self._json_value(depth - 1) for _ in range(min(self._count(), 6))}
+
+    def _json(self) -> List[str]:
+        payload = {column: self._json_value(self.config.max_depth) for column in
+                   (self.random.choice(_COLUMNS) for _ in range(self._count()))}
+        return [f"{self._header('INFO', self.random.choice(_LOGGERS))} : response {json.dumps(payload)}"]
+
+    def _html(self) -> List[str]:
+        lines = [f"{self._header('WARN', 'o.s.web.DispatcherServlet')} : error page rendered",
+                 '<!DOCTYPE html>',
+                 '<html><head><title>Error</title></head>',
+                 '<body>']
+        for _ in range(self._count()):
+            lines.append(f"<p>{self._words(6)}</p>")
+        lines.append('</body></html>')
+        return lines
+
+    def iter_messages(self):
+        """메시지(줄 목록)를 끝없이 생성"""
+        random_ = self.random
+        builders = self._builders
+        while True:
+            kind = random_.choices(self._kinds, self._weights)[0]
+            yield kind, builders[kind]()
+
+    def write(self, path: str) -> Dict[str, int]:
+        """
+        config.size 바이트가 될 때까지 메시지를 써서 파일을 만듭니다.
+
+        Returns:
+            dict: 종류별 메시지 수
+        """
+        counts = dict.fromkeys(self._kinds, 0)
+        written = 0
+        buffer = []
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            for kind, lines in self.iter_messages():
+                text = '\n'.join(lines) + '\n'
+                buffer.append(text)
+                counts[kind] += 1
+                written += len(text)
+                if len(buffer) >= 1000:
+                    f.write(''.join(buffer))
+                    buffer.clear()
+                if written >= self.config.size:
+                    break
+            f.write(''.join(buffer))
+        return counts
+
+
+def generate_corpus(path: str, config: CorpusConfig = None) -> Dict[str, int]:
+    """설정에 따라 로그 파일을 만들고 종류별 메시지 수를 반환"""
+    return CorpusGenerator(config or CorpusConfig()).write(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="벤치마크용 로그 생성")
+    parser.add_argument('output', help="생성할 로그 파일 경로")
+    parser.add_argument('--size', default='1MB', help="파일 크기 (예: 1MB, 500MB, 10GB)")
+    parser.add_argument('--seed', type=int, default=1, help="난수 시드")
+    parser.add_argument('--mix', default=None, help="메시지 종류별 비율 (예: plain=60,sql=20,xml=10,json=5,html=5)")
+    parser.add_argument('--max-depth', type=int, default=4, help="XML / JSON 최대 중첩 깊이")
+    parser.add_argument('--size-scale', type=float, default=4.0, help="메시지 크기(항목 수) 분포의 중앙값")
+    parser.add_argument('--size-sigma', type=float, default=0.8, help="메시지 크기 분포의 표준편차 (로그 정규)")
+    parser.add_argument('--sql-timing-ratio', type=float, default=0.0,
+                        help="SQL 뒤에 실행 시간 메시지를 붙이는 비율 (0-1)")
+    args = parser.parse_args()
+
+    corpus_config = CorpusConfig(size=parse_size(args.size), seed=args.seed,
+                                 mix=parse_mix(args.mix) if args.mix else dict(DEFAULT_MIX),
+                                 max_depth=args.max_depth, size_scale=args.size_scale, size_sigma=args.size_sigma,
+                                 sql_timing_ratio=args.sql_timing_ratio)
+    print(generate_corpus(args.output, corpus_config))
@@ -0,0 +1,250 @@
+"""
+로그 유틸리티 처리량 벤치마크
+
+로그 파일(없으면 corpus 로 생성)을 메시지 단위로 읽으면서 단계별 시간을 잽니다.
+    split  : 메시지 분리 (iter_log_messages_by_file, find_log_messages 와 같은 엔진)
+    detect : improved_detect_string_type
+    sql_v2 : extract_all_sql_queries_v2
+    sql_v3 : extract_all_sql_queries_v3
+    xml    : XMLLogExtractor.find_xml_blocks
+    tables : extract_all_sql_queries_v3 + TableAccessStats.add_many (테이블 접근 집계, SQL 추출 포함)
+워밍업 후 파일 전체를 여러 번(--repeat) 읽고 단계마다 가장 빠른 시간(best)과 중앙값을 기록합니다.
+단계별 MB/s(best 기준), messages/s 와 최대 RSS 를 출력하고, 결과를 JSON 으로 저장해 다음 실행과 비교할 수 있습니다.
+
+실행:
+    python -m app.benchmarks.run_benchmarks --size 50MB --save baseline.json
+    python -m app.benchmarks.run_benchmarks --size 50MB --compare baseline.json
+    python -m app.benchmarks.run_benchmarks ./nohup.out --stages split,detect
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, Iterable, List, Optional
+
+from app.benchmarks.corpus import CorpusConfig, generate_corpus, parse_size
+from app.utils.log_parser_utils import iter_log_messages_by_file
+from app.utils.regex_string_type_detector import improved_detect_string_type
+from app.utils.sql_table_stats import TableAccessStats
+from app.utils.sql_utils import extract_all_sql_queries_v2, extract_all_sql_queries_v3
+from app.utils.xml_utils import get_xml_extractor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# tables 단계에서 집계하는 객체
+_table_stats = TableAccessStats()
+
+# 단계 이름과 메시지 하나를 처리하는 함수 (split 은 읽기 자체를 측정)
+STAGES = {
+    'detect': improved_detect_string_type,
+    'sql_v2': extract_all_sql_queries_v2,
+    'sql_v3': extract_all_sql_queries_v3,
+    'xml': get_xml_extractor().find_xml_blocks,
+    'tables': lambda content: _table_stats.add_many(extract_all_sql_queries_v3(content)),
+}
+ALL_STAGES = ('split',) + tuple(STAGES)
+
+# 한 번에 측정하는 메시지 수 (메시지마다 타이머를 호출하지 않음)
+BATCH_SIZE = 2000
+
+# 측정 횟수와 측정 전에 버리는 실행 횟수 (캐시 / 정규식 컴파일 / 페이지 캐시 영향 제거)
+DEFAULT_REPEAT = 5
+DEFAULT_WARMUP = 1
+
+# 기준 결과보다 이 비율 이상 느려지면 회귀로 표시
+DEFAULT_TOLERANCE = 0.10
+
+
+def peak_rss_mb() -> Optional[float]:
+    """현재 프로세스의 최대 RSS (MB, 측정할 수 없으면 None)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 는 KB, macOS 는 바이트 단위
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _iter_batches(messages: Iterable[dict], batch_size: int, timings: Dict[str, float]):
+    """메시지를 batch_size 개씩 묶어 반환하며 읽는 데 걸린 시간을 split 에 더함"""
+    batch = []
+    started = time.perf_counter()
+    for message in messages:
+        batch.append(message['content'])
+        if len(batch) >= batch_size:
+            timings['split'] += time.perf_counter() - started
+            yield batch
+            batch = []
+            started = time.perf_counter()
+    timings['split'] += time.perf_counter() - started
+    if batch:
+        yield batch
+
+
+def _run_once(log_file_path: str, stage_funcs: list, batch_size: int) -> tuple:
+    """
+    로그 파일을 한 번 읽으면서 단계별 처리 시간을 잽니다.
+    단계들은 같은 배치를 번갈아 처리하므로 측정 중의 부하 변화가 모든 단계에 고르게 나뉩니다.
+
+    Returns:
+        tuple: (메시지 수, 단계 이름별 시간)
+    """
+    timings = dict.fromkeys(('split',) + tuple(name for name, _ in stage_funcs), 0.0)
+    message_count = 0
+
+    for batch in _iter_batches(iter_log_messages_by_file(log_file_path), batch_size, timings):
+        message_count += len(batch)
+        for name, func in stage_funcs:
+            stage_started = time.perf_counter()
+            for content in batch:
+                func(content)
+            timings[name] += time.perf_counter() - stage_started
+
+    return message_count, timings
+
+
+def run_benchmark(log_file_path: str, stages: Iterable[str] = ALL_STAGES, batch_size: int = BATCH_SIZE,
+                  repeat: int = DEFAULT_REPEAT, warmup: int = DEFAULT_WARMUP) -> dict:
+    """
+    워밍업 후 로그 파일을 repeat 번 읽으면서 단계별 처리 시간을 잽니다.
+    단계별 속도는 가장 빠른 실행(best) 기준이며, 중앙값과 실행별 시간도 함께 기록합니다.
+
+    Args:
+        log_file_path (str): 로그 파일 경로
+        stages (Iterable[str]): 측정할 단계 (split 은 항상 측정)
+        batch_size (int): 한 번에 측정하는 메시지 수
+        repeat (int): 측정 횟수
+        warmup (int): 측정 전에 실행하고 버리는 횟수
+
+    Returns:
+        dict: 파일 크기, 메시지 수, 단계별 시간(best / 중앙값 / 실행별) / MB/s / messages/s, 최대 RSS
+    """
+    if repeat < 1:
+        raise ValueError("repeat 는 1 이상이어야 합니다.")
+
+    size = os.path.getsize(log_file_path)
+    stage_funcs = [(name, STAGES[name]) for name in stages if name != 'split']
+
+    for _ in range(warmup):
+        _run_once(log_file_path, stage_funcs, batch_size)
+
+    samples = {}
+    message_count = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        message_count, timings = _run_once(log_file_path, stage_funcs, batch_size)
+        for name, elapsed in timings.items():
+            samples.setdefault(name, []).append(elapsed)
+    total = time.perf_counter() - started
+
+    size_mb = size / (1024 * 1024)
+    stage_results = {}
+    for name, elapsed_list in samples.items():
+        best = min(elapsed_list)
+        stage_results[name] = {
+            'seconds': best,
+            'median_seconds': statistics.median(elapsed_list),
+            'samples': elapsed_list,
+            'mb_per_s': size_mb / best if best else None,
+            'messages_per_s': message_count / best if best else None,
+        }
+
+    return {
+        'file': os.path.abspath(log_file_path),
+        'size_bytes': size,
+        'messages': message_count,
+        'repeat': repeat,
+        'warmup': warmup,
+        'total_seconds': total,
+        'peak_rss_mb': peak_rss_mb(),
+        'python': platform.python_version(),
+        'stages': stage_results,
+    }
+
+
+def print_report(result: dict) -> None:
+    size_mb = result['size_bytes'] / (1024 * 1024)
+    print(f"파일: {result['file']} ({size_mb:.1f} MB, 메시지 {result['messages']}개, "
+          f"워밍업 {result['warmup']}회 + 측정 {result['repeat']}회)")
+    print(f"{'stage':<10}{'best(s)':>10}{'median(s)':>11}{'MB/s':>10}{'msg/s':>12}")
+    for name, stage in result['stages'].items():
+        print(f"{name:<10}{stage['seconds']:>10.3f}{stage['median_seconds']:>11.3f}"
+              f"{stage['mb_per_s'] or 0:>10.1f}{stage['messages_per_s'] or 0:>12.0f}")
+    print(f"전체(측정): {result['total_seconds']:.3f}s  최대 RSS: {result['peak_rss_mb'] or 0:.1f} MB")
+
+
+def compare(result: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    기준 결과와 비교하여 tolerance 이상 느려진 단계의 설명 목록을 반환합니다.
+    파일 크기가 달라도 비교할 수 있도록 MB/s 기준으로 비교하며, 두 결과 모두 가장 빠른 실행(best)의 속도를 사용합니다.
+    기준 결과에 실행별 시간(samples)이 있으면 가장 느린 기준 실행보다도 느린 경우에만 회귀로 봅니다.
+    (기준 실행 사이의 흔들림 안에 있는 차이는 회귀로 보지 않음)
+    """
+    regressions = []
+    print(f"{'stage':<10}{'baseline MB/s':>15}{'current MB/s':>15}{'change':>10}")
+    for name, stage in result['stages'].items():
+        base = baseline['stages'].get(name)
+        if not base or not base['mb_per_s'] or not stage['mb_per_s']:
+            continue
+        change = stage['mb_per_s'] / base['mb_per_s'] - 1
+        # 크기가 다른 파일과도 비교할 수 있도록 가장 느린 기준 실행도 MB/s 로 환산
+        slowest_mb_per_s = base['mb_per_s'] * base['seconds'] / max(base.get('samples') or [base['seconds']])
+        mark = ' *' if change < -tolerance and stage['mb_per_s'] < slowest_mb_per_s else ''
+        print(f"{name:<10}{base['mb_per_s']:>15.1f}{stage['mb_per_s']:>15.1f}{change:>+10.1%}{mark}")
+        if mark:
+            regressions.append(f"{name}: {base['mb_per_s']:.1f} -> {stage['mb_per_s']:.1f} MB/s ({change:+.1%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="로그 유틸리티 처리량 벤치마크")
+    parser.add_argument('log_file', nargs='?', default=None, help="측정할 로그 파일 (없으면 생성)")
+    parser.add_argument('--size', default='20MB', help="생성할 로그 크기 (log_file 이 없을 때)")
+    parser.add_argument('--seed', type=int, default=1, help="생성용 난수 시드")
+    parser.add_argument('--stages', default=','.join(ALL_STAGES), help="측정할 단계 (쉼표로 구분)")
+    parser.add_argument('--save', default=None, help="결과를 저장할 JSON 파일 (기준 결과로 사용)")
+    parser.add_argument('--compare', default=None, help="비교할 기준 결과 JSON 파일")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="측정 횟수 (단계별 가장 빠른 실행으로 비교)")
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP, help="측정 전에 실행하고 버리는 횟수")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="회귀로 볼 속도 감소 비율")
+    args = parser.parse_args(argv)
+
+    stages = [name.strip() for name in args.stages.split(',') if name.strip()]
+    unknown = [name for name in stages if name not in ALL_STAGES]
+    if unknown:
+        parser.error(f"알 수 없는 단계: {', '.join(unknown)}")
+    if args.repeat < 1 or args.warmup < 0:
+        parser.error("--repeat 는 1 이상, --warmup 은 0 이상이어야 합니다.")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_file_path = args.log_file
+        if log_file_path is None:
+            log_file_path = os.path.join(temp_dir, 'corpus.log')
+            generate_corpus(log_file_path, CorpusConfig(size=parse_size(args.size), seed=args.seed))
+        result = run_benchmark(log_file_path, stages, repeat=args.repeat, warmup=args.warmup)
+
+    print_report(result)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print("성능 저하: " + ', '.join(regressions))
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
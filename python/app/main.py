@@ -1,55 +1,312 @@
+import argparse
+import glob
 import os
+import re
+import sys
+from itertools import islice
 
-from utils.log_parser_utils import find_log_messages, show_xml_single_line
-from utils.regex_string_type_detector import improved_detect_string_type
-from utils.sql_utils import extract_all_sql_queries_v2
-from utils.xml_utils import extract_and_format_specific_xml
+# utils 모듈들이 app.utils.metrics 를 사용하므로 같은 모듈(측정 상태)을 공유하도록 같은 경로로 가져옴
+from app.utils import metrics
+from utils.db_sink import ConnectionPool, LogDBSink, connection_factory
+from utils.log_archive import is_compressed
+from utils.log_follow import LogFollower
+from utils.log_index import query_time_range, query_without_index
+from utils.log_merge import iter_merged_messages
+from utils.log_parser_utils import get_message_timestamp
+from utils.log_reader import LogReader
+from utils.parallel_pipeline import (SQL_SCORE_THRESHOLD, XML_SCORE_THRESHOLD, AnalysisOptions, analyze_message,
+                                     analyze_messages,
+                                     iter_analyzed_messages, iter_analyzed_messages_parallel)
+from utils.result_cache import DEFAULT_MAX_DISK_ENTRIES, DEFAULT_MAX_ENTRIES, ResultCache
+from utils.result_writer import OUTPUT_FORMATS, open_result_writer
+from utils.sql_fingerprint import SQLFingerprintIndex
+from utils.sql_latency import SQLLatencyIndex
+from utils.sql_table_stats import TableAccessStats
 
-if __name__ == "__main__":
+# --types 에 지정할 수 있는 타입
+CONTENT_TYPES = ('XML', 'HTML', 'JSON', 'SQL', 'UNKNOWN')
+
+# --since / --until 형식 (앞부분만 써도 됨)
+TIME_BOUND_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}(?: \d{2}(?::\d{2}(?::\d{2})?)?)?')
+
+
+def time_bound(text):
+    """'2025-07-01', '2025-07-01 10:30', '2025-07-01T10:30:00' 형식의 시간 범위 값"""
+    value = text.strip().replace('T', ' ')
+    if not TIME_BOUND_PATTERN.fullmatch(value):
+        raise argparse.ArgumentTypeError(f"잘못된 시간 형식: {text} (예: 2025-07-01 10:30:00)")
+    return value
+
+
+def content_types(text):
+    """'SQL,XML' 형식의 타입 목록"""
+    types = {name.strip().upper() for name in text.split(',') if name.strip()}
+    unknown = types.difference(CONTENT_TYPES)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"알 수 없는 타입: {', '.join(sorted(unknown))}")
+    return types
+
+
+def expand_inputs(patterns):
+    """
+    입력 경로 / glob 패턴을 파일 목록으로 바꿉니다. '-' 는 표준 입력입니다.
+
+    Returns:
+        list: 입력 목록 (패턴 순서, 같은 패턴 안에서는 이름 순)
+    """
+    inputs = []
+    for pattern in patterns:
+        if pattern == '-' or os.path.exists(pattern):
+            inputs.append(pattern)
+            continue
+        matches = sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+        if not matches:
+            raise FileNotFoundError(f"입력 파일을 찾을 수 없음: {pattern}")
+        inputs.extend(matches)
+    return inputs
+
+
+def iter_source_results(source, args, cache, options):
+    """입력 하나의 분석 결과 (입력 방식과 --workers / --follow 설정에 따라 선택)"""
+    if source == '-':
+        # 표준 입력은 구간으로 나눌 수 없으므로 단일 프로세스로 분석
+        messages = LogReader(encoding=args.encoding).iter_messages(sys.stdin.buffer)
+        return analyze_messages(messages, cache, options)
+
+    if args.follow or args.checkpoint:
+        # 이어 읽기는 파일 끝부분만 읽으므로 단일 프로세스로 분석
+        follower = LogFollower(source, args.checkpoint, args.encoding)
+        messages = follower.follow(args.follow_interval) if args.follow else follower.read_new()
+        return analyze_messages(messages, cache, options)
+
+    if is_compressed(source):
+        # 압축 파일은 구간으로 나눌 수 없으므로 풀면서 순서대로 분석 (여러 멤버로 된 gzip 은 --workers 개 프로세스에서 풂)
+        return iter_analyzed_messages(source, args.encoding, cache, options, decompress_workers=args.workers or None)
+
+    if options.has_time_range:
+        # 희소 색인(--index) 또는 파일 이진 탐색으로 시간 범위의 위치로 바로 이동해서 범위 안의 메시지만 읽음
+        # (범위만 읽으므로 단일 프로세스로 분석)
+        if args.index:
+            messages = query_time_range(source, options.since, options.until, encoding=args.encoding)
+        else:
+            messages = query_without_index(source, options.since, options.until, encoding=args.encoding)
+        return analyze_messages(messages, cache, options)
+
+    if args.workers == 1 or cache is not None:
+        return iter_analyzed_messages(source, args.encoding, cache, options)
+
+    return iter_analyzed_messages_parallel(source, workers=args.workers or None, max_in_flight=args.max_in_flight,
+                                           encoding=args.encoding, cache_entries=args.cache_size or None,
+                                           options=options)
+
+
+def iter_merged_results(inputs, args, cache, options):
+    """모든 입력의 메시지를 타임스탬프 순서로 병합해 (메시지의 파일, 분석 결과) 를 반환"""
+    messages = iter_merged_messages(inputs, args.encoding, rotated=args.rotated)
+    if options.has_time_range:
+        messages = filter(options.includes, messages)
+    for message in messages:
+        yield message['source'], analyze_message(message, cache, options)
+
+
+def iter_results(inputs, args, cache, options, observe=None):
+    """
+    모든 입력의 (입력, 분석 결과) 를 순서대로 반환 (--types 로 거름)
+    observe 가 있으면 거르기 전의 모든 결과를 observe(result, source) 로 전달합니다.
+    """
+    if args.merge:
+        pairs = iter_merged_results(inputs, args, cache, options)
+    else:
+        pairs = ((source, result) for source in inputs for result in iter_source_results(source, args, cache, options))
+    for source, result in pairs:
+        if observe is not None:
+            observe(result, source)
+        if args.types is None or result['detected']['primary_type'] in args.types:
+            yield source, result
+
+
+def build_parser(module_path):
+    parser = argparse.ArgumentParser(
+        description="로그 분석: 메시지 타입 감지, SQL / XML 추출",
+        epilog="예: python main.py 'logs/nohup-*.out' --types SQL --since '2025-07-01 10:00' --format jsonl -o sql.jsonl"
+    )
+    parser.add_argument('inputs', nargs='*', default=[f'{module_path}/utils/nohup-temp.out'],
+                        help="분석할 로그 파일 경로 / glob 패턴 (gzip / bz2 / xz 압축 파일 포함, '-' 는 표준 입력)")
+    parser.add_argument('--encoding', default=None,
+                        help="로그 파일 인코딩 (기본값: 플랫폼 기본 인코딩)")
+    parser.add_argument('--types', type=content_types, default=None,
+                        help=f"출력할 타입 (쉼표로 구분: {','.join(CONTENT_TYPES)})")
+    parser.add_argument('--sql-threshold', type=float, default=SQL_SCORE_THRESHOLD,
+                        help="SQL 점수가 이 값 이상이면 SQL 추출")
+    parser.add_argument('--xml-threshold', type=float, default=XML_SCORE_THRESHOLD,
+                        help="XML / HTML 점수가 이 값 이상이면 XML 추출")
+    parser.add_argument('--since', type=time_bound, default=None,
+                        help="이 시각 이후의 메시지만 분석 (예: '2025-07-01 10:00')")
+    parser.add_argument('--until', type=time_bound, default=None,
+                        help="이 시각까지의 메시지만 분석 (지정한 자릿수까지 포함, 예: '2025-07-01 10' 은 10시대 전체)")
+    parser.add_argument('--index', action='store_true',
+                        help="--since / --until 조회에 타임스탬프 색인(<로그 파일>.tsidx)을 만들거나 갱신해서 사용 "
+                             "(지정하지 않으면 색인 없이 파일을 이진 탐색하며 줄 번호는 범위의 첫 메시지 기준, "
+                             "압축 파일은 처음부터 읽으며 거름)")
+    parser.add_argument('--merge', action='store_true',
+                        help="여러 입력(인스턴스별 로그)의 메시지를 타임스탬프 순서로 병합해 분석 (단일 프로세스)")
+    parser.add_argument('--rotated', action='store_true',
+                        help="--merge 에서 입력마다 회전된 파일(<파일>.1, <파일>.2.gz ...)을 오래된 것부터 이어 읽음")
+    parser.add_argument('--limit', type=int, default=None,
+                        help="출력할 최대 결과 수 (채우면 읽기를 멈춤)")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='text',
+                        help="출력 형식")
+    parser.add_argument('-o', '--output', default=None,
+                        help="출력 파일 (기본값: 표준 출력)")
+    parser.add_argument('--include-content', action='store_true',
+                        help="메시지 원문 전체를 출력에 포함")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="분석에 사용할 프로세스 수 (1 이면 단일 프로세스, 0 이면 CPU 수)")
+    parser.add_argument('--max-in-flight', type=int, default=None,
+                        help="동시에 처리 중인 구간의 최대 개수")
+    parser.add_argument('--sql-stats', default=None,
+                        help="SQL 지문별 집계 결과를 저장할 파일 (.json 또는 .csv)")
+    parser.add_argument('--sql-stats-capacity', type=int, default=1000,
+                        help="집계할 최대 SQL 지문 수")
+    parser.add_argument('--table-stats', default=None,
+                        help="테이블별 읽기 / 쓰기 횟수, 필터 컬럼, 인덱스 후보를 저장할 파일 (.json 또는 .csv)")
+    parser.add_argument('--sql-latency', default=None,
+                        help="SQL 문별 실행 시간 분포(p50/p95/p99/max)와 가장 느린 실행을 저장할 파일 (.json 또는 .csv)")
+    parser.add_argument('--sql-latency-gap', action='store_true',
+                        help="실행 시간 표시가 없을 때 다음 메시지와의 타임스탬프 간격을 실행 시간으로 추정 "
+                             "(대기 시간이 포함되므로 실행 시간 표시와 따로 집계)")
+    parser.add_argument('--checkpoint', default=None,
+                        help="이어 읽기 위치를 저장할 파일 (지정하면 지난 실행 이후 추가된 메시지만 분석)")
+    parser.add_argument('--follow', action='store_true',
+                        help="tail -f 처럼 파일을 계속 감시하며 새 메시지를 분석")
+    parser.add_argument('--follow-interval', type=float, default=1.0,
+                        help="--follow 에서 새 내용을 확인하는 간격 (초)")
+    parser.add_argument('--db', default=None,
+                        help="분석 결과를 저장할 DB ('h2', 'jdbc:h2:...' 또는 'sqlite:<파일 경로>')")
+    parser.add_argument('--db-batch-size', type=int, default=1000,
+                        help="DB 에 한 번에 넣을 행 수")
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help="타임스탬프만 다른 같은 메시지의 분석 결과를 재사용할 캐시 크기 (0 이면 사용 안 함)")
+    parser.add_argument('--cache-db', default=None,
+                        help="분석 결과 캐시를 저장해 다음 실행에서 재사용할 SQLite 파일 (단일 프로세스)")
+    parser.add_argument('--cache-db-max-entries', type=int, default=DEFAULT_MAX_DISK_ENTRIES,
+                        help="--cache-db 에 보관할 최대 결과 수 (넘으면 오래 전에 쓴 결과부터 지움, 0 이면 제한 없음)")
+    parser.add_argument('--metrics', action='store_true',
+                        help="단계별 호출 수 / 지연 시간 / 가장 느린 메시지를 측정해 마지막에 출력")
+    parser.add_argument('--metrics-json', default=None,
+                        help="측정 결과를 저장할 JSON 파일 (--metrics 포함)")
+    parser.add_argument('--metrics-prom', default=None,
+                        help="측정 결과를 저장할 Prometheus 텍스트 파일 (--metrics 포함)")
+    parser.add_argument('--metrics-slowest', type=int, default=metrics.DEFAULT_SLOWEST,
+                        help="단계별로 보관할 가장 느린 메시지 수")
+    return parser
+
+
+def main(argv=None):
     module_path = os.path.dirname(__file__)
-    print(f"모듈 경로: {module_path}")
+    parser = build_parser(module_path)
+    args = parser.parse_args(argv)
 
     # 사용 예시
-    # log_messages = find_log_messages('./nohup-temp-02.out')
+    # python main.py ./nohup-temp-02.out --workers 4
+    # python main.py ./nohup-temp-02.out --checkpoint ./nohup.checkpoint --follow
+    # cat nohup.out | python main.py - --types SQL,XML --format csv -o result.csv
+    # python main.py app1/nohup.out app2/nohup.out --merge --rotated --format jsonl
+
+    try:
+        inputs = expand_inputs(args.inputs)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    if (args.follow or args.checkpoint) and (len(inputs) != 1 or inputs[0] == '-' or is_compressed(inputs[0])):
+        parser.error("--follow / --checkpoint 는 압축되지 않은 로그 파일 하나에만 사용할 수 있습니다")
+    if args.merge and (args.follow or args.checkpoint or '-' in inputs):
+        parser.error("--merge 는 --follow / --checkpoint / 표준 입력과 함께 사용할 수 없습니다")
+    if args.rotated and not args.merge:
+        parser.error("--rotated 는 --merge 와 함께 사용합니다")
+
+    metrics_enabled = args.metrics or args.metrics_json or args.metrics_prom
+    if metrics_enabled:
+        metrics.enable(args.metrics_slowest)
+
+    options = AnalysisOptions(sql_threshold=args.sql_threshold, xml_threshold=args.xml_threshold,
+                              since=args.since, until=args.until)
 
-    log_messages = find_log_messages(f'{module_path}/utils/nohup-temp.out')
-    # log_messages = find_log_messages('/Users/daewonlee/dev/git/repos/study_01/study/python/app/utils/nohup-temp.out')
+    cache = None
+    if args.cache_db or (args.cache_size and args.workers == 1):
+        cache = ResultCache(max_entries=args.cache_size or DEFAULT_MAX_ENTRIES, disk_path=args.cache_db,
+                            namespace=options.cache_namespace(), max_disk_entries=args.cache_db_max_entries or None)
 
-    for msg in log_messages:
-        print(f"Message from line {msg['start_line']} to {msg['end_line']}  {msg['content'][:50]} + ...")
-        # print(f"Message from line {msg['start_line']} to {msg['end_line']}  {msg['content']} ")
+    sql_index = SQLFingerprintIndex(capacity=args.sql_stats_capacity) if args.sql_stats else None
+    table_stats = TableAccessStats() if args.table_stats else None
+    # 실행 시간 표시는 SQL 이 없는 메시지에 있으므로 --types 로 거르기 전의 모든 결과를 받음
+    sql_latency = SQLLatencyIndex(use_gap=args.sql_latency_gap) if args.sql_latency else None
 
+    db_pool = ConnectionPool(connection_factory(args.db)) if args.db else None
+    db_sink = LogDBSink(db_pool, batch_size=args.db_batch_size) if db_pool is not None else None
+    if db_sink is not None:
+        db_sink.start()
 
-        # 타입 감지
-        detected = improved_detect_string_type(msg['content'])
-        print(f"감지된 타입: [{detected['primary_type']}] 타입별 점수: [{detected['scores']}]")
+    # 진행 / 요약 메시지는 결과 출력(표준 출력)과 섞이지 않도록 표준 오류로 출력
+    results = iter_results(inputs, args, cache, options, sql_latency.add if sql_latency is not None else None)
+    if args.limit is not None:
+        results = islice(results, args.limit)
 
-        # if detected['primary_type'] == 'SQL':
-        # 점수가 있으면 무조건 확인해 보기
-        if detected['scores']['SQL'] >= 0.1:
-            replace = msg['content']
-            # replace = msg['content'].replace("\n", " ")
-            # replace = re.sub(r'\s+', ' ', replace)
-            print(replace)  # "Hello World Python"
+    writer = open_result_writer(args.format, args.output, args.include_content)
+    write_result = metrics.instrument('main.write_result')(writer.write)
+    try:
+        for source, result in results:
+            write_result(result, source)
+            if args.follow:
+                writer.flush()
 
-            extracted_queries = extract_all_sql_queries_v2(replace)
-            print(f"추출된 SQL 쿼리 수: {len(extracted_queries)}")
-            for query in extracted_queries:
-                print(query)
-                print("-" * 50)
+            if result['sql_queries'] and (sql_index is not None or table_stats is not None):
+                timestamp = get_message_timestamp(result['content'])
+                if sql_index is not None:
+                    sql_index.add_many(result['sql_queries'], timestamp, result['start_line'], result['end_line'])
+                if table_stats is not None:
+                    table_stats.add_many(result['sql_queries'], timestamp)
 
-        if detected['scores']['XML'] >= 0.1 or detected['scores']['HTML'] >= 0.1:
-            # xml 추출
-            request_xmls = extract_and_format_specific_xml(msg['content'])
-            for xml in request_xmls:
+            if db_sink is not None:
+                db_sink.write_result(result)
+    finally:
+        writer.close()
+        if db_sink is not None:
+            db_sink.close()
+            db_pool.close_all()
+            print(f"DB 저장 완료: {db_sink.written} (실패: {db_sink.failed})", file=sys.stderr)
+        if cache is not None:
+            cache.close()
+            print(f"결과 캐시: {cache.stats()}", file=sys.stderr)
 
-                print(show_xml_single_line(xml))
+    if sql_index is not None:
+        sql_index.export(args.sql_stats)
+        print(f"SQL 지문 집계 저장: {args.sql_stats} (지문 {len(sql_index)}개 / SQL {sql_index.total}개)",
+              file=sys.stderr)
 
+    if sql_latency is not None:
+        sql_latency.flush()
+        sql_latency.export(args.sql_latency)
+        print(f"SQL 실행 시간 집계 저장: {args.sql_latency} (SQL {sql_latency.total}개, 타임스탬프 간격으로 추정 "
+              f"{sql_latency.gap_matched}개, 실행 시간 없음 {sql_latency.unmatched}개)", file=sys.stderr)
+        sql_latency.print_summary(file=sys.stderr)
 
-    # msg 추출
-        # data_list = re.split(pattern_msg_splite, "".join(msg['content']), maxsplit=1)
-        # for index,data in enumerate(data_list):
-        #     print(f'index : {index} data : {data}')
+    if table_stats is not None:
+        table_stats.export(args.table_stats)
+        print(f"테이블 접근 집계 저장: {args.table_stats} (테이블 {len(table_stats)}개 / SQL {table_stats.total}개)",
+              file=sys.stderr)
+        for suggestion in table_stats.suggest_indexes(k=5):
+            print(f"  인덱스 후보: {suggestion['ddl']} ({suggestion['statements']}건, {suggestion['share']:.0%})",
+                  file=sys.stderr)
 
-        # print(msg['content'][:100] + "...")  # 내용 일부만 출력
+    if metrics_enabled:
+        metrics.registry.print_summary(file=sys.stderr)
+        if args.metrics_json:
+            metrics.registry.export_json(args.metrics_json)
+        if args.metrics_prom:
+            metrics.registry.export_prometheus(args.metrics_prom)
 
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+# 동시에 처리 중(대기 포함)일 수 있는 최대 쓰기 작업 수 (메모리 사용량 제한)
+DEFAULT_MAX_PENDING = 256
+
+# 묶음 파일 쓰기 버퍼 크기
+BUNDLE_BUFFER_SIZE = 1024 * 1024
+
+# 묶음 파일 색인 이름
+BUNDLE_INDEX_NAME = 'index.jsonl'
+
+
+class ThreadedFileWriter:
+    """
+    콘텐츠를 파일 하나씩 저장하되, 쓰기는 스레드 풀에서 수행합니다.
+
+    submit 은 쓰기 작업을 넘기고 바로 반환하며, 처리 중인 작업이 max_pending 개가 되면
+    하나가 끝날 때까지 기다리므로 메모리에 쌓이는 콘텐츠가 제한됩니다.
+
+    사용 예:
+        with ThreadedFileWriter('output_dir') as writer:
+            writer.submit('select_1.sql', content)
+    """
+
+    def __init__(self, output_dir: str = ".", max_workers: int = 4, max_pending: int = DEFAULT_MAX_PENDING):
+        """
+        Args:
+            output_dir (str): 출력 디렉토리
+            max_workers (int): 쓰기 스레드 수
+            max_pending (int): 동시에 처리 중일 수 있는 최대 작업 수
+        """
+        self.output_dir = output_dir
+        self.written = 0
+        self.errors: List[tuple] = []
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='content-writer')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def submit(self, filename: str, content: str, entry: Optional[dict] = None) -> dict:
+        """
+        콘텐츠 쓰기를 예약합니다.
+
+        Args:
+            filename (str): 저장할 파일 이름
+            content (str): 저장할 콘텐츠
+            entry (dict): 로그 항목 (사용하지 않음, BundleWriter 와 같은 호출 형식)
+
+        Returns:
+            dict: 저장 위치 정보 ('path')
+        """
+        file_path = os.path.join(self.output_dir, filename)
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._write, file_path, content)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return {'path': file_path}
+
+    def _write(self, file_path: str, content: str) -> None:
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+        except OSError as e:
+            with self._lock:
+                self.errors.append((file_path, e))
+            return
+        with self._lock:
+            self.written += 1
+
+    def close(self) -> None:
+        """예약된 쓰기가 모두 끝날 때까지 기다림"""
+        self._executor.shutdown(wait=True)
+        for file_path, e in self.errors:
+            print(f"파일 저장 중 오류 발생 ({file_path}): {e}")
+
+
+class BundleWriter:
+    """
+    콘텐츠를 타입별 묶음 파일(<타입>.jsonl)에 한 줄씩 이어 쓰고, 위치를 색인 파일(index.jsonl)에 기록합니다.
+
+    작은 파일을 항목마다 만드는 대신 타입별 파일 몇 개에 버퍼를 거쳐 순서대로 추가하므로
+    파일 생성 / 닫기 호출이 없습니다. 묶음 파일의 각 줄은 {"name", "timestamp", "component", "content"} 이고,
+    색인의 offset / length 로 다시 읽을 수 있습니다. (read_bundle_entry 참고)
+    기존 묶음 파일이 있으면 뒤에 이어 씁니다.
+    """
+
+    def __init__(self, output_dir: str = "."):
+        """
+        Args:
+            output_dir (str): 묶음 파일과 색인을 저장할 디렉토리
+        """
+        self.output_dir = output_dir
+        self.written = 0
+        self._bundles: Dict[str, object] = {}
+        self._index = open(os.path.join(output_dir, BUNDLE_INDEX_NAME), 'a', encoding='utf-8',
+                           buffering=BUNDLE_BUFFER_SIZE)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _bundle(self, content_type: str):
+        bundle = self._bundles.get(content_type)
+        if bundle is None:
+            path = os.path.join(self.output_dir, f"{content_type.lower()}.jsonl")
+            bundle = open(path, 'ab', buffering=BUNDLE_BUFFER_SIZE)
+            self._bundles[content_type] = bundle
+        return bundle
+
+    def submit(self, filename: str, content: str, entry: Optional[dict] = None) -> dict:
+        """
+        콘텐츠를 타입별 묶음 파일에 추가합니다.
+
+        Args:
+            filename (str): 항목 이름 (색인에 기록)
+            content (str): 저장할 콘텐츠
+            entry (dict): content_type, timestamp, component 를 가진 로그 항목
+
+        Returns:
+            dict: 저장 위치 정보 ('path', 'offset', 'length')
+        """
+        entry = entry or {}
+        content_type = entry.get('content_type') or 'UNKNOWN'
+        record = {
+            'name': filename,
+            'timestamp': entry.get('timestamp'),
+            'component': entry.get('component'),
+            'content': content
+        }
+        data = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+        bundle = self._bundle(content_type)
+        offset = bundle.tell()
+        bundle.write(data)
+        location = {'path': bundle.name, 'offset': offset, 'length': len(data)}
+
+        self._index.write(json.dumps({'type': content_type, 'name': filename, **location}, ensure_ascii=False) + '\n')
+        self.written += 1
+        return location
+
+    def close(self) -> None:
+        for bundle in self._bundles.values():
+            bundle.close()
+        self._bundles.clear()
+        self._index.close()
+
+
+def read_bundle_entry(path: str, offset: int, length: int) -> dict:
+    """
+    묶음 파일에서 항목 하나를 읽습니다.
+
+    Args:
+        path (str): 묶음 파일 경로
+        offset (int): 항목 시작 위치 (바이트)
+        length (int): 항목 길이 (바이트)
+
+    Returns:
+        dict: name, timestamp, component, content 를 가진 항목
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return json.loads(f.read(length))
@@ -0,0 +1,307 @@
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence
+
+from app.utils.log_parser_utils import get_message_timestamp
+from app.utils.sql_fingerprint import fingerprint_sql
+
+# H2 JDBC 연결 정보 (h2_test.py 와 동일한 기본값)
+H2_DRIVER = "org.h2.Driver"
+H2_DRIVER_PATH = "/dev/bin/h2/bin/h2-2.1.210.jar"
+H2_URL = "jdbc:h2:~/test"
+
+# 테이블별 컬럼 (모든 컬럼을 ? 자리표시자로 넣으므로 H2 / SQLite 에서 같은 SQL 사용)
+TABLE_COLUMNS = {
+    'log_message': ('start_line', 'end_line', 'log_timestamp', 'primary_type', 'scores'),
+    'sql_statement': ('start_line', 'end_line', 'log_timestamp', 'fingerprint', 'statement'),
+    'xml_payload': ('start_line', 'end_line', 'log_timestamp', 'payload'),
+}
+
+TABLE_DDL = {
+    'log_message': """
+    CREATE TABLE IF NOT EXISTS log_message (
+        start_line INT,
+        end_line INT,
+        log_timestamp VARCHAR(32),
+        primary_type VARCHAR(16),
+        scores VARCHAR(256)
+    )
+    """,
+    'sql_statement': """
+    CREATE TABLE IF NOT EXISTS sql_statement (
+        start_line INT,
+        end_line INT,
+        log_timestamp VARCHAR(32),
+        fingerprint VARCHAR(32),
+        statement CLOB
+    )
+    """,
+    'xml_payload': """
+    CREATE TABLE IF NOT EXISTS xml_payload (
+        start_line INT,
+        end_line INT,
+        log_timestamp VARCHAR(32),
+        payload CLOB
+    )
+    """,
+}
+
+
+def connect_h2(url: str = H2_URL, user: str = "sa", password: str = "", driver_path: str = H2_DRIVER_PATH):
+    """H2 데이터베이스에 JDBC(jaydebeapi)로 연결 (JAVA_HOME / CLASSPATH 설정 필요)"""
+    import jaydebeapi
+
+    return jaydebeapi.connect(H2_DRIVER, url, [user, password], driver_path)
+
+
+def connect_sqlite(path: str):
+    """
+    SQLite 데이터베이스에 연결 (H2 대신 로컬에서 사용하는 DB-API 대체 구현)
+    작성 스레드에서 사용하므로 check_same_thread 를 끕니다.
+    """
+    return sqlite3.connect(path, check_same_thread=False)
+
+
+def connection_factory(spec: str) -> Callable:
+    """
+    연결 문자열로 연결 함수를 만듭니다.
+
+    Args:
+        spec (str): 'h2' (기본 H2 URL), 'jdbc:h2:...' 또는 'sqlite:<파일 경로>'
+
+    Returns:
+        Callable: 인자 없이 호출하면 새 DB-API 연결을 반환하는 함수
+    """
+    if spec == 'h2':
+        return connect_h2
+    if spec.startswith('jdbc:h2:'):
+        return lambda: connect_h2(spec)
+    if spec.startswith('sqlite:'):
+        path = spec[len('sqlite:'):]
+        return lambda: connect_sqlite(path)
+    raise ValueError(f"지원하지 않는 DB 연결 문자열: {spec}")
+
+
+class ConnectionPool:
+    """
+    DB-API 연결 풀. 연결은 필요할 때 최대 size 개까지 만들고 재사용합니다.
+
+    SQLite 의 ':memory:' 는 연결마다 별도의 DB 이므로 size=1 로 사용해야 합니다.
+    """
+
+    def __init__(self, connect: Callable, size: int = 2):
+        self.connect = connect
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+
+        if create:
+            try:
+                return self.connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        return self._idle.get(timeout=timeout)
+
+    def release(self, conn) -> None:
+        self._idle.put(conn)
+
+    def discard(self, conn) -> None:
+        """오류가 난 연결을 닫고 풀에서 제외 (다음 acquire 에서 새로 만듦)"""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self) -> None:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+class LogDBSink:
+    """
+    분석 결과(로그 메시지, 감지 타입, SQL 지문, XML)를 DB 에 일괄 저장합니다.
+
+    write_* 는 행을 제한된 크기의 큐에 넣기만 하고, 작성 스레드가 테이블별로 모아서
+    batch_size 개가 되거나 flush_interval 초가 지나면 executemany 로 한 번에 넣습니다.
+    큐가 가득 차면 write_* 호출이 기다리므로 메모리 사용량이 제한됩니다.
+
+    사용 예:
+        pool = ConnectionPool(connection_factory('sqlite:logs.db'))
+        with LogDBSink(pool) as sink:
+            for result in iter_analyzed_messages('nohup.out'):
+                sink.write_result(result)
+    """
+
+    _STOP = object()
+
+    def __init__(self, pool: ConnectionPool, batch_size: int = 1000, flush_interval: float = 1.0,
+                 queue_size: int = 10000, create_tables: bool = True):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.create_tables = create_tables
+        self.written = dict.fromkeys(TABLE_COLUMNS, 0)
+        self.failed = dict.fromkeys(TABLE_COLUMNS, 0)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._insert_sql = {
+            table: f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+            for table, columns in TABLE_COLUMNS.items()
+        }
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def start(self) -> None:
+        if self.create_tables:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    for ddl in TABLE_DDL.values():
+                        cursor.execute(ddl)
+                    conn.commit()
+                finally:
+                    cursor.close()
+
+        self._thread = threading.Thread(target=self._run, name='log-db-sink', daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """남은 행을 모두 저장하고 작성 스레드를 종료"""
+        if self._thread is not None:
+            self._queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+
+    def write(self, table: str, row: Sequence) -> None:
+        """테이블에 넣을 행 하나를 큐에 추가"""
+        if table not in TABLE_COLUMNS:
+            raise ValueError(f"알 수 없는 테이블: {table}")
+        self._queue.put((table, tuple(row)))
+
+    def write_result(self, result: dict) -> None:
+        """analyze_message 결과 하나를 log_message / sql_statement / xml_payload 행으로 저장"""
+        start_line = result['start_line']
+        end_line = result['end_line']
+        timestamp = get_message_timestamp(result['content'])
+        detected = result['detected']
+
+        self.write('log_message', (start_line, end_line, timestamp, detected['primary_type'],
+                                   json.dumps(detected['scores'])))
+
+        for query in result['sql_queries'] or ():
+            fingerprint, _ = fingerprint_sql(query)
+            self.write('sql_statement', (start_line, end_line, timestamp, fingerprint, query))
+
+        for xml, _ in result['xml_blocks'] or ():
+            self.write('xml_payload', (start_line, end_line, timestamp, xml))
+
+    def _run(self) -> None:
+        buffers: Dict[str, List[tuple]] = {table: [] for table in TABLE_COLUMNS}
+        pending = 0
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            timeout = max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is self._STOP:
+                self._flush(buffers)
+                return
+
+            if item is not None:
+                table, row = item
+                buffers[table].append(row)
+                pending += 1
+
+            if pending >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(buffers)
+                pending = 0
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, buffers: Dict[str, List[tuple]]) -> None:
+        if not any(buffers.values()):
+            return
+
+        try:
+            self._write_batches(buffers)
+        except Exception as e:
+            # 작성 스레드가 멈추면 write / close 가 큐에서 계속 기다리므로 어떤 오류에도 이번 묶음만 버리고 계속 동작
+            print(f"DB 저장 중 오류 발생: {e}", file=sys.stderr)
+        finally:
+            for table, rows in buffers.items():
+                self.failed[table] += len(rows)
+                rows.clear()
+
+    def _write_batches(self, buffers: Dict[str, List[tuple]]) -> None:
+        """테이블별로 executemany 후 커밋 (저장했거나 실패로 센 행은 buffers 에서 지움)"""
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            try:
+                for table, rows in buffers.items():
+                    if not rows:
+                        continue
+                    try:
+                        cursor.executemany(self._insert_sql[table], rows)
+                        conn.commit()
+                        self.written[table] += len(rows)
+                    except Exception as e:
+                        print(f"DB 저장 중 오류 발생 ({table}): {e}", file=sys.stderr)
+                        self.failed[table] += len(rows)
+                        rows.clear()
+                        conn.rollback()
+                        continue
+                    rows.clear()
+            finally:
+                cursor.close()
+        except Exception:
+            # 커서를 만들지 못했거나 롤백에 실패한 연결은 다시 쓰지 않음
+            self.pool.discard(conn)
+            raise
+        self.pool.release(conn)
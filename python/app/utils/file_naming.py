@@ -0,0 +1,115 @@
+import datetime
+import hashlib
+import itertools
+import os
+import re
+import time
+from typing import Optional
+
+# 타입별 확장자
+TYPE_EXTENSIONS = {
+    'XML': '.xml',
+    'HTML': '.html',
+    'JSON': '.json',
+    'SQL': '.sql',
+}
+
+# 식별자를 찾을 때 보는 콘텐츠 앞부분 크기 (전체를 다시 검사하지 않음)
+IDENTIFIER_SCAN_CHARS = 4096
+
+# 식별자 최대 길이
+IDENTIFIER_MAX_LENGTH = 20
+
+_xml_root_pattern = re.compile(r'<([a-zA-Z][a-zA-Z0-9_:-]*)[^>]*>')
+_html_title_pattern = re.compile(r'<title>(.*?)</title>', re.IGNORECASE)
+_json_first_key_pattern = re.compile(r'\s*\{\s*"((?:[^"\\]|\\.)*)"\s*:')
+_sql_action_pattern = re.compile(r'(SELECT|INSERT|UPDATE|DELETE|CREATE|ALTER|DROP)', re.IGNORECASE)
+_non_word_pattern = re.compile(r'[^\w]')
+
+
+def find_identifier(content: str, detected_type: str) -> Optional[str]:
+    """
+    콘텐츠 앞부분(IDENTIFIER_SCAN_CHARS)에서 파일 이름에 쓸 식별자를 찾습니다.
+    XML 은 루트 요소, HTML 은 title, JSON 은 첫 번째 키, SQL 은 동작 유형입니다. (JSON 을 파싱하지 않음)
+
+    Args:
+        content (str): 원본 콘텐츠
+        detected_type (str): 감지된 콘텐츠 타입
+
+    Returns:
+        str: 식별자 (찾지 못하면 None)
+    """
+    head = content[:IDENTIFIER_SCAN_CHARS]
+
+    if detected_type == 'XML':
+        match = _xml_root_pattern.search(head)
+    elif detected_type == 'HTML':
+        match = _html_title_pattern.search(head)
+    elif detected_type == 'JSON':
+        match = _json_first_key_pattern.match(head)
+    elif detected_type == 'SQL':
+        match = _sql_action_pattern.search(head)
+    else:
+        return None
+
+    return match.group(1).lower() if match else None
+
+
+class FileNamer:
+    """
+    감지된 타입별로 겹치지 않는 파일 이름을 만듭니다.
+
+    이름은 '<식별자>_<생성 시각>_<pid>_<순번><확장자>' 형식이며, 생성 시각은 name() 을 호출한 시각(초 단위)입니다.
+    순번은 스레드 간에 잠금 없이 증가하고 (itertools.count), 프로세스가 달라지면 pid 가 달라지므로
+    병렬로 쓰는 경우에도 서로 조율하지 않고 고유한 이름을 얻습니다.
+    use_hash=True 이면 순번 대신 콘텐츠 해시를 사용하므로 같은 콘텐츠는 같은 이름이 됩니다. (중복 제거용)
+    """
+
+    def __init__(self, use_hash: bool = False):
+        """
+        Args:
+            use_hash (bool): 순번 대신 콘텐츠 해시로 이름을 구분할지 여부
+        """
+        self.use_hash = use_hash
+        # (초, 시각 문자열) - 초가 바뀔 때만 strftime 을 호출 (한 번에 바꾸므로 스레드 간에 잠금이 필요 없음)
+        self._stamp = (None, '')
+        self._sequence = itertools.count(1)
+
+    @property
+    def stamp(self) -> str:
+        """현재 시각 문자열 ('%Y%m%d_%H%M%S')"""
+        second = int(time.time())
+        cached_second, stamp = self._stamp
+        if second != cached_second:
+            stamp = datetime.datetime.fromtimestamp(second).strftime("%Y%m%d_%H%M%S")
+            self._stamp = (second, stamp)
+        return stamp
+
+    def name(self, content: str, detected_type: str, identifier: Optional[str] = None,
+             default_name: str = "file") -> str:
+        """
+        파일 이름을 생성합니다.
+
+        Args:
+            content (str): 원본 콘텐츠 (identifier 가 없거나 use_hash=True 일 때만 사용)
+            detected_type (str): 감지된 콘텐츠 타입
+            identifier (str): 감지 / 추출 단계에서 이미 찾은 식별자 (None 이면 앞부분에서 찾음)
+            default_name (str): 식별자가 없을 때 사용할 이름
+
+        Returns:
+            str: 생성된 파일 이름 (확장자 포함)
+        """
+        if identifier is None:
+            identifier = find_identifier(content, detected_type)
+        # 식별자가 너무 길거나 특수 문자가 있는 경우 정리
+        identifier = _non_word_pattern.sub('_', identifier or default_name)[:IDENTIFIER_MAX_LENGTH]
+        extension = TYPE_EXTENSIONS.get(detected_type, '.txt')
+
+        if self.use_hash:
+            digest = hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
+            return f"{identifier}_{digest}{extension}"
+        return f"{identifier}_{self.stamp}_{os.getpid()}_{next(self._sequence)}{extension}"
+
+
+# 모듈에서 공유하는 이름 생성기
+default_namer = FileNamer()
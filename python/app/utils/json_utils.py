@@ -0,0 +1,179 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+# JSON 토큰 (앞의 공백 포함): 문자열 / 리터럴 / 숫자 / 구분자
+json_token_pattern = re.compile(
+    r'[ \t\n\r]*(?:'
+    r'(?P<string>"[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*")'
+    r'|(?P<literal>true|false|null|NaN|-?Infinity)'
+    r'|(?P<number>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?)'
+    r'|(?P<punct>[{}\[\]:,])'
+    r')'
+)
+
+# 로그 안에서 JSON 후보가 시작될 수 있는 위치
+json_start_pattern = re.compile(r'[{\[]')
+
+# json.loads 가 받아들이는 값의 첫 글자
+JSON_FIRST_CHARS = frozenset('{["-0123456789tfnNI')
+
+# 파싱 상태
+_VALUE, _VALUE_OR_END, _KEY, _KEY_OR_END, _COLON, _COMMA_OR_END = range(6)
+
+
+def scan_json_value(text: str, pos: int = 0) -> int:
+    """
+    pos 위치에서 시작하는 JSON 값을 검사하고 값이 끝나는 위치를 반환합니다.
+    json.loads 와 같은 문법을 따르지만 파이썬 객체를 만들지 않고, 재귀 없이 스택으로 중첩을 처리합니다.
+
+    Args:
+        text (str): 검사할 문자열
+        pos (int): 값이 시작되는 위치 (앞의 공백 허용)
+
+    Returns:
+        int: 값 바로 다음 위치, 유효한 JSON 값이 아니면 -1
+    """
+    return _scan_json_value(text, pos, None)[0]
+
+
+def _scan_json_value(text: str, pos: int, completed: Optional[List[Tuple[int, int]]]) -> Tuple[int, int]:
+    """
+    scan_json_value 의 구현. completed 가 주어지면 끝까지 닫힌 객체 / 배열의 (시작, 끝) 위치를 닫힌 순서대로 넣습니다.
+
+    Returns:
+        tuple: (값 바로 다음 위치 또는 -1, 검사를 멈춘 토큰의 시작 위치)
+    """
+    match_token = json_token_pattern.match
+    closers = []
+    # 열린 객체 / 배열의 시작 위치 (completed 가 있을 때만 사용)
+    starts = []
+    state = _VALUE
+
+    while True:
+        token = match_token(text, pos)
+        if token is None:
+            return -1, pos
+        pos = token.end()
+        kind = token.lastgroup
+        punct = token.group('punct')
+
+        if state == _VALUE or state == _VALUE_OR_END:
+            if punct == '{' or punct == '[':
+                closers.append('}' if punct == '{' else ']')
+                if completed is not None:
+                    starts.append(pos - 1)
+                state = _KEY_OR_END if punct == '{' else _VALUE_OR_END
+                continue
+            if punct == ']' and state == _VALUE_OR_END:
+                closers.pop()
+            elif punct is not None:
+                return -1, token.start(kind)
+        elif state == _KEY or state == _KEY_OR_END:
+            if kind == 'string':
+                state = _COLON
+                continue
+            if punct == '}' and state == _KEY_OR_END:
+                closers.pop()
+            else:
+                return -1, token.start(kind)
+        elif state == _COLON:
+            if punct != ':':
+                return -1, token.start(kind)
+            state = _VALUE
+            continue
+        else:  # _COMMA_OR_END
+            if punct == ',':
+                state = _KEY if closers[-1] == '}' else _VALUE
+                continue
+            if punct is None or punct != closers[-1]:
+                return -1, token.start(kind)
+            closers.pop()
+
+        if completed is not None and len(starts) > len(closers):
+            completed.append((starts.pop(), pos))
+
+        # 값 하나가 끝남
+        if not closers:
+            return pos, pos
+        state = _COMMA_OR_END
+
+
+def is_json(text: str) -> bool:
+    """
+    문자열 전체가 JSON 인지 확인합니다. json.loads 가 성공하는 경우와 같은 결과를 반환합니다.
+    첫 글자와 마지막 글자로 먼저 걸러내므로 타임스탬프로 시작하는 로그 메시지는 거의 비용 없이 제외됩니다.
+    """
+    normalized_text = text.strip()
+    if not normalized_text or normalized_text[0] not in JSON_FIRST_CHARS:
+        return False
+
+    first, last = normalized_text[0], normalized_text[-1]
+    if (first == '{' and last != '}') or (first == '[' and last != ']') or (first == '"' and last != '"'):
+        return False
+
+    return scan_json_value(normalized_text) == len(normalized_text)
+
+
+def looks_like_json(text: str) -> bool:
+    """앞뒤 공백을 제외하고 '{' 또는 '[' 로 시작해서 '}' 또는 ']' 로 끝나는지 확인 (JSON 부분 일치)"""
+    normalized_text = text.strip()
+    return len(normalized_text) >= 2 and normalized_text[0] in '{[' and normalized_text[-1] in '}]'
+
+
+@dataclass
+class JSONBlock:
+    raw_text: str
+    start_pos: int
+    end_pos: int
+
+    def load(self) -> Any:
+        """JSON 블록을 파이썬 객체로 변환"""
+        return json.loads(self.raw_text)
+
+
+def find_json_blocks(log_text: str) -> List[JSONBlock]:
+    """
+    로그 텍스트 안에 포함된 JSON 객체 / 배열의 위치를 찾습니다.
+    JSON 이 아닌 후보는 검사가 멈춘 곳부터 이어서 찾으므로 잘린 JSON 이 있어도 텍스트를 한 번만 훑습니다.
+    (실패한 후보의 문자열 값 안에 있는 괄호는 후보로 보지 않음)
+
+    Args:
+        log_text (str): 로그 텍스트
+
+    Returns:
+        List[JSONBlock]: 찾은 JSON 블록 (start_pos / end_pos 는 log_text 기준 위치)
+    """
+    blocks = []
+    position = 0
+    completed = []
+
+    while True:
+        match = json_start_pattern.search(log_text, position)
+        if not match:
+            break
+
+        start = match.start()
+        end, stop = _scan_json_value(log_text, start, completed)
+        if end > 0:
+            blocks.append(JSONBlock(raw_text=log_text[start:end], start_pos=start, end_pos=end))
+            position = end
+        else:
+            # 실패한 후보 안에서 끝까지 닫힌 객체 / 배열은 그 위치부터 다시 검사해도 같은 결과이므로 그대로 사용하고,
+            # 나머지 여는 괄호는 같은 위치에서 실패하므로 다시 훑지 않고 멈춘 토큰부터 이어서 찾음
+            nested_end = start
+            for nested_start, nested_stop in sorted(completed):
+                if nested_start >= nested_end:
+                    blocks.append(JSONBlock(raw_text=log_text[nested_start:nested_stop],
+                                            start_pos=nested_start, end_pos=nested_stop))
+                    nested_end = nested_stop
+            position = stop
+        completed.clear()
+
+    return blocks
+
+
+def extract_all_json(log_text: str) -> List[str]:
+    """로그 텍스트에 포함된 JSON 문자열 목록을 반환"""
+    return [block.raw_text for block in find_json_blocks(log_text)]
@@ -0,0 +1,256 @@
+"""
+압축된 / 회전된 로그 파일 읽기
+
+파일 앞부분의 매직 바이트로 압축 방식(gzip / bz2 / xz)을 판별하고 표준 라이브러리로 풀면서 읽습니다.
+여러 멤버로 된 gzip(회전 시 이어 붙인 파일, pigz / bgzip 출력 등)은 멤버 단위로 나누어 여러 프로세스에서 풀고
+파일 순서대로 이어 붙이므로 멤버 경계에 걸친 메시지도 그대로 이어집니다.
+압축을 푼 임시 파일을 만들지 않습니다.
+
+사용 예:
+    with open_log_stream('nohup.out.1.gz', workers=4) as stream:
+        for message in LogReader().iter_messages(stream):
+            ...
+"""
+import bz2
+import gzip
+import io
+import lzma
+import mmap
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+# 압축 방식별 매직 바이트
+GZIP_MAGIC = b'\x1f\x8b'
+BZIP2_MAGIC = b'BZh'
+XZ_MAGIC = b'\xfd7zXZ\x00'
+
+_OPENERS = {
+    'gzip': gzip.open,
+    'bz2': bz2.open,
+    'xz': lzma.open,
+}
+
+# gzip 멤버 헤더 후보 (매직 바이트 + deflate 방식). 압축된 데이터 안에도 나올 수 있으므로 풀어 보며 확인함
+GZIP_MEMBER_HEADER = b'\x1f\x8b\x08'
+
+# 워커 하나가 푸는 압축 데이터 크기 (멤버 경계에 맞춰 조정됨)
+DEFAULT_ARCHIVE_CHUNK_SIZE = 4 * 1024 * 1024
+
+# 압축 데이터를 한 번에 zlib 에 넘기는 크기
+INFLATE_BLOCK_SIZE = 1024 * 1024
+
+
+def detect_compression(log_file_path: str) -> Optional[str]:
+    """
+    매직 바이트로 압축 방식을 판별합니다. (확장자는 보지 않음)
+
+    Returns:
+        str: 'gzip', 'bz2', 'xz' 또는 None (압축되지 않은 파일)
+    """
+    with open(log_file_path, 'rb') as f:
+        head = f.read(len(XZ_MAGIC))
+    if head.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if head.startswith(BZIP2_MAGIC):
+        return 'bz2'
+    if head.startswith(XZ_MAGIC):
+        return 'xz'
+    return None
+
+
+def is_compressed(log_file_path: str) -> bool:
+    return detect_compression(log_file_path) is not None
+
+
+def open_log_stream(log_file_path: str, workers: Optional[int] = 1) -> BinaryIO:
+    """
+    로그 파일을 바이너리 스트림으로 엽니다. 압축된 파일이면 풀면서 읽는 스트림을 반환합니다.
+
+    Args:
+        log_file_path (str): 로그 파일 경로
+        workers (int): 여러 멤버로 된 gzip 을 풀 프로세스 수 (1 이면 순서대로 풂, None 이면 CPU 수)
+
+    Returns:
+        BinaryIO: read(size) 를 지원하는 바이너리 스트림
+    """
+    compression = detect_compression(log_file_path)
+    if compression is None:
+        return open(log_file_path, 'rb', buffering=0)
+
+    if compression == 'gzip' and workers != 1:
+        workers = workers or os.cpu_count() or 1
+        chunks = gzip_chunk_ranges(log_file_path)
+        if workers > 1 and len(chunks) > 1:
+            return io.BufferedReader(_BlockStream(iter_gzip_parallel(log_file_path, chunks, workers)),
+                                     buffer_size=INFLATE_BLOCK_SIZE)
+
+    return _OPENERS[compression](log_file_path, 'rb')
+
+
+def _candidate_offsets(log_file_path: str) -> List[int]:
+    """gzip 멤버 헤더로 보이는 위치 목록 (첫 위치는 항상 0)"""
+    offsets = [0]
+    with open(log_file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return offsets
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            find = mm.find
+            position = find(GZIP_MEMBER_HEADER, 1)
+            while position != -1:
+                # FLG 의 예약 비트(5-7)가 켜져 있으면 헤더가 아님
+                if position + 3 < size and not mm[position + 3] & 0xE0:
+                    offsets.append(position)
+                position = find(GZIP_MEMBER_HEADER, position + 1)
+    return offsets
+
+
+def gzip_chunk_ranges(log_file_path: str,
+                      chunk_size: int = DEFAULT_ARCHIVE_CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """
+    gzip 파일을 멤버 헤더 후보 위치에서 chunk_size 크기 정도의 압축 구간으로 나눕니다.
+    후보 중 일부는 실제 헤더가 아닐 수 있으며 iter_gzip_parallel 이 풀면서 바로잡습니다.
+    """
+    size = os.path.getsize(log_file_path)
+    starts = []
+    for offset in _candidate_offsets(log_file_path):
+        if not starts or offset - starts[-1] >= chunk_size:
+            starts.append(offset)
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def _inflate_members(log_file_path: str, start: int, end: int) -> Tuple[Optional[bytes], int]:
+    """
+    워커 프로세스에서 실행: start 의 멤버부터 풀어 end 이후 처음 끝나는 멤버까지의 내용과 그 끝 위치를 반환합니다.
+    start 가 실제 멤버 헤더가 아니면 (첫 멤버를 풀다가 오류가 나면) (None, start) 를 반환합니다.
+    """
+    parts = []
+    position = start
+    with open(log_file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(INFLATE_BLOCK_SIZE)
+        if not data.startswith(GZIP_MAGIC):
+            return None, start
+
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        first_member = True
+        while True:
+            try:
+                parts.append(decompressor.decompress(data))
+            except zlib.error:
+                if first_member:
+                    return None, start
+                raise
+            if not decompressor.eof:
+                data = f.read(INFLATE_BLOCK_SIZE)
+                if not data:
+                    if first_member:
+                        return None, start
+                    raise EOFError(f"gzip 멤버가 끝나기 전에 파일이 끝남: {log_file_path}")
+                continue
+
+            # 멤버가 끝남: 남은 데이터는 다음 멤버
+            data = decompressor.unused_data
+            position = f.tell() - len(data)
+            first_member = False
+            if position >= end:
+                break
+            if len(data) < len(GZIP_MAGIC):
+                data += f.read(INFLATE_BLOCK_SIZE)
+            if not data.startswith(GZIP_MAGIC):
+                # 파일 끝 (또는 마지막 멤버 뒤의 0 채움)
+                break
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    return b''.join(parts), position
+
+
+def iter_gzip_parallel(log_file_path: str, chunks: Optional[List[Tuple[int, int]]] = None,
+                       workers: Optional[int] = None, max_in_flight: Optional[int] = None) -> Iterator[bytes]:
+    """
+    여러 멤버로 된 gzip 을 구간별로 여러 프로세스에서 풀어 파일 순서대로 반환합니다.
+
+    각 구간은 자기 시작 위치의 멤버부터 구간 끝 이후 처음 끝나는 멤버까지 풉니다.
+    앞 구간이 실제 헤더가 아닌 후보 위치를 지나쳐 풀었으면 겹치는 구간의 결과는 버리고,
+    비는 곳이 생기면 현재 프로세스에서 풀어 채웁니다.
+
+    Args:
+        log_file_path (str): gzip 파일 경로
+        chunks (list): gzip_chunk_ranges 결과 (기본값: 새로 계산)
+        workers (int): 프로세스 수 (기본값: CPU 수)
+        max_in_flight (int): 동시에 풀고 있는 구간의 최대 개수 (메모리 사용량 제한, 기본값: workers * 2)
+
+    Yields:
+        bytes: 압축을 푼 내용 (이어 붙이면 파일 전체 내용)
+    """
+    chunks = chunks if chunks is not None else gzip_chunk_ranges(log_file_path)
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    size = os.path.getsize(log_file_path)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        position = 0
+
+        def drain_one() -> Iterator[bytes]:
+            nonlocal position
+            start, future = pending.popleft()
+            data, stop = future.result()
+            # 앞 구간이 이 구간을 지나쳐 풀었으면 버리고, 앞 구간 결과를 버려 비는 곳이 생기면 채움
+            while start > position:
+                gap, gap_end = _inflate_members(log_file_path, position, start)
+                if gap is None:
+                    raise OSError(f"gzip 멤버를 읽을 수 없음: {log_file_path} (위치 {position})")
+                position = gap_end
+                yield gap
+            if start == position and data is not None:
+                position = stop
+                yield data
+
+        for start, end in chunks:
+            pending.append((start, executor.submit(_inflate_members, log_file_path, start, end)))
+            if len(pending) >= max_in_flight:
+                yield from drain_one()
+
+        while pending:
+            yield from drain_one()
+
+    # 마지막 멤버 뒤에 남은 멤버가 있으면 (후보 위치를 모두 지나친 경우) 마저 풂
+    while position < size:
+        data, stop = _inflate_members(log_file_path, position, size)
+        if data is None or stop == position:
+            break
+        position = stop
+        yield data
+
+
+class _BlockStream(io.RawIOBase):
+    """bytes 블록 이터레이터를 읽기 전용 스트림으로 감쌈"""
+
+    def __init__(self, blocks: Iterator[bytes]):
+        self._blocks = blocks
+        self._block = memoryview(b'')
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._block:
+            block = next(self._blocks, None)
+            if block is None:
+                return 0
+            self._block = memoryview(block)
+        count = min(len(buffer), len(self._block))
+        buffer[:count] = self._block[:count]
+        self._block = self._block[count:]
+        return count
+
+    def close(self) -> None:
+        if not self.closed:
+            # 이터레이터를 닫아 워커 프로세스도 정리
+            close = getattr(self._blocks, 'close', None)
+            if close is not None:
+                close()
+        super().close()
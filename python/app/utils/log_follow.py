@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterator, List, Optional
+
+from app.utils.log_parser_utils import MappedLogSplitter
+
+# 같은 파일인지 확인할 때 비교하는 파일 앞부분 크기 (inode 재사용 대비)
+HEAD_DIGEST_BYTES = 1024
+
+
+@dataclass
+class FollowCheckpoint:
+    """
+    이어 읽기 위치 정보
+
+    offset 까지의 완전한 줄은 처리가 끝났고, 그중 다음 타임스탬프가 아직 나오지 않은
+    마지막 메시지는 pending_* 에 보관합니다.
+    """
+    inode: int = 0
+    device: int = 0
+    offset: int = 0
+    line: int = 1
+    head_digest: str = ''
+    pending_start_line: Optional[int] = None
+    pending_end_line: Optional[int] = None
+    pending_content: str = ''
+
+    @property
+    def has_pending(self) -> bool:
+        return self.pending_start_line is not None
+
+
+def head_digest(path: str, size: int) -> str:
+    """파일 앞부분(최대 HEAD_DIGEST_BYTES)의 해시 (같은 inode 가 다른 파일로 재사용되었는지 확인용)"""
+    with open(path, 'rb') as f:
+        head = f.read(min(size, HEAD_DIGEST_BYTES))
+    return hashlib.blake2b(head, digest_size=8).hexdigest()
+
+
+class LogFollower:
+    """
+    로그 파일을 마지막으로 읽은 위치부터 이어서 읽고, 완성된 메시지만 반환합니다.
+
+    메시지는 다음 타임스탬프 줄이 나타나야 끝난 것으로 보므로 파일의 마지막 메시지는
+    체크포인트에 보관했다가 다음 실행(또는 다음 poll)에서 이어 붙입니다.
+    파일이 교체(inode 변경)되거나 잘린 경우(크기 감소) 교체된 이전 파일(<경로>.1 또는 같은 inode 의 <경로>.*)을
+    찾으면 마지막 위치부터 끝까지 마저 읽고, 보관 중인 메시지를 내보낸 뒤 새 파일을 처음부터 읽습니다.
+
+    사용 예:
+        follower = LogFollower('nohup.out', 'nohup.out.checkpoint')
+        for message in follower.follow():
+            ...
+    """
+
+    def __init__(self, log_file_path: str, checkpoint_path: Optional[str] = None, encoding: Optional[str] = None):
+        """
+        Args:
+            log_file_path (str): 로그 파일 경로
+            checkpoint_path (str): 체크포인트 파일 경로 (None 이면 저장하지 않음)
+            encoding (str): 파일 인코딩 (기본값: 플랫폼 기본 인코딩)
+        """
+        self.log_file_path = log_file_path
+        self.checkpoint_path = checkpoint_path
+        self.encoding = encoding
+        self.checkpoint = self.load_checkpoint()
+
+    def load_checkpoint(self) -> FollowCheckpoint:
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                return FollowCheckpoint(**json.load(f))
+        return FollowCheckpoint()
+
+    def save_checkpoint(self) -> None:
+        """체크포인트를 임시 파일에 쓴 뒤 교체 (중간에 종료되어도 이전 체크포인트 유지)"""
+        if not self.checkpoint_path:
+            return
+        temp_path = f'{self.checkpoint_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(asdict(self.checkpoint), f, ensure_ascii=False)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def _is_same_file(self, stat: os.stat_result) -> bool:
+        checkpoint = self.checkpoint
+        if not checkpoint.inode:
+            return False
+        if (stat.st_ino, stat.st_dev) != (checkpoint.inode, checkpoint.device):
+            return False
+        if stat.st_size < checkpoint.offset:
+            return False
+        return head_digest(self.log_file_path, checkpoint.offset) == checkpoint.head_digest
+
+    def _is_rotated_file(self, path: str) -> bool:
+        """path 가 체크포인트의 파일(이름이 바뀌었거나 copytruncate 로 복사된 파일)인지 확인"""
+        checkpoint = self.checkpoint
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            return False
+        return size >= checkpoint.offset and head_digest(path, checkpoint.offset) == checkpoint.head_digest
+
+    def _find_rotated(self) -> Optional[str]:
+        """
+        교체 / 잘림 이전에 읽던 파일을 찾습니다.
+        logrotate 기본 이름인 <경로>.1 을 먼저 보고, 없으면 같은 디렉터리에서 inode 가 같은 <경로>.* 를 찾습니다.
+        (압축되어 inode 가 바뀐 파일은 찾지 않음)
+        """
+        checkpoint = self.checkpoint
+        if not checkpoint.inode or not checkpoint.offset:
+            return None
+
+        rotated_path = f'{self.log_file_path}.1'
+        if self._is_rotated_file(rotated_path):
+            return rotated_path
+
+        directory, name = os.path.split(os.path.abspath(self.log_file_path))
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith(name + '.') and entry.inode() == checkpoint.inode \
+                            and entry.stat().st_dev == checkpoint.device and self._is_rotated_file(entry.path):
+                        return entry.path
+        except OSError:
+            pass
+        return None
+
+    def _take_pending(self) -> Optional[dict]:
+        checkpoint = self.checkpoint
+        if not checkpoint.has_pending:
+            return None
+        message = {
+            'start_line': checkpoint.pending_start_line,
+            'end_line': checkpoint.pending_end_line,
+            'content': checkpoint.pending_content
+        }
+        checkpoint.pending_start_line = None
+        checkpoint.pending_end_line = None
+        checkpoint.pending_content = ''
+        return message
+
+    def _set_pending(self, start_line: int, end_line: int, content: str) -> None:
+        checkpoint = self.checkpoint
+        checkpoint.pending_start_line = start_line
+        checkpoint.pending_end_line = end_line
+        checkpoint.pending_content = content
+
+    def poll(self, final: bool = False) -> List[dict]:
+        """
+        마지막 위치 이후에 추가된 내용을 읽어 완성된 메시지 목록을 반환합니다. (체크포인트는 저장하지 않음)
+
+        Args:
+            final (bool): True 이면 줄바꿈으로 끝나지 않은 마지막 줄까지 읽음 (입력이 끝났을 때 사용)
+
+        Returns:
+            List[dict]: start_line, end_line, content 를 가진 메시지 (find_log_messages_by_file 과 같은 형식)
+        """
+        messages = []
+
+        try:
+            stat = os.stat(self.log_file_path)
+        except FileNotFoundError:
+            # 교체 도중 파일이 잠시 없을 수 있음
+            return messages
+
+        if not self._is_same_file(stat):
+            # 교체 / 잘림: 마지막 poll 이후 이전 파일에 추가된 내용을 끝까지 읽음
+            rotated_path = self._find_rotated()
+            if rotated_path is not None:
+                self._read(rotated_path, messages, to_end=True)
+            # 이전 파일의 마지막 메시지는 더 이어질 수 없으므로 완성된 것으로 처리
+            pending = self._take_pending()
+            if pending is not None:
+                messages.append(pending)
+            self.checkpoint = FollowCheckpoint(inode=stat.st_ino, device=stat.st_dev)
+
+        if stat.st_size == self.checkpoint.offset:
+            return messages
+
+        offset = self.checkpoint.offset
+        self._read(self.log_file_path, messages, to_end=final)
+        if self.checkpoint.offset != offset:
+            self.checkpoint.head_digest = head_digest(self.log_file_path, self.checkpoint.offset)
+
+        return messages
+
+    def _read(self, path: str, messages: List[dict], to_end: bool) -> None:
+        """
+        path 의 체크포인트 위치 이후 내용을 읽어 완성된 메시지를 messages 에 추가하고 위치를 옮깁니다.
+
+        Args:
+            path (str): 읽을 파일 (로그 파일 또는 교체된 이전 파일)
+            messages (List[dict]): 완성된 메시지를 추가할 목록
+            to_end (bool): False 이면 아직 쓰는 중일 수 있는 마지막 줄(줄바꿈 없음)은 다음 poll 에서 읽음
+        """
+        checkpoint = self.checkpoint
+        with MappedLogSplitter(path, self.encoding) as splitter:
+            if checkpoint.offset:
+                around = splitter.read_at(checkpoint.offset - 1, 2)
+                if around[:1] != b'\n' and around[1:] == b'\n':
+                    # 지난 final 읽기에서 줄바꿈 없이 읽은 마지막 줄의 줄바꿈 (이미 센 줄이므로 건너뜀)
+                    checkpoint.offset += 1
+            end = splitter.size if to_end else splitter.complete_lines_end(checkpoint.offset)
+            if end <= checkpoint.offset:
+                return
+
+            for span in splitter.iter_spans(checkpoint.offset, end, checkpoint.line):
+                content = splitter.read_content(span)
+                if span.start_line == 0 and checkpoint.has_pending:
+                    # 타임스탬프 없이 시작하는 줄은 보관 중인 메시지의 뒷부분
+                    self._set_pending(checkpoint.pending_start_line, span.end_line,
+                                      checkpoint.pending_content + content)
+                    continue
+
+                pending = self._take_pending()
+                if pending is not None:
+                    messages.append(pending)
+                self._set_pending(span.start_line, span.end_line, content)
+
+            checkpoint.line = checkpoint.pending_end_line + 1
+            checkpoint.offset = end
+
+    def flush(self) -> Optional[dict]:
+        """보관 중인 마지막 메시지를 완성된 것으로 꺼냄 (입력이 끝났을 때 사용)"""
+        return self._take_pending()
+
+    def read_new(self, final: bool = False) -> Iterator[dict]:
+        """
+        한 번 실행용: 새로 추가된 메시지를 반환한 뒤 체크포인트를 저장합니다.
+
+        Args:
+            final (bool): True 이면 줄바꿈으로 끝나지 않은 마지막 줄까지 읽고 마지막 메시지도 완성된 것으로 보고 반환
+        """
+        yield from self.poll(final)
+        if final:
+            pending = self.flush()
+            if pending is not None:
+                yield pending
+        self.save_checkpoint()
+
+    def follow(self, interval: float = 1.0, should_stop: Optional[Callable[[], bool]] = None) -> Iterator[dict]:
+        """
+        tail -f 처럼 파일을 계속 감시하며 다음 타임스탬프 줄이 나타나는 즉시 완성된 메시지를 반환합니다.
+        체크포인트는 반환한 메시지가 처리된 뒤(다음 메시지를 요청할 때) 저장됩니다.
+
+        Args:
+            interval (float): 새 내용이 없을 때 기다리는 시간 (초)
+            should_stop (Callable): True 를 반환하면 감시를 멈춤
+        """
+        while should_stop is None or not should_stop():
+            messages = self.poll()
+            yield from messages
+            self.save_checkpoint()
+            if not messages:
+                time.sleep(interval)
@@ -0,0 +1,307 @@
+"""
+로그 파일의 타임스탬프 희소 색인
+
+메시지 N 개마다 (타임스탬프, 바이트 위치, 줄 번호) 를 사이드카 파일(<로그>.tsidx)에 기록해 두고,
+시간 범위 조회 시 색인을 이진 탐색하여 해당 위치로 바로 이동한 뒤 범위 안의 바이트만 메시지로 나눕니다.
+로그가 늘어나면 마지막으로 색인한 위치부터 이어서 색인합니다.
+
+실행:
+    python -m app.utils.log_index build nohup.out
+    python -m app.utils.log_index query nohup.out --since '2025-07-01 10:00' --until '2025-07-01 10:05'
+"""
+import argparse
+import json
+import os
+from bisect import bisect_left
+from dataclasses import asdict, dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+from app.utils.log_follow import head_digest
+from app.utils.log_parser_utils import in_time_range
+from app.utils.log_reader import MappedLogSplitter
+
+# 색인 파일 형식 버전
+INDEX_VERSION = 1
+
+# 기본 색인 간격 (메시지 수)
+DEFAULT_INTERVAL = 1000
+
+# 색인 파일 확장자
+INDEX_SUFFIX = '.tsidx'
+
+# 색인에 기록하는 타임스탬프 길이 ('YYYY-MM-DD HH:MM:SS')
+TIMESTAMP_LENGTH = 19
+
+
+@dataclass
+class TimestampIndex:
+    """
+    희소 색인 내용
+
+    timestamps / offsets / lines 는 같은 길이의 목록으로 각 항목이 색인된 메시지 하나입니다.
+    indexed_offset 까지의 완전한 줄이 색인되었고, pending 은 마지막 색인 항목 이후 센 메시지 수입니다.
+    """
+    interval: int = DEFAULT_INTERVAL
+    inode: int = 0
+    device: int = 0
+    head_digest: str = ''
+    indexed_offset: int = 0
+    indexed_line: int = 1
+    pending: int = 0
+    timestamps: List[str] = field(default_factory=list)
+    offsets: List[int] = field(default_factory=list)
+    lines: List[int] = field(default_factory=list)
+    version: int = INDEX_VERSION
+
+
+def index_path_for(log_file_path: str) -> str:
+    return log_file_path + INDEX_SUFFIX
+
+
+class LogIndex:
+    """
+    로그 파일 하나의 희소 타임스탬프 색인
+
+    사용 예:
+        index = LogIndex('nohup.out')
+        for message in index.query('2025-07-01 10:00', '2025-07-01 10:05'):
+            ...
+    """
+
+    def __init__(self, log_file_path: str, index_path: Optional[str] = None, interval: int = DEFAULT_INTERVAL,
+                 encoding: Optional[str] = None):
+        """
+        Args:
+            log_file_path (str): 로그 파일 경로
+            index_path (str): 색인 파일 경로 (기본값: <로그 파일>.tsidx)
+            interval (int): 색인 간격 (메시지 수, 새로 만들 때만 사용)
+            encoding (str): 파일 인코딩 (기본값: 플랫폼 기본 인코딩)
+        """
+        self.log_file_path = log_file_path
+        self.index_path = index_path or index_path_for(log_file_path)
+        self.interval = interval
+        self.encoding = encoding
+        self.index = self.load()
+
+    def load(self) -> TimestampIndex:
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                return TimestampIndex(**data)
+        return TimestampIndex(interval=self.interval)
+
+    def save(self) -> None:
+        """색인을 임시 파일에 쓴 뒤 교체"""
+        temp_path = f'{self.index_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(asdict(self.index), f)
+        os.replace(temp_path, self.index_path)
+
+    def _is_valid(self, stat: os.stat_result) -> bool:
+        """색인이 현재 파일의 앞부분에 대한 것인지 (교체 / 잘림이 없었는지)"""
+        index = self.index
+        if (stat.st_ino, stat.st_dev) != (index.inode, index.device) or stat.st_size < index.indexed_offset:
+            return False
+        return head_digest(self.log_file_path, index.indexed_offset) == index.head_digest
+
+    def update(self, save: bool = True) -> int:
+        """
+        마지막으로 색인한 위치 이후를 색인합니다. 파일이 교체되었거나 잘렸으면 처음부터 다시 만듭니다.
+
+        Args:
+            save (bool): 색인 파일에 저장할지 여부
+
+        Returns:
+            int: 새로 추가한 색인 항목 수
+        """
+        stat = os.stat(self.log_file_path)
+        if not self._is_valid(stat):
+            self.index = TimestampIndex(interval=self.index.interval or self.interval,
+                                        inode=stat.st_ino, device=stat.st_dev)
+        index = self.index
+        if stat.st_size == index.indexed_offset:
+            return 0
+
+        added = 0
+        with MappedLogSplitter(self.log_file_path, self.encoding) as splitter:
+            # 아직 쓰는 중일 수 있는 마지막 줄은 다음에 색인
+            end = splitter.complete_lines_end(index.indexed_offset)
+            position = index.indexed_offset
+            line = index.indexed_line
+            pending = index.pending
+
+            # 경계마다 줄 수를 세지 않고 색인할 경계에서만 앞 구간의 줄 수를 한 번에 셈
+            for boundary in splitter.iter_boundaries(index.indexed_offset, end):
+                if not index.offsets or pending >= index.interval:
+                    line += splitter.count_lines(position, boundary)
+                    position = boundary
+                    index.timestamps.append(splitter.read_at(boundary, TIMESTAMP_LENGTH).decode('ascii'))
+                    index.offsets.append(boundary)
+                    index.lines.append(line)
+                    pending = 0
+                    added += 1
+                pending += 1
+
+            index.indexed_line = line + splitter.count_lines(position, end)
+            index.indexed_offset = end
+            index.pending = pending
+
+        index.head_digest = head_digest(self.log_file_path, index.indexed_offset)
+        if save:
+            self.save()
+        return added
+
+    def seek_range(self, since: Optional[str] = None, until: Optional[str] = None) -> Tuple[int, Optional[int], int]:
+        """
+        시간 범위의 메시지가 들어 있는 바이트 구간
+
+        Returns:
+            tuple: (시작 위치, 끝 위치 (None 이면 파일 끝), 시작 위치의 줄 번호)
+        """
+        index = self.index
+        start, line = 0, 1
+        if since is not None:
+            # since 보다 이른 마지막 색인 항목부터 (그 사이 메시지에 범위 안의 것이 있을 수 있음)
+            position = bisect_left(index.timestamps, since) - 1
+            if position >= 0:
+                start, line = index.offsets[position], index.lines[position]
+
+        end = None
+        if until is not None:
+            # until 보다 늦은 첫 색인 항목 앞까지 (타임스탬프를 until 의 자릿수까지 비교)
+            position = bisect_left(index.timestamps, until + '\uffff')
+            if position < len(index.timestamps):
+                end = index.offsets[position]
+        return start, end, line
+
+    def query(self, since: Optional[str] = None, until: Optional[str] = None,
+              update: bool = True) -> Iterator[dict]:
+        """
+        시간 범위 안의 메시지를 반환합니다.
+
+        Args:
+            since (str): 시작 ('YYYY-MM-DD HH:MM:SS' 의 앞부분)
+            until (str): 끝 (지정한 자릿수까지 포함)
+            update (bool): 조회 전에 색인을 갱신할지 여부
+
+        Yields:
+            dict: start_line, end_line, content 를 가진 메시지
+        """
+        if update:
+            self.update()
+        start, end, line = self.seek_range(since, until)
+        return iter_messages_between(self.log_file_path, start, end, line, since, until, self.encoding)
+
+
+def iter_messages_between(log_file_path: str, start: int, end: Optional[int], first_line: int,
+                          since: Optional[str] = None, until: Optional[str] = None,
+                          encoding: Optional[str] = None) -> Iterator[dict]:
+    """[start, end) 구간을 메시지로 나누고 시간 범위 안의 메시지만 반환 (byte_offset 은 파일 안의 메시지 시작 위치)"""
+    with MappedLogSplitter(log_file_path, encoding) as splitter:
+        for span in splitter.iter_spans(start, end, first_line):
+            timestamp = splitter.read_at(span.byte_offset, TIMESTAMP_LENGTH).decode('ascii', 'replace') \
+                if span.start_line else None
+            if in_time_range(timestamp, since, until):
+                yield {
+                    'start_line': span.start_line,
+                    'end_line': span.end_line,
+                    'byte_offset': span.byte_offset,
+                    'content': splitter.read_content(span)
+                }
+
+
+def _first_boundary_at_or_after(splitter: MappedLogSplitter, key: str, inclusive: bool) -> int:
+    """
+    색인이 없을 때 파일을 직접 이진 탐색: 타임스탬프가 key 이상(inclusive=False 이면 key 자릿수까지 비교해 초과)인
+    첫 메시지 경계 위치 (없으면 파일 크기). 타임스탬프가 대체로 시간 순이라고 가정합니다.
+    """
+    size = splitter.size
+    length = len(key)
+
+    def reached(boundary: Optional[int]) -> bool:
+        if boundary is None:
+            return True
+        timestamp = splitter.read_at(boundary, TIMESTAMP_LENGTH).decode('ascii', 'replace')
+        return timestamp >= key if inclusive else timestamp[:length] > key
+
+    low, high = 0, size
+    while low < high:
+        middle = (low + high) // 2
+        boundary = splitter.find_boundary(middle)
+        if reached(boundary):
+            high = middle
+        else:
+            low = boundary + 1
+    boundary = splitter.find_boundary(low)
+    return size if boundary is None else boundary
+
+
+def query_without_index(log_file_path: str, since: Optional[str] = None, until: Optional[str] = None,
+                        encoding: Optional[str] = None, line_numbers: bool = False) -> Iterator[dict]:
+    """
+    색인 없이 파일을 이진 탐색하여 시간 범위의 메시지를 반환합니다.
+    읽는 양은 범위 안의 메시지와 이진 탐색 위치뿐이므로 범위가 파일 뒤쪽에 있어도 파일 크기와 관계없이 빠릅니다.
+
+    파일 기준 줄 번호를 알려면 시작 위치 앞의 파일 전체를 세어야 하므로 기본값으로는 세지 않습니다.
+    이때 start_line / end_line 은 범위의 첫 메시지를 1 로 하는 상대 줄 번호이고,
+    파일 안의 위치는 byte_offset 으로 알 수 있습니다.
+    (파일 기준 줄 번호가 필요하면 line_numbers=True 또는 색인(LogIndex)을 사용)
+
+    Args:
+        log_file_path (str): 로그 파일 경로
+        since (str): 시작 시각 (이 시각 이후 메시지)
+        until (str): 종료 시각 (이 시각까지의 메시지)
+        encoding (str): 파일 인코딩
+        line_numbers (bool): True 이면 시작 위치 앞의 줄바꿈을 세어 파일 기준 줄 번호를 붙임
+    """
+    with MappedLogSplitter(log_file_path, encoding) as splitter:
+        if splitter.size == 0:
+            return iter(())
+        start = _first_boundary_at_or_after(splitter, since, True) if since is not None else 0
+        end = _first_boundary_at_or_after(splitter, until, False) if until is not None else None
+        line = splitter.count_lines(0, start) + 1 if line_numbers else 1
+    if end is not None and end <= start:
+        return iter(())
+    return iter_messages_between(log_file_path, start, end, line, since, until, encoding)
+
+
+def query_time_range(log_file_path: str, since: Optional[str] = None, until: Optional[str] = None,
+                     use_index: bool = True, encoding: Optional[str] = None) -> Iterator[dict]:
+    """
+    시간 범위 조회: 색인 파일이 있거나 use_index=True 이면 색인을 만들거나 갱신해서 사용하고,
+    그렇지 않으면 파일을 직접 이진 탐색합니다. (이때 줄 번호는 query_without_index 와 같이 범위 기준)
+    """
+    if use_index or os.path.exists(index_path_for(log_file_path)):
+        return LogIndex(log_file_path, encoding=encoding).query(since, until)
+    return query_without_index(log_file_path, since, until, encoding)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로그 타임스탬프 희소 색인")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="색인을 만들거나 이어서 갱신")
+    build_parser.add_argument('log_file')
+    build_parser.add_argument('--interval', type=int, default=DEFAULT_INTERVAL, help="색인 간격 (메시지 수)")
+
+    query_parser = subparsers.add_parser('query', help="시간 범위의 메시지 출력")
+    query_parser.add_argument('log_file')
+    query_parser.add_argument('--since', default=None)
+    query_parser.add_argument('--until', default=None)
+    query_parser.add_argument('--no-index', action='store_true',
+                              help="색인 없이 파일을 직접 이진 탐색 (줄 번호는 범위의 첫 메시지 기준)")
+    query_parser.add_argument('--line-numbers', action='store_true',
+                              help="--no-index 에서 파일 앞부분을 세어 파일 기준 줄 번호를 출력")
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        log_index = LogIndex(args.log_file, interval=args.interval)
+        added = log_index.update()
+        print(f"색인 항목 {added}개 추가 (전체 {len(log_index.index.offsets)}개): {log_index.index_path}")
+    else:
+        messages = (query_without_index(args.log_file, args.since, args.until, line_numbers=args.line_numbers)
+                    if args.no_index
+                    else query_time_range(args.log_file, args.since, args.until))
+        for message in messages:
+            print(f"[{message['start_line']}-{message['end_line']}] {message['content']}", end='')
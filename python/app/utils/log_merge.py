@@ -0,0 +1,88 @@
+"""
+여러 로그 파일의 메시지를 타임스탬프 순서로 합치기
+
+인스턴스마다 따로 쓰는 로그 파일(또는 회전된 파일 묶음)을 각각 메시지로 나누면서
+힙으로 k-way 병합하여 하나의 시간 순서로 반환합니다. 파일을 이어 붙이거나 정렬하지 않으며,
+병합 중에 보관하는 메시지는 입력마다 하나이고 메모리는 입력마다 읽기 블록(MERGE_BUFFER_SIZE) 하나만큼 사용합니다.
+
+사용 예:
+    for message in iter_merged_messages(['app1/nohup.out', 'app2/nohup.out'], rotated=True):
+        print(message['source'], message['start_line'], message['content'])
+"""
+import glob
+import heapq
+import re
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from app.utils.log_reader import LogReader
+
+# 병합 기준 타임스탬프 (밀리초가 있으면 포함해서 비교)
+merge_key_pattern = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:[.,]\d+)?')
+
+# 입력마다 한 번에 읽는 크기 (입력 수만큼 동시에 보관하므로 단일 파일 읽기보다 작게)
+MERGE_BUFFER_SIZE = 256 * 1024
+
+# 회전된 파일 이름의 번호 (nohup.out.1, nohup.out.2.gz 등)
+_ROTATION_NUMBER = re.compile(r'\.(\d+)(?:\.(?:gz|bz2|xz))?$')
+
+# 입력 하나: 파일 경로 또는 순서대로 이어 읽을 파일 경로 목록 (회전된 파일 묶음)
+MergeSource = Union[str, Sequence[str]]
+
+
+def rotation_set(log_file_path: str) -> List[str]:
+    """
+    로그 파일과 회전된 파일들(<파일>.1, <파일>.2.gz ...)을 오래된 것부터 나열합니다.
+    번호가 클수록 오래된 파일로 보며 현재 파일이 마지막입니다.
+    """
+    rotated = []
+    for path in glob.glob(glob.escape(log_file_path) + '.*'):
+        match = _ROTATION_NUMBER.match(path, len(log_file_path))
+        if match:
+            rotated.append((int(match.group(1)), path))
+    return [path for _, path in sorted(rotated, reverse=True)] + [log_file_path]
+
+
+def _iter_keyed_messages(paths: Sequence[str], encoding: Optional[str]) -> Iterator[Tuple[str, dict]]:
+    """
+    입력 하나의 (병합 기준, 메시지) 를 파일 순서대로 반환합니다. 메시지에는 source(파일 경로)가 붙습니다.
+    타임스탬프가 없는 메시지(첫 타임스탬프 이전의 줄)는 앞 메시지의 기준을 이어받아 같은 입력 안의 순서를 유지합니다.
+    """
+    key = ''
+    match_key = merge_key_pattern.match
+    reader = LogReader(encoding=encoding, buffer_size=MERGE_BUFFER_SIZE)
+    for path in paths:
+        for message in reader.iter_messages(path):
+            match = match_key(message['content'])
+            if match:
+                key = match.group(0)
+            message['source'] = path
+            yield key, message
+
+
+def iter_merged_messages(sources: Iterable[MergeSource], encoding: Optional[str] = None,
+                         rotated: bool = False) -> Iterator[dict]:
+    """
+    여러 로그 파일의 메시지를 타임스탬프 순서로 병합합니다.
+
+    각 입력은 파일 안에서 시간 순서라고 가정합니다. 입력 안의 순서는 항상 유지되며,
+    타임스탬프가 같으면 앞에 지정한 입력의 메시지가 먼저 나옵니다.
+
+    Args:
+        sources: 로그 파일 경로 또는 순서대로 이어 읽을 파일 경로 목록 (압축 파일 포함)
+        encoding (str): 파일 인코딩 (기본값: 플랫폼 기본 인코딩)
+        rotated (bool): 경로 하나로 지정한 입력을 회전된 파일 묶음(rotation_set)으로 확장할지 여부
+
+    Yields:
+        dict: start_line, end_line, content, source 를 가진 메시지 (줄 번호는 source 파일 기준)
+    """
+    streams = []
+    for source in sources:
+        if isinstance(source, str):
+            paths = rotation_set(source) if rotated else [source]
+        else:
+            paths = list(source)
+        streams.append(_iter_keyed_messages(paths, encoding))
+
+    for _, message in heapq.merge(*streams, key=itemgetter(0)):
+        yield message
@@ -1,8 +1,11 @@
 import re
-from typing import List
+from typing import Iterator, List, Optional
 
-from app.utils.xml_utils import XMLLogExtractor
+from app.utils.xml_utils import get_xml_extractor
 from app.utils.file_utils import is_file_path
+from app.utils.metrics import instrument, instrument_iter
+# 메시지 분리 엔진은 log_reader 로 옮겨졌으며 기존 경로로도 사용할 수 있도록 다시 내보냄
+from app.utils.log_reader import LogMessageSpan, LogReader, MappedLogSplitter, read_log_records, start_pattern_bytes
 
 # 로그의 메시지를 구분하기 위한 패턴 정보
 pattern_msg_splite = r'( : )'
@@ -10,6 +13,54 @@ pattern_msg_splite = r'( : )'
 # 로그의 시작 메시지를 구분하는 패펀 정보 (타임 스탬프)
 start_pattern = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}')
 
+
+@instrument_iter()
+def iter_log_messages_by_file(log_file_path: str, encoding: Optional[str] = None,
+                              decompress_workers: Optional[int] = 1) -> Iterator[dict]:
+    """
+    find_log_messages_by_file 의 제너레이터 버전. 메시지를 하나씩 dict 로 반환합니다.
+    gzip / bz2 / xz 로 압축된 로그 파일(nohup.out.1.gz 등)은 풀면서 읽습니다.
+
+    Args:
+        log_file_path (str): 로그 파일 경로
+        encoding (str): 파일 인코딩 (기본값: 플랫폼 기본 인코딩)
+        decompress_workers (int): 여러 멤버로 된 gzip 파일을 풀 프로세스 수 (None 이면 CPU 수)
+
+    Yields:
+        dict: start_line, end_line, content 를 가진 메시지
+    """
+    return LogReader(encoding=encoding, decompress_workers=decompress_workers).iter_messages(log_file_path)
+
+
+def get_message_timestamp(content):
+    """
+    :param content: 로그 메시지
+    :return: 메시지 시작 부분의 타임스탬프 문자열 (없으면 None)
+    """
+    match = start_pattern.match(content)
+    return match.group(0) if match else None
+
+
+def in_time_range(timestamp: Optional[str], since: Optional[str] = None, until: Optional[str] = None) -> bool:
+    """
+    타임스탬프가 [since, until] 범위 안인지 확인합니다. (문자열 비교)
+    until 은 지정한 자릿수까지 비교하므로 '2025-07-01 10' 은 10시 59분 59초까지 포함합니다.
+
+    Args:
+        timestamp (str): 'YYYY-MM-DD HH:MM:SS' 형식 타임스탬프 (None 이면 범위 밖)
+        since (str): 시작 (None 이면 제한 없음)
+        until (str): 끝 (None 이면 제한 없음)
+    """
+    if timestamp is None:
+        return False
+    if since is not None and timestamp < since:
+        return False
+    if until is not None and timestamp[:len(until)] > until:
+        return False
+    return True
+
+
+@instrument()
 def find_log_messages(str_info):
     """
     :param str_info: 문자열 데이터
@@ -21,25 +72,10 @@ def find_log_messages(str_info):
         return find_log_messages_by_string(str_info)
 
 
+@instrument()
 def find_log_messages_by_file(log_file_path):
     # 로그 메시지 시작 패턴 (예: 타임스탬프로 시작하는 경우)
-    messages = []
-    current_message = []
-    start_pos = 0
-
-    with open(log_file_path, 'r') as file:
-        for line_num, line in enumerate(file, 1):
-            current_message, start_pos = get_log_data_by_line(current_message, line, line_num, messages, start_pattern, start_pos)
-
-        # 마지막 메시지 추가
-        if current_message:
-            messages.append({
-                'start_line': start_pos,
-                'end_line': line_num,
-                'content': ''.join(current_message)
-            })
-
-    return messages
+    return list(iter_log_messages_by_file(log_file_path))
 
 
 def get_log_data_by_line(current_message, line, line_num, messages, start_pattern, start_pos):
@@ -56,6 +92,7 @@ def get_log_data_by_line(current_message, line, line_num, messages, start_patter
     return current_message, start_pos
 
 
+@instrument()
 def find_log_messages_by_string(source):
     # 로그 메시지 시작 패턴 (예: 타임스탬프로 시작하는 경우)
     messages = []
@@ -79,26 +116,11 @@ def find_log_messages_by_string(source):
 
 
 # 특정 XML 블록만 추출하여 포맷팅하는 예시
+@instrument()
 def extract_and_format_specific_xml(log_text: str, target_tag: str = None) -> List[str]:
-    extractor = XMLLogExtractor()
-    xml_blocks = extractor.find_xml_blocks(log_text)
-
-    formatted_blocks = []
-    for block in xml_blocks:
-        if target_tag is None or block.tag == target_tag:
-            formatted_blocks.append(extractor.to_xml_string(block))
-
-    return formatted_blocks
+    return get_xml_extractor(target_tag).extract(log_text)
 
 # 특정 XML 블록만 추출하여 포맷팅하는 예시
+@instrument()
 def show_xml_single_line(log_text: str, target_tag: str = None) -> List[str]:
-    extractor = XMLLogExtractor()
-    xml_blocks = extractor.find_xml_blocks(log_text)
-
-    formatted_blocks = []
-    for block in xml_blocks:
-        if target_tag is None or block.tag == target_tag:
-            formatted_blocks.append(extractor.to_single_line_xml(block))
-
-    return formatted_blocks
-
+    return get_xml_extractor(target_tag).extract_single_line(log_text)
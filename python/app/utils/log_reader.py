@@ -0,0 +1,474 @@
+import codecs
+import locale
+import mmap
+import os
+import re
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional, Union
+
+from app.utils.log_archive import open_log_stream
+
+# 메시지 시작 패턴은 줄의 시작(^)에서 한 줄 안에서만 일치해야 합니다.
+# timestamp / component / level 이름의 그룹이 있으면 레코드에 채워집니다.
+
+# 타임스탬프로 시작하는 메시지. find_log_messages_by_file 의 경계와 같음
+timestamp_start_pattern = re.compile(r'^(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', re.MULTILINE)
+
+# 타임스탬프(밀리초 포함) + [컴포넌트] 로 시작하는 메시지. process_log_file 의 경계와 같음
+component_start_pattern = re.compile(
+    r'^(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}.\d{3}) \[(?P<component>[^\]\n]+)\]',
+    re.MULTILINE
+)
+
+# component_start_pattern 과 같은 경계에서 뒤따르는 로그 레벨까지 읽음
+# (레벨은 전방 탐색으로만 읽으므로 헤더 범위는 같음, 경계 탐색이 조금 느려짐)
+component_level_start_pattern = re.compile(
+    component_start_pattern.pattern
+    + r'(?=[ \t]+(?P<level>TRACE|DEBUG|INFO|WARN|WARNING|ERROR|FATAL)\b|)',
+    re.MULTILINE
+)
+
+# mmap 스캔용 바이트 패턴 (바이트 위치가 필요한 MappedLogSplitter 에서 사용)
+start_pattern_bytes = re.compile(rb'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}', re.MULTILINE)
+
+# 줄 수를 셀 때 한 번에 복사하는 크기
+COUNT_CHUNK_SIZE = 16 * 1024 * 1024
+
+# 한 번에 읽어 디코딩하는 크기
+DEFAULT_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+class LogMessageSpan(NamedTuple):
+    """파일 안에서 하나의 로그 메시지가 차지하는 위치 정보"""
+    start_line: int
+    end_line: int
+    byte_offset: int
+    byte_length: int
+
+
+# 레코드에 채우는 헤더 그룹 이름
+_HEADER_GROUPS = ('timestamp', 'component', 'level')
+_NO_HEADER = {'timestamp': None, 'component': None, 'level': None, 'header_length': 0}
+
+# 패턴의 이름 있는 그룹 시작 ('(?P<name>' 을 '(?:' 로 바꿔 값을 만들지 않는 경계 패턴을 만듦)
+_named_group_pattern = re.compile(r'(?<!\\)\(\?P<\w+>')
+
+
+class MappedLogSplitter:
+    """
+    로그 파일을 mmap 으로 열어 시작 패턴 경계 단위로 메시지를 지연 분리합니다.
+
+    메시지 내용은 read_content() 를 호출할 때만 디코딩하므로
+    파일 전체를 메모리에 올리지 않고 수 GB 로그를 순회할 수 있습니다.
+
+    사용 예:
+        with MappedLogSplitter('nohup.out') as splitter:
+            for span in splitter:
+                content = splitter.read_content(span)
+    """
+
+    def __init__(self, log_file_path: str, encoding: Optional[str] = None, errors: str = 'strict',
+                 pattern: re.Pattern = start_pattern_bytes):
+        """
+        Args:
+            log_file_path (str): 로그 파일 경로
+            encoding (str): 파일 인코딩 (기본값: 기존 open(..., 'r') 과 같은 플랫폼 기본 인코딩)
+            errors (str): 디코딩 오류 처리 방식 ('strict', 'replace' 등)
+            pattern (re.Pattern): MULTILINE 으로 컴파일된 메시지 시작 바이트 패턴
+        """
+        self.log_file_path = log_file_path
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self.errors = errors
+        self.pattern = pattern
+        self._file = None
+        self._mm = None
+
+    def open(self):
+        self._file = open(self.log_file_path, 'rb')
+        try:
+            # 빈 파일은 mmap 할 수 없음
+            if self._file.seek(0, 2) > 0:
+                self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            self._file = None
+            raise
+        return self
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __iter__(self) -> Iterator[LogMessageSpan]:
+        return self.iter_spans()
+
+    @property
+    def size(self) -> int:
+        return len(self._mm) if self._mm is not None else 0
+
+    def iter_spans(self, start: int = 0, end: Optional[int] = None, first_line: int = 1) -> Iterator[LogMessageSpan]:
+        """
+        [start, end) 바이트 구간을 메시지 단위로 나누어 LogMessageSpan 을 순서대로 반환합니다.
+
+        Args:
+            start (int): 탐색 시작 바이트 위치 (줄의 시작이어야 함)
+            end (int): 탐색 종료 바이트 위치 (기본값: 파일 끝)
+            first_line (int): start 위치의 줄 번호
+
+        Note:
+            첫 타임스탬프 이전에 있는 줄들은 기존 구현과 같이 start_line 0 인 메시지로 반환됩니다.
+        """
+        mm = self._mm
+        if mm is None:
+            return
+        if end is None:
+            end = len(mm)
+
+        pattern = self.pattern
+        line = first_line
+        msg_start = start
+        # 구간 시작이 경계가 아니면 첫 메시지는 타임스탬프 이전 내용 (start_line 0)
+        msg_line = first_line if pattern.match(mm, start, end) else 0
+
+        for match in pattern.finditer(mm, start, end):
+            boundary = match.start()
+            if boundary == msg_start:
+                continue
+            line_count = mm[msg_start:boundary].count(b'\n')
+            yield LogMessageSpan(msg_line, line + line_count - 1, msg_start, boundary - msg_start)
+            line += line_count
+            msg_start = boundary
+            msg_line = line
+
+        if msg_start < end:
+            chunk = mm[msg_start:end]
+            line_count = chunk.count(b'\n')
+            if not chunk.endswith(b'\n'):
+                line_count += 1
+            yield LogMessageSpan(msg_line, line + line_count - 1, msg_start, end - msg_start)
+
+    def find_boundary(self, pos: int) -> Optional[int]:
+        """pos 이후 처음 나타나는 메시지 시작(타임스탬프) 위치, 없으면 None"""
+        if self._mm is None:
+            return None
+        match = self.pattern.search(self._mm, pos)
+        return match.start() if match else None
+
+    def iter_boundaries(self, start: int = 0, end: Optional[int] = None) -> Iterator[int]:
+        """[start, end) 안의 메시지 시작 위치를 순서대로 반환 (줄 수는 세지 않음)"""
+        if self._mm is None:
+            return iter(())
+        end = len(self._mm) if end is None else end
+        return (match.start() for match in self.pattern.finditer(self._mm, start, end))
+
+    def count_lines(self, start: int, end: int) -> int:
+        """[start, end) 안의 줄바꿈 수 (큰 구간은 COUNT_CHUNK_SIZE 단위로 나누어 셈)"""
+        mm = self._mm
+        if mm is None:
+            return 0
+        count = 0
+        for chunk_start in range(start, end, COUNT_CHUNK_SIZE):
+            count += mm[chunk_start:min(chunk_start + COUNT_CHUNK_SIZE, end)].count(b'\n')
+        return count
+
+    def read_at(self, offset: int, length: int) -> bytes:
+        return self._mm[offset:offset + length] if self._mm is not None else b''
+
+    def complete_lines_end(self, start: int = 0) -> int:
+        """start 이후 마지막 줄바꿈 바로 다음 위치 (아직 쓰는 중인 마지막 줄을 제외한 끝), 없으면 start"""
+        if self._mm is None:
+            return start
+        newline = self._mm.rfind(b'\n', start)
+        return newline + 1 if newline >= 0 else start
+
+    def read_bytes(self, span: LogMessageSpan) -> bytes:
+        return self._mm[span.byte_offset:span.byte_offset + span.byte_length]
+
+    def read_content(self, span: LogMessageSpan) -> str:
+        """메시지 내용을 디코딩 (텍스트 모드 open 과 같이 줄바꿈을 '\\n' 으로 통일)"""
+        content = self.read_bytes(span).decode(self.encoding, self.errors)
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
+
+
+class LogReader:
+    """
+    로그 파일 / 바이너리 스트림을 시작 패턴으로 나누어 레코드(dict)를 반환하는 공통 읽기 엔진
+
+    입력을 buffer_size 단위로 읽어 지정한 인코딩 / 오류 처리 방식으로 한 번에 디코딩하고,
+    미리 컴파일한 패턴으로 버퍼 전체에서 메시지 경계를 찾습니다.
+    (줄마다 정규식을 호출하지 않음) 파일 경로와 표준 입력 / 파이프 모두 같은 방식으로 처리합니다.
+    gzip / bz2 / xz 로 압축된 파일 경로는 풀면서 읽습니다. (log_archive.open_log_stream)
+
+    사용 예:
+        reader = LogReader(component_level_start_pattern, encoding='utf-8', errors='replace')
+        for record in reader.iter_records('nohup.out'):
+            print(record['timestamp'], record['component'], record['level'], record['content'])
+    """
+
+    def __init__(self, pattern: re.Pattern = timestamp_start_pattern, encoding: Optional[str] = None,
+                 errors: str = 'strict', buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 decompress_workers: Optional[int] = 1):
+        """
+        Args:
+            pattern (re.Pattern): ^ 로 시작하는 메시지 시작 문자열 패턴
+            encoding (str): 인코딩 (기본값: 기존 open(..., 'r') 과 같은 플랫폼 기본 인코딩)
+            errors (str): 디코딩 오류 처리 방식 ('strict', 'replace' 등)
+            buffer_size (int): 한 번에 읽는 크기 (바이트)
+            decompress_workers (int): 여러 멤버로 된 gzip 파일을 풀 프로세스 수 (None 이면 CPU 수)
+        """
+        self.pattern = pattern
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self.errors = errors
+        self.buffer_size = buffer_size
+        self.decompress_workers = decompress_workers
+        # 줄바꿈 바로 뒤에서만 패턴을 검사해서 나누는 정규식 ('\n' 로 시작하므로 빠르게 후보를 찾음)
+        # split 결과는 [내용, 헤더, 패턴 그룹..., 내용, 헤더, 패턴 그룹..., 내용] 이고 경계 앞의 '\n' 은 빠짐
+        flags = pattern.flags | re.MULTILINE
+        self._split = re.compile(r'\n(?=(' + pattern.pattern + r'))', flags).split
+        self._stride = pattern.groups + 2
+        # iter_entries 용: 헤더와 뒤따르는 공백까지 소비하므로 내용은 헤더 뒤의 본문
+        # (헤더 문자열은 만들지 않으므로 결과는 [본문, 패턴 그룹..., 본문, ...])
+        self._split_bodies = re.compile(r'\n(?:' + pattern.pattern + r')[ \t]*', flags).split
+        # iter_messages 용: 헤더 정보가 필요 없으므로 이름 있는 그룹의 값을 만들지 않음
+        message_split = re.compile(r'\n(?=' + _named_group_pattern.sub('(?:', pattern.pattern) + r')', flags)
+        self._split_messages = message_split.split
+        self._message_stride = message_split.groups + 1
+        # 헤더 위치(내용 다음 칸) 기준으로 timestamp / component / level 그룹의 위치 (없으면 None)
+        self._header_offsets = tuple(pattern.groupindex[name] if name in pattern.groupindex else None
+                                     for name in _HEADER_GROUPS)
+
+    def iter_records(self, source: Union[str, os.PathLike, BinaryIO]) -> Iterator[dict]:
+        """
+        Args:
+            source: 파일 경로 (압축 파일 포함) 또는 바이너리 모드로 열린 파일 객체 (sys.stdin.buffer 등)
+
+        Yields:
+            dict: 입력 순서대로 나눈 메시지. start_line, end_line, content 에 헤더 정보
+                timestamp, component, level (패턴에 해당 그룹이 없으면 None) 와
+                header_length (content 안에서 시작 패턴과 일치한 부분의 길이) 가 추가됩니다.
+                첫 패턴 이전의 줄들은 start_line 0, 헤더 정보 None 인 레코드가 됩니다.
+        """
+        yield from self._iter_source(source, self._iter_batches, True)
+
+    def iter_messages(self, source: Union[str, os.PathLike, BinaryIO]) -> Iterator[dict]:
+        """iter_records 와 같지만 헤더 정보 없이 start_line, end_line, content 만 반환 (find_log_messages_by_file 형식)"""
+        yield from self._iter_source(source, self._iter_batches, False)
+
+    def iter_entries(self, source: Union[str, os.PathLike, BinaryIO]) -> Iterator[dict]:
+        """
+        iter_records 와 같은 경계로 나누되 content 에 헤더를 뺀 본문을 넣습니다. (process_log_file 형식)
+        헤더 뒤 첫 줄의 앞뒤 공백은 지우고, 첫 줄이 비어 있으면 다음 줄부터 사용합니다.
+        첫 패턴 이전의 줄과 본문이 없는 메시지는 건너뜁니다.
+
+        Yields:
+            dict: timestamp, component, level, start_line, end_line, content 를 가진 항목
+        """
+        yield from self._iter_source(source, self._iter_entry_batches)
+
+    def _iter_source(self, source, iter_batches, *args) -> Iterator[dict]:
+        if isinstance(source, (str, os.PathLike)):
+            with open_log_stream(source, self.decompress_workers) as stream:
+                for batch in iter_batches(stream, *args):
+                    yield from batch
+        else:
+            for batch in iter_batches(source, *args):
+                yield from batch
+
+    def _iter_regions(self, stream: BinaryIO) -> Iterator[str]:
+        """디코딩된 텍스트를 완전한 줄 단위 구간으로 반환 (줄바꿈은 '\n' 으로 통일)"""
+        decoder = codecs.getincrementaldecoder(self.encoding)(self.errors)
+        read = stream.read
+        buffer_size = self.buffer_size
+        carry = ''
+
+        while True:
+            block = read(buffer_size)
+            if not block:
+                region = carry + decoder.decode(b'', final=True)
+                if region:
+                    yield region.replace('\r\n', '\n').replace('\r', '\n')
+                return
+
+            text = carry + decoder.decode(block)
+            # 마지막 줄은 다음 블록과 이어질 수 있으므로 남겨 둠 ('\r\n' 도 나뉘지 않음)
+            cut = text.rfind('\n') + 1
+            region, carry = text[:cut], text[cut:]
+            if region:
+                if '\r' in region:
+                    region = region.replace('\r\n', '\n').replace('\r', '\n')
+                yield region
+
+    def _iter_batches(self, stream: BinaryIO, with_header: bool) -> Iterator[List[dict]]:
+        """
+        구간마다 완성된 메시지 목록을 반환합니다.
+        구간을 경계에서 한 번에 나누므로(re.split) 메시지마다 일치 결과(Match)를 만들지 않습니다.
+        """
+        if with_header:
+            split, stride = self._split, self._stride
+        else:
+            split, stride = self._split_messages, self._message_stride
+        offsets = self._header_offsets
+
+        line = 1
+        # 아직 끝나지 않은 현재 메시지 (첫 패턴 이전 내용은 start_line 0, 헤더 없음)
+        parts = []
+        msg_line = 0
+        header = _NO_HEADER
+
+        for region in self._iter_regions(stream):
+            # 앞에 '\n' 을 붙여 구간 시작의 경계도 다른 경계와 같이 나눔
+            pieces = split('\n' + region)
+            if len(pieces) == 1:
+                parts.append(region)
+                continue
+
+            batch = []
+            # 첫 경계 앞의 내용은 현재 메시지에 이어짐 (split 이 뺀 '\n' 을 뒤로 옮김)
+            if pieces[0]:
+                parts.append(pieces[0][1:])
+                parts.append('\n')
+            if parts:
+                content = ''.join(parts)
+                line_count = content.count('\n')
+                message = {'start_line': msg_line, 'end_line': line + line_count - 1, 'content': content}
+                if with_header:
+                    message.update(header)
+                batch.append(message)
+                line += line_count
+
+            # 마지막 내용을 뺀 나머지는 완성된 메시지
+            contents = pieces[stride:-1:stride]
+            if with_header:
+                headers = pieces[1::stride]
+                columns = [pieces[1 + offset::stride] if offset else [None] * len(headers) for offset in offsets]
+                for content, header_text, timestamp, component, level in zip(contents, headers, *columns):
+                    line_count = content.count('\n') + 1
+                    batch.append({'start_line': line, 'end_line': line + line_count - 1, 'content': content + '\n',
+                                  'timestamp': timestamp, 'component': component, 'level': level,
+                                  'header_length': len(header_text)})
+                    line += line_count
+            else:
+                for content in contents:
+                    line_count = content.count('\n') + 1
+                    batch.append({'start_line': line, 'end_line': line + line_count - 1, 'content': content + '\n'})
+                    line += line_count
+
+            # 마지막 경계부터는 다음 구간으로 이어질 수 있음 (구간은 '\n' 으로 끝나므로 마지막 내용도 '\n' 으로 끝남)
+            msg_line = line
+            parts = [pieces[-1]]
+            if with_header:
+                base = len(pieces) - stride
+                header = {name: pieces[base + offset] if offset else None
+                          for name, offset in zip(_HEADER_GROUPS, offsets)}
+                header['header_length'] = len(pieces[base])
+
+            if batch:
+                yield batch
+
+        if parts:
+            content = ''.join(parts)
+            line_count = content.count('\n')
+            # 입력의 마지막 줄에는 줄바꿈이 없을 수 있음
+            end_line = line + line_count - 1 if content.endswith('\n') else line + line_count
+            message = {'start_line': msg_line, 'end_line': end_line, 'content': content}
+            if with_header:
+                message.update(header)
+            yield [message]
+
+
+    def _iter_entry_batches(self, stream: BinaryIO) -> Iterator[List[dict]]:
+        """
+        구간마다 완성된 항목(iter_entries) 목록을 반환합니다.
+        헤더까지 소비하며 나누므로(re.split) 본문을 다시 자르지 않고 그대로 항목 내용으로 사용합니다.
+        """
+        split = self._split_bodies
+        stride = self._stride - 1
+        offsets = self._header_offsets
+
+        line = 1
+        # 아직 끝나지 않은 현재 항목의 본문 (첫 패턴 이전 내용이면 header 가 None 이고 항목을 만들지 않음)
+        parts = []
+        msg_line = 0
+        header = None
+
+        for region in self._iter_regions(stream):
+            # 앞에 '\n' 을 붙여 구간 시작의 경계도 다른 경계와 같이 나눔
+            pieces = split('\n' + region)
+            if len(pieces) == 1:
+                parts.append(region)
+                continue
+
+            batch = []
+            # 첫 경계 앞의 내용은 현재 항목에 이어짐 (split 이 뺀 '\n' 을 뒤로 옮김)
+            if pieces[0]:
+                parts.append(pieces[0][1:])
+                parts.append('\n')
+            if parts:
+                line += self._close_entry(batch, parts, msg_line, header)
+
+            # 마지막 본문을 뺀 나머지는 완성된 항목 (본문은 헤더 뒤 공백 다음부터 다음 경계 앞의 '\n' 전까지)
+            columns = [pieces[offset::stride] if offset else [None] * len(pieces) for offset in offsets]
+            for body, timestamp, component, level in zip(pieces[stride:-1:stride], *columns):
+                line_count = body.count('\n') + 1
+                if line_count == 1:
+                    content = body.strip()
+                    if not content:
+                        line += 1
+                        continue
+                    content += '\n'
+                else:
+                    first, _, rest = body.partition('\n')
+                    first = first.strip()
+                    content = first + '\n' + rest + '\n' if first else rest + '\n'
+                batch.append({'timestamp': timestamp, 'component': component, 'level': level,
+                              'start_line': line, 'end_line': line + line_count - 1, 'content': content})
+                line += line_count
+
+            # 마지막 경계부터는 다음 구간으로 이어질 수 있음
+            msg_line = line
+            parts = [pieces[-1]]
+            base = len(pieces) - 1 - stride
+            header = {name: pieces[base + offset] if offset else None for name, offset in zip(_HEADER_GROUPS, offsets)}
+
+            if batch:
+                yield batch
+
+        if parts:
+            batch = []
+            self._close_entry(batch, parts, msg_line, header)
+            if batch:
+                yield batch
+
+    @staticmethod
+    def _close_entry(batch: List[dict], parts: List[str], msg_line: int, header: Optional[dict]) -> int:
+        """이어 붙인 본문으로 항목을 만들어 batch 에 넣고 본문의 줄 수를 반환 (마지막 줄에는 줄바꿈이 없을 수 있음)"""
+        body = ''.join(parts)
+        line_count = body.count('\n')
+        if not body.endswith('\n'):
+            line_count += 1
+        if header is not None:
+            first, _, rest = body.partition('\n')
+            first = first.strip()
+            content = first + '\n' + rest if first else rest
+            if content:
+                entry = dict(header)
+                entry.update(start_line=msg_line, end_line=msg_line + line_count - 1, content=content)
+                batch.append(entry)
+        return line_count
+
+
+def read_log_records(source: Union[str, os.PathLike, BinaryIO], pattern: re.Pattern = timestamp_start_pattern,
+                     encoding: Optional[str] = None, errors: str = 'strict') -> Iterator[dict]:
+    """LogReader(pattern, encoding, errors).iter_records(source) 의 축약형"""
+    return LogReader(pattern, encoding, errors).iter_records(source)
@@ -0,0 +1,323 @@
+import functools
+import heapq
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+# 측정 여부 (enable() 로 켬). 꺼져 있으면 계측 함수는 원래 함수를 바로 호출만 함
+_enabled = False
+
+# 단계별로 보관하는 가장 느린 메시지 수
+DEFAULT_SLOWEST = 10
+
+# Prometheus 지표 이름 접두어
+PROMETHEUS_PREFIX = 'log_analyzer'
+
+
+def _bucket(ns: int) -> int:
+    """
+    지연 시간(나노초)의 히스토그램 구간 번호 (로그-선형: 2의 거듭제곱 구간마다 8개로 나눔, 오차 12.5% 이내)
+    구간 번호는 지연 시간 순서와 같은 순서입니다.
+    """
+    shift = max(ns.bit_length() - 4, 0)
+    return (shift << 4) | (ns >> shift)
+
+
+def _bucket_upper(bucket: int) -> int:
+    """구간의 상한 (나노초)"""
+    return ((bucket & 15) + 1) << (bucket >> 4)
+
+
+class StageMetrics:
+    """단계 하나의 호출 수, 누적 시간, 처리 바이트, 지연 시간 히스토그램, 가장 느린 메시지"""
+
+    def __init__(self, slowest: int = DEFAULT_SLOWEST):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.bytes = 0
+        self.histogram: Dict[int, int] = {}
+        self.slowest_limit = slowest
+        # (지연 시간, 순번, 시작 줄, 끝 줄) 의 최소 힙
+        self.slowest: List[tuple] = []
+        self._sequence = 0
+
+    def observe(self, elapsed_ns: int, size: int = 0, lines: Optional[tuple] = None) -> None:
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.bytes += size
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        bucket = _bucket(elapsed_ns)
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+        if lines is not None:
+            self._keep_slowest(elapsed_ns, lines[0], lines[1])
+
+    def _keep_slowest(self, elapsed_ns: int, start_line: int, end_line: int) -> None:
+        if not self.slowest_limit:
+            return
+        self._sequence += 1
+        item = (elapsed_ns, self._sequence, start_line, end_line)
+        if len(self.slowest) < self.slowest_limit:
+            heapq.heappush(self.slowest, item)
+        elif elapsed_ns > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, item)
+
+    def quantile(self, q: float) -> float:
+        """q 분위 지연 시간 (초, 히스토그램 구간의 상한)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bucket in sorted(self.histogram):
+            seen += self.histogram[bucket]
+            if seen >= rank:
+                return min(_bucket_upper(bucket), self.max_ns) / 1e9
+        return self.max_ns / 1e9
+
+    def merge(self, other: 'StageMetrics') -> None:
+        self.count += other.count
+        self.total_ns += other.total_ns
+        self.bytes += other.bytes
+        self.max_ns = max(self.max_ns, other.max_ns)
+        for bucket, count in other.histogram.items():
+            self.histogram[bucket] = self.histogram.get(bucket, 0) + count
+        for elapsed_ns, _, start_line, end_line in other.slowest:
+            self._keep_slowest(elapsed_ns, start_line, end_line)
+
+    def shift_lines(self, offset: int) -> None:
+        """가장 느린 메시지의 줄 번호를 offset 만큼 보정 (구간별로 처리한 워커 결과용)"""
+        self.slowest = [(elapsed_ns, sequence, start_line + offset, end_line + offset)
+                        for elapsed_ns, sequence, start_line, end_line in self.slowest]
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'total_seconds': self.total_ns / 1e9,
+            'mean_seconds': self.total_ns / self.count / 1e9 if self.count else 0.0,
+            'p50_seconds': self.quantile(0.5),
+            'p99_seconds': self.quantile(0.99),
+            'max_seconds': self.max_ns / 1e9,
+            'bytes': self.bytes,
+            'slowest': [
+                {'seconds': elapsed_ns / 1e9, 'start_line': start_line, 'end_line': end_line}
+                for elapsed_ns, _, start_line, end_line in sorted(self.slowest, reverse=True)
+            ],
+        }
+
+
+class MetricsRegistry:
+    """
+    단계(계측한 함수)별 지표 모음
+
+    message_scope 안에서 호출된 단계는 해당 메시지의 줄 범위와 함께 기록되어
+    가장 느린 메시지 목록에 들어갑니다.
+    """
+
+    def __init__(self, slowest: int = DEFAULT_SLOWEST):
+        self.slowest = slowest
+        self.stages: Dict[str, StageMetrics] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, elapsed_ns: int, size: int = 0) -> None:
+        lines = getattr(self._local, 'lines', None)
+        with self._lock:
+            metrics = self.stages.get(stage)
+            if metrics is None:
+                metrics = self.stages[stage] = StageMetrics(self.slowest)
+            metrics.observe(elapsed_ns, size, lines)
+
+    @contextmanager
+    def message_scope(self, start_line: int, end_line: int):
+        """이 안에서 기록되는 단계에 메시지 줄 범위를 붙임"""
+        previous = getattr(self._local, 'lines', None)
+        self._local.lines = (start_line, end_line)
+        try:
+            yield
+        finally:
+            self._local.lines = previous
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages.clear()
+
+    def merge(self, stages: Dict[str, StageMetrics]) -> None:
+        """다른 레지스트리의 단계별 지표(예: 워커 프로세스에서 받은 stages)를 합침"""
+        with self._lock:
+            for stage, metrics in stages.items():
+                target = self.stages.get(stage)
+                if target is None:
+                    target = self.stages[stage] = StageMetrics(self.slowest)
+                target.merge(metrics)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {stage: metrics.summary() for stage, metrics in sorted(self.stages.items())}
+
+    def export_json(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'stages': self.summary()}, f, indent=2, ensure_ascii=False)
+
+    def export_prometheus(self, path: str) -> None:
+        """Prometheus 텍스트 형식으로 저장 (node_exporter textfile collector 등에서 사용)"""
+        summary = self.summary()
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, values: Iterable[tuple]) -> None:
+            full_name = f"{PROMETHEUS_PREFIX}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for labels, value in values:
+                label_text = ','.join(f'{key}="{label}"' for key, label in labels)
+                lines.append(f"{full_name}{{{label_text}}} {value}")
+
+        stages = summary.items()
+        metric('stage_calls_total', 'counter', '단계 호출 수',
+               [((('stage', name),), values['count']) for name, values in stages])
+        metric('stage_seconds_total', 'counter', '단계 누적 시간 (초)',
+               [((('stage', name),), values['total_seconds']) for name, values in stages])
+        metric('stage_bytes_total', 'counter', '단계에서 처리한 바이트 수',
+               [((('stage', name),), values['bytes']) for name, values in stages])
+        metric('stage_latency_seconds', 'gauge', '단계 지연 시간 분위수 (초)',
+               [((('stage', name), ('quantile', quantile)), values[key])
+                for name, values in stages
+                for quantile, key in (('0.5', 'p50_seconds'), ('0.99', 'p99_seconds'), ('1', 'max_seconds'))])
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    def print_summary(self, limit: int = 3, file=None) -> None:
+        print(f"{'stage':<58}{'calls':>9}{'total(s)':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'MB':>9}", file=file)
+        for stage, stage_summary in sorted(self.summary().items(), key=lambda item: -item[1]['total_seconds']):
+            print(f"{stage:<58}{stage_summary['count']:>9}{stage_summary['total_seconds']:>10.3f}"
+                  f"{stage_summary['p50_seconds'] * 1000:>10.3f}{stage_summary['p99_seconds'] * 1000:>10.3f}"
+                  f"{stage_summary['bytes'] / (1024 * 1024):>9.1f}", file=file)
+            for slow in stage_summary['slowest'][:limit]:
+                print(f"    {slow['seconds'] * 1000:.3f}ms  line {slow['start_line']}-{slow['end_line']}", file=file)
+
+
+# 프로세스에서 공유하는 지표 모음
+registry = MetricsRegistry()
+
+
+def enable(slowest: Optional[int] = None) -> None:
+    """측정을 켬 (slowest: 단계별로 보관할 가장 느린 메시지 수)"""
+    global _enabled
+    if slowest is not None:
+        registry.slowest = slowest
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _input_size(args: tuple) -> int:
+    """첫 번째 문자열 인자의 길이 (처리한 바이트 수로 사용)"""
+    for arg in args:
+        if isinstance(arg, str):
+            return len(arg)
+    return 0
+
+
+def _stage_name(func: Callable) -> str:
+    return f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+
+def instrument(name: Optional[str] = None) -> Callable:
+    """
+    함수 호출 시간을 기록하는 데코레이터. 측정이 꺼져 있으면 전역 변수 하나만 확인하고 원래 함수를 호출합니다.
+
+    Args:
+        name (str): 단계 이름 (기본값: '<모듈>.<함수>')
+    """
+    def decorate(func: Callable) -> Callable:
+        stage = name or _stage_name(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe(stage, time.perf_counter_ns() - started, _input_size(args))
+
+        return wrapper
+
+    return decorate
+
+
+def instrument_iter(name: Optional[str] = None) -> Callable:
+    """
+    이터레이터를 반환하는 함수용 데코레이터. 항목 하나를 꺼낼 때마다 걸린 시간을 기록합니다.
+    (항목이 dict 이면 content 길이를 처리한 바이트 수로 사용)
+    """
+    def decorate(func: Callable) -> Callable:
+        stage = name or _stage_name(func)
+
+        def timed(iterator: Iterator) -> Iterator:
+            perf_counter_ns = time.perf_counter_ns
+            while True:
+                started = perf_counter_ns()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                content = item.get('content', '') if isinstance(item, dict) else ''
+                registry.observe(stage, perf_counter_ns() - started, len(content))
+                yield item
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            return timed(iter(func(*args, **kwargs)))
+
+        return wrapper
+
+    return decorate
+
+
+def stage(name: str, size: int = 0):
+    """with 블록의 실행 시간을 name 단계로 기록 (측정이 꺼져 있으면 아무 일도 안 함)"""
+    if not _enabled:
+        return _NULL_SCOPE
+    return _timed_stage(name, size)
+
+
+@contextmanager
+def _timed_stage(name: str, size: int):
+    started = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter_ns() - started, size)
+
+
+def message_scope(message: dict):
+    """메시지 처리 구간: 안에서 기록되는 단계에 메시지의 줄 범위를 붙임 (측정이 꺼져 있으면 아무 일도 안 함)"""
+    if not _enabled:
+        return _NULL_SCOPE
+    return registry.message_scope(message['start_line'], message['end_line'])
+
+
+class _NullScope:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
@@ -0,0 +1,230 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from app.utils import metrics
+from app.utils.log_parser_utils import (MappedLogSplitter, get_message_timestamp, in_time_range,
+                                        iter_log_messages_by_file, show_xml_single_line)
+from app.utils.regex_string_type_detector import improved_detect_string_type
+from app.utils.result_cache import ResultCache
+from app.utils.sql_utils import extract_all_sql_queries_v3
+from app.utils.xml_utils import extract_and_format_specific_xml
+
+# 점수가 이 값 이상이면 SQL / XML 추출을 시도
+SQL_SCORE_THRESHOLD = 0.1
+XML_SCORE_THRESHOLD = 0.1
+
+# 워커 하나가 처리하는 파일 구간 크기 (타임스탬프 경계에 맞춰 조정됨)
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class AnalysisOptions:
+    """
+    분석 설정
+
+    since / until 은 'YYYY-MM-DD HH:MM:SS' 형식(앞부분만 써도 됨)이며 그 자릿수까지 비교합니다.
+    예: until='2025-07-01 10' 이면 10시 59분 59초까지 포함합니다.
+    시간 범위를 지정하면 범위 밖의 메시지와 타임스탬프가 없는 메시지는 감지 전에 건너뜁니다.
+    """
+    sql_threshold: float = SQL_SCORE_THRESHOLD
+    xml_threshold: float = XML_SCORE_THRESHOLD
+    since: Optional[str] = None
+    until: Optional[str] = None
+
+    @property
+    def has_time_range(self) -> bool:
+        return self.since is not None or self.until is not None
+
+    def includes(self, message: dict) -> bool:
+        if not self.has_time_range:
+            return True
+        return in_time_range(get_message_timestamp(message['content']), self.since, self.until)
+
+    def cache_namespace(self) -> bytes:
+        """결과에 영향을 주는 설정 (결과 캐시 키에 포함)"""
+        return f"{self.sql_threshold}:{self.xml_threshold}".encode('ascii')
+
+
+DEFAULT_OPTIONS = AnalysisOptions()
+
+
+def _analyze_content(content: str, options: AnalysisOptions = DEFAULT_OPTIONS) -> tuple:
+    """메시지 내용의 (감지 결과, SQL 쿼리, XML 블록)"""
+    detected = improved_detect_string_type(content)
+    sql_queries = None
+    xml_blocks = None
+    scores = detected['scores']
+
+    # 점수가 있으면 무조건 확인해 보기
+    if scores['SQL'] >= options.sql_threshold:
+        sql_queries = extract_all_sql_queries_v3(content)
+
+    if scores['XML'] >= options.xml_threshold or scores['HTML'] >= options.xml_threshold:
+        xml_blocks = [(xml, show_xml_single_line(xml)) for xml in extract_and_format_specific_xml(content)]
+
+    return detected, sql_queries, xml_blocks
+
+
+def analyze_message(message: dict, cache: Optional[ResultCache] = None,
+                    options: AnalysisOptions = DEFAULT_OPTIONS) -> dict:
+    """
+    로그 메시지 하나에 대해 타입 감지와 SQL / XML 추출을 수행합니다.
+
+    Args:
+        message (dict): start_line, end_line, content 를 가진 로그 메시지
+        cache (ResultCache): 타임스탬프만 다른 같은 메시지의 결과를 재사용할 캐시
+        options (AnalysisOptions): 추출을 시도할 점수 기준
+
+    Returns:
+        dict: 메시지 정보와 감지 결과, 추출된 SQL 쿼리 및 XML 블록
+    """
+    content = message['content']
+    with metrics.message_scope(message), metrics.stage('parallel_pipeline.analyze_message', len(content)):
+        if cache is None:
+            detected, sql_queries, xml_blocks = _analyze_content(content, options)
+        else:
+            detected, sql_queries, xml_blocks = cache.get_or_compute(content, partial(_analyze_content, options=options))
+
+    return {
+        'start_line': message['start_line'],
+        'end_line': message['end_line'],
+        'content': content,
+        'detected': detected,
+        'sql_queries': sql_queries,
+        'xml_blocks': xml_blocks
+    }
+
+
+def analyze_messages(messages: Iterable[dict], cache: Optional[ResultCache] = None,
+                     options: AnalysisOptions = DEFAULT_OPTIONS) -> Iterator[dict]:
+    """메시지를 순서대로 분석합니다. (시간 범위 밖의 메시지는 감지 전에 건너뜀)"""
+    if options.has_time_range:
+        messages = filter(options.includes, messages)
+    for message in messages:
+        yield analyze_message(message, cache, options)
+
+
+def iter_analyzed_messages(log_file_path: str, encoding: Optional[str] = None,
+                           cache: Optional[ResultCache] = None,
+                           options: AnalysisOptions = DEFAULT_OPTIONS,
+                           decompress_workers: Optional[int] = 1) -> Iterator[dict]:
+    """
+    로그 파일을 한 프로세스에서 순서대로 분석합니다.
+    압축 파일은 mmap 으로 구간을 나눌 수 없으므로 이 방식으로 분석합니다. (gzip 멤버는 decompress_workers 개 프로세스에서 풂)
+    """
+    messages = iter_log_messages_by_file(log_file_path, encoding, decompress_workers)
+    return analyze_messages(messages, cache, options)
+
+
+def iter_chunk_ranges(log_file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[int, int]]:
+    """
+    파일을 chunk_size 크기 정도의 바이트 구간으로 나눕니다.
+    각 구간의 시작은 타임스탬프 경계(start_pattern)에 맞춰지므로 메시지가 두 구간에 걸치지 않습니다.
+    """
+    with MappedLogSplitter(log_file_path) as splitter:
+        size = splitter.size
+        start = 0
+        while start < size:
+            end = splitter.find_boundary(start + chunk_size) if start + chunk_size < size else None
+            if end is None:
+                end = size
+            yield start, end
+            start = end
+
+
+# 워커 프로세스별 결과 캐시 (구간이 바뀌어도 같은 프로세스에서는 재사용)
+_worker_cache: Optional[ResultCache] = None
+
+
+def _get_worker_cache(cache_entries: Optional[int], options: AnalysisOptions) -> Optional[ResultCache]:
+    global _worker_cache
+    if not cache_entries:
+        return None
+    if _worker_cache is None or _worker_cache.namespace != options.cache_namespace():
+        _worker_cache = ResultCache(max_entries=cache_entries, namespace=options.cache_namespace())
+    return _worker_cache
+
+
+def _analyze_chunk(log_file_path: str, start: int, end: int, encoding: Optional[str],
+                   cache_entries: Optional[int] = None, metrics_slowest: Optional[int] = None,
+                   options: AnalysisOptions = DEFAULT_OPTIONS) -> Tuple[List[dict], int, Optional[dict]]:
+    """
+    워커 프로세스에서 실행: 구간 내 메시지를 분석하고 (결과 목록, 구간의 줄 수, 단계별 지표) 를 반환
+    metrics_slowest 가 None 이 아니면 이 구간의 단계별 지표를 모아서 반환합니다.
+    """
+    cache = _get_worker_cache(cache_entries, options)
+    if metrics_slowest is not None:
+        metrics.enable(metrics_slowest)
+        metrics.registry.reset()
+    results = []
+    line_count = 0
+    with MappedLogSplitter(log_file_path, encoding) as splitter:
+        for span in splitter.iter_spans(start, end):
+            message = {
+                'start_line': span.start_line,
+                'end_line': span.end_line,
+                'content': splitter.read_content(span)
+            }
+            line_count = span.end_line
+            if options.includes(message):
+                results.append(analyze_message(message, cache, options))
+    return results, line_count, dict(metrics.registry.stages) if metrics_slowest is not None else None
+
+
+def iter_analyzed_messages_parallel(log_file_path: str, workers: Optional[int] = None,
+                                    chunk_size: int = DEFAULT_CHUNK_SIZE, max_in_flight: Optional[int] = None,
+                                    encoding: Optional[str] = None,
+                                    cache_entries: Optional[int] = None,
+                                    options: AnalysisOptions = DEFAULT_OPTIONS) -> Iterator[dict]:
+    """
+    로그 파일을 여러 프로세스로 나누어 분석하고 결과를 줄 순서대로 반환합니다.
+    metrics 가 켜져 있으면 워커의 단계별 지표를 받아 현재 프로세스의 지표에 합칩니다.
+
+    Args:
+        log_file_path (str): 로그 파일 경로
+        workers (int): 워커 프로세스 수 (기본값: CPU 수)
+        chunk_size (int): 워커 하나가 처리하는 구간 크기 (바이트)
+        max_in_flight (int): 동시에 처리 중인 구간의 최대 개수 (메모리 사용량 제한, 기본값: workers * 2)
+        encoding (str): 파일 인코딩
+        cache_entries (int): 워커별 결과 캐시 크기 (None 이면 캐시 사용 안 함)
+        options (AnalysisOptions): 점수 기준과 시간 범위 (워커에서 감지 전에 적용)
+
+    Yields:
+        dict: analyze_message 결과 (iter_analyzed_messages 와 동일한 순서와 내용)
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+
+    metrics_slowest = metrics.registry.slowest if metrics.is_enabled() else None
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        line_base = 0
+
+        def drain_one():
+            nonlocal line_base
+            results, line_count, stages = pending.popleft().result()
+            # 워커는 구간 안에서의 줄 번호를 반환하므로 앞선 구간의 줄 수만큼 보정
+            if line_base:
+                for result in results:
+                    result['start_line'] += line_base
+                    result['end_line'] += line_base
+            if stages:
+                for stage_metrics in stages.values():
+                    stage_metrics.shift_lines(line_base)
+                metrics.registry.merge(stages)
+            line_base += line_count
+            return results
+
+        for start, end in iter_chunk_ranges(log_file_path, chunk_size):
+            pending.append(executor.submit(_analyze_chunk, log_file_path, start, end, encoding, cache_entries,
+                                           metrics_slowest, options))
+            if len(pending) >= max_in_flight:
+                yield from drain_one()
+
+        while pending:
+            yield from drain_one()
@@ -1,9 +1,14 @@
 import re
-import json
-import datetime
 import os
 
+from app.utils.content_writer import BundleWriter, ThreadedFileWriter
+from app.utils.file_naming import default_namer, find_identifier
+from app.utils.json_utils import is_json, looks_like_json
+from app.utils.log_reader import LogReader, component_level_start_pattern
+from app.utils.metrics import instrument
 
+
+@instrument()
 def detect_string_type(text):
     """
     주어진 문자열이 XML, HTML, JSON 또는 SQL 형식인지 판별합니다.
@@ -27,12 +32,9 @@ def detect_string_type(text):
     if re.search(html_pattern, normalized_text, re.IGNORECASE):
         return 'HTML'
 
-    # JSON 패턴 확인
-    try:
-        json.loads(normalized_text)
+    # JSON 패턴 확인 (객체를 만들지 않고 문법만 검사)
+    if is_json(normalized_text):
         return 'JSON'
-    except json.JSONDecodeError:
-        pass
 
     # SQL 패턴 확인
     sql_pattern = r'\b(SELECT|INSERT|UPDATE|DELETE|CREATE|ALTER|DROP)\b'
@@ -47,63 +49,224 @@ def detect_string_type(text):
     return 'UNKNOWN'
 
 
-def detect_xml_without_declaration(text):
+# detect_xml_without_declaration 이 검사하는 최대 글자 수 (이보다 긴 텍스트는 앞부분만 검사)
+XML_DETECTION_MAX_CHARS = 1024 * 1024
+
+# 닫는 태그(</name>)와 여는 / 자체 닫힘 태그(<name ...>, <name .../>)를 한 번에 찾는 토큰 패턴
+# (닫는 태그는 속성이나 공백이 없어야 하고, 태그 안에 '<' 가 있으면 태그로 보지 않음)
+xml_tag_token_pattern = re.compile(
+    r'<(?:/(?P<close>[a-zA-Z][a-zA-Z0-9_:-]*)>|(?P<name>[a-zA-Z][a-zA-Z0-9_:-]*)(?P<attributes>[^<>]*)>)'
+)
+
+
+@instrument()
+def detect_xml_without_declaration(text, max_chars=XML_DETECTION_MAX_CHARS):
     """
     XML 선언문이 없는 XML 문자열을 감지합니다.
 
+    태그를 한 번만 훑으면서 스택으로 여는 태그와 닫는 태그의 짝을 확인하고,
+    짝이 맞지 않는 닫는 태그를 만나면 바로 종료합니다.
+    태그 구분은 기존 방식과 같습니다.
+        - 속성에 '/' 가 있는 여는 태그(xmlns="http://..." 등)는 여는 태그로 세지 않음
+        - 자체 닫힘 태그로 쓴 이름이 여는 / 닫는 태그로도 쓰이면 균형이 맞지 않는 것으로 봄
+
     Args:
         text (str): 분석할 문자열
+        max_chars (int): 검사할 최대 글자 수 (None 이면 제한 없음).
+            텍스트가 더 길면 앞부분만 검사하며, 이때 끝까지 닫히지 않은 태그는 허용합니다.
 
     Returns:
         bool: XML 형식일 경우 True, 아닐 경우 False
     """
-    # 공백 제거 및 소문자 변환하여 텍스트 정규화
+    # 공백 제거
     normalized_text = text.strip()
 
-    # 기본 태그 패턴
-    tag_pattern = r'<([a-zA-Z][a-zA-Z0-9_:-]*)[^>]*>.*?</\1>'
-    # 자체 닫힘 태그 패턴
-    self_closing_pattern = r'<([a-zA-Z][a-zA-Z0-9_:-]*)[^>]*/>'
-    # 속성 패턴
-    attribute_pattern = r'<[^>]+\s+([a-zA-Z][a-zA-Z0-9_:-]*)=["|\'][^"|\']*["|\']'
-
-    # 패턴 확인
-    has_tags = re.search(tag_pattern, normalized_text, re.DOTALL) is not None
-    has_self_closing = re.search(self_closing_pattern, normalized_text) is not None
-    has_attributes = re.search(attribute_pattern, normalized_text) is not None
-
-    # 태그 균형 확인
-    # 여는 태그와 닫는 태그 추출
-    opening_tags = re.findall(r'<([a-zA-Z][a-zA-Z0-9_:-]*)[^>/]*>', normalized_text)
-    closing_tags = re.findall(r'</([a-zA-Z][a-zA-Z0-9_:-]*)>', normalized_text)
-    self_closed = re.findall(r'<([a-zA-Z][a-zA-Z0-9_:-]*)[^>]*/>', normalized_text)
-
-    # 중복 없이 태그 이름 수집
-    tag_names = list(set(opening_tags + closing_tags))
+    truncated = max_chars is not None and len(normalized_text) > max_chars
+    end = max_chars if truncated else len(normalized_text)
+
+    stack = []
+    has_tags = False
+    # 여는 / 닫는 태그로 쓰인 이름과 자체 닫힘 태그로 쓰인 이름
+    paired_names = set()
+    self_closed_names = set()
+
+    for match in xml_tag_token_pattern.finditer(normalized_text, 0, end):
+        close, name, attributes = match.groups()
+        if close:
+            # 닫는 태그는 가장 최근에 열린 태그와 이름이 같아야 함
+            if not stack or stack.pop() != close or close in self_closed_names:
+                return False
+            has_tags = True
+        elif attributes.endswith('/'):
+            # 자체 닫힘 태그는 닫는 태그가 필요 없음
+            if name in paired_names:
+                return False
+            self_closed_names.add(name)
+        elif '/' not in attributes:
+            if name in self_closed_names:
+                return False
+            paired_names.add(name)
+            stack.append(name)
+
+    # 닫히지 않은 태그가 남아 있으면 균형이 맞지 않음 (잘린 경우는 제외)
+    if stack and not truncated:
+        return False
+
+    return has_tags or bool(self_closed_names)
+
+
+class StringTypeDetector:
+    """
+    improved_detect_string_type 의 미리 컴파일된 구현.
 
-    # 각 태그에 대해 여는 태그와 닫는 태그의 수 확인
-    balanced = True
-    for tag in tag_names:
-        # 자체 닫힘 태그는 닫는 태그가 필요 없음
-        tag_self_closed_count = len([t for t in self_closed if t == tag])
-        tag_open_count = len([t for t in opening_tags if t == tag])
-        tag_close_count = len([t for t in closing_tags if t == tag])
+    SQL 키워드 그룹과 XML 선언, HTML 패턴, 일반 HTML 태그를 하나의 정규식(이름 있는 그룹)으로 묶어
+    텍스트를 한 번만 훑으면서 모든 개수와 표시를 계산합니다. 점수는 기존 방식과 동일합니다.
+    """
 
-        # 열림 태그 수 - 자체 닫힘 태그 수 = 닫힘 태그 수여야 함
-        if tag_open_count - tag_self_closed_count != tag_close_count:
-            balanced = False
-            break
+    # (그룹 이름, 가중치) - 기존 sql_keyword_list 의 순서와 가중치
+    keyword_weights = (
+        ('primary', 0.3),
+        ('clauses', 0.2),
+        ('joins', 0.2),
+        ('ddl', 0.15),
+        ('additional', 0.1),
+    )
+
+    # 파일 이름의 SQL 식별자(동작 유형)가 되는 키워드 그룹 (file_naming.find_identifier 와 같은 키워드)
+    action_groups = frozenset(('primary', 'ddl'))
+
+    def __init__(self):
+        self.scan_pattern = re.compile(
+            # 키워드 첫 글자나 '<' 가 아닌 위치는 바로 건너뛰도록 전방 탐색으로 후보 위치를 좁힘
+            r'(?=[abcdfghijlorstuvw<])(?:'
+            r'\b(?:'
+            # 주요 DML 키워드 (높은 가중치)
+            r'(?P<primary>SELECT|INSERT|UPDATE|DELETE)'
+            # 일반적인 절 키워드 (중간 가중치)
+            r'|(?P<clauses>FROM|WHERE|GROUP BY|ORDER BY|HAVING)'
+            # 조인 관련 키워드 (중간 가중치)
+            r'|(?P<joins>JOIN|INNER JOIN|LEFT JOIN|RIGHT JOIN|FULL JOIN)'
+            # DDL 키워드 (낮은 가중치) - TRUNCATE 는 SQL 여부 판단 키워드에 포함되지 않아 따로 셈
+            r'|(?P<ddl>CREATE|ALTER|DROP)'
+            r'|(?P<truncate>TRUNCATE)'
+            # 추가 SQL 표현 (낮은 가중치)
+            r'|(?P<additional>AS|IN|BETWEEN|LIKE|IS NULL|IS NOT NULL|AND|OR|VALUES)'
+            r')\b'
+            # 태그 표시는 '<' 한 글자만 소비하고 나머지는 전방 탐색으로 확인 (키워드 개수에 영향 없음)
+            r'|(?P<xml_declaration><)(?=\?xml.*?\?>)'
+            r'|(?P<html><)(?=!DOCTYPE\s+html>|html.*?>|body.*?>|head.*?>)'
+            r'|(?P<html_tag><)(?=(?:div|span|p|a|img|table|tr|td|th|ul|ol|li|h[1-6]|form|input|button|script|style)[^>]*>)'
+            r')',
+            re.IGNORECASE
+        )
+
+    def scan(self, text):
+        """
+        텍스트를 한 번 훑어 키워드 그룹별 개수와 태그 표시 개수, 첫 번째 SQL 동작 키워드를 반환합니다.
+
+        Args:
+            text (str): 분석할 문자열
+
+        Returns:
+            tuple: (그룹 이름별 매칭 개수, 첫 번째 SQL 동작 키워드 또는 None)
+        """
+        counts = dict.fromkeys(self.scan_pattern.groupindex, 0)
+        action = None
+        action_groups = self.action_groups
+        for match in self.scan_pattern.finditer(text):
+            group = match.lastgroup
+            counts[group] += 1
+            if action is None and group in action_groups:
+                action = match.group(group)
+        return counts, action
+
+    def detect(self, text, partial_match=True):
+        """
+        문자열 타입을 감지합니다. improved_detect_string_type 과 같은 결과를 반환합니다.
+
+        Args:
+            text (str): 분석할 문자열
+            partial_match (bool): 부분 일치도 허용할지 여부
+
+        Returns:
+            dict: 감지 결과 (각 타입별 확률과 주요 타입, 파일 이름에 쓸 식별자)
+        """
+        # 공백 제거 및 정규화
+        normalized_text = text.strip()
+
+        # 각 타입별 점수 초기화
+        results = {
+            'XML': 0.0,
+            'HTML': 0.0,
+            'JSON': 0.0,
+            'SQL': 0.0,
+            'UNKNOWN': 0.0
+        }
 
-    # XML 여부 결정 (여러 조건 고려)
-    is_xml = (has_tags or has_self_closing) and balanced
+        counts, action = self.scan(normalized_text)
+
+        # XML 선언 패턴 확인
+        if counts['xml_declaration']:
+            results['XML'] += 0.8
+
+        # HTML 패턴 확인
+        if counts['html']:
+            results['HTML'] += 0.8
+
+        # 일반적인 HTML 태그 확인
+        if counts['html_tag']:
+            results['HTML'] += 0.6
+
+        # JSON 형식 확인 (첫 글자 / 마지막 글자로 먼저 거르고, 객체를 만들지 않고 문법만 검사)
+        if is_json(normalized_text):
+            results['JSON'] += 0.9
+        elif partial_match and looks_like_json(normalized_text):
+            # JSON 부분 일치 확인
+            results['JSON'] += 0.4
+
+        # SQL 패턴 확인 (SELECT ~ JOIN 키워드가 하나라도 있을 때만 점수 계산)
+        if counts['primary'] or counts['clauses'] or counts['joins'] or counts['ddl']:
+            counts['ddl'] += counts['truncate']
+
+            # 각 키워드 그룹별 점수를 기존과 같은 순서로 합산
+            sql_score = 0
+            for group, weight in self.keyword_weights:
+                sql_score += counts[group] * weight
+
+            # 최대 점수는 0.9로 제한
+            results['SQL'] += min(sql_score, 0.9)
+
+        # XML 선언 없는 XML 감지 추가
+        if not results['XML'] >= 0.5 and detect_xml_without_declaration(normalized_text):
+            results['XML'] += 0.7
+
+        # 가장 높은 점수를 가진 타입 결정
+        max_type = max(results, key=results.get)
+
+        # 모든 타입의 점수가 낮으면 UNKNOWN으로 설정
+        if results[max_type] < 0.3:
+            max_type = 'UNKNOWN'
+            results['UNKNOWN'] = 0.5
+
+        # 파일 이름에 쓸 식별자 (찾지 못하면 빈 문자열)
+        # SQL 은 위에서 훑은 키워드를 그대로 사용하므로 find_identifier 와 달리 단어 단위로만 찾음 ('preselected' 는 제외)
+        if max_type == 'SQL':
+            identifier = action.lower() if action else ''
+        else:
+            identifier = find_identifier(normalized_text, max_type) or ''
+
+        return {
+            'scores': results,
+            'primary_type': max_type,
+            'identifier': identifier
+        }
 
-    # 추가 XML 특성 확인으로 신뢰도 향상
-    if has_attributes or len(tag_names) > 1:
-        is_xml = is_xml and True
 
-    return is_xml
+# 모듈에서 공유하는 감지기 (정규식은 한 번만 컴파일)
+default_detector = StringTypeDetector()
 
 
+@instrument()
 def improved_detect_string_type(text, partial_match=True):
     """
     개선된 문자열 타입 감지 함수로, 확률 기반 방식을 사용합니다.
@@ -113,179 +276,52 @@ def improved_detect_string_type(text, partial_match=True):
         partial_match (bool): 부분 일치도 허용할지 여부
 
     Returns:
-        dict: 감지 결과 (각 타입별 확률과 주요 타입)
+        dict: 감지 결과 (각 타입별 확률과 주요 타입, 파일 이름에 쓸 식별자)
     """
-    # 공백 제거 및 정규화
-    normalized_text = text.strip()
-
-    # 각 타입별 점수 초기화
-    results = {
-        'XML': 0.0,
-        'HTML': 0.0,
-        'JSON': 0.0,
-        'SQL': 0.0,
-        'UNKNOWN': 0.0
-    }
-
-    # XML 선언 패턴 확인
-    xml_pattern = r'<\?xml.*?\?>'
-    if re.search(xml_pattern, normalized_text, re.IGNORECASE):
-        results['XML'] += 0.8
+    return default_detector.detect(text, partial_match)
 
-    # HTML 패턴 확인
-    html_pattern = r'<!DOCTYPE\s+html>|<html.*?>|<body.*?>|<head.*?>'
-    if re.search(html_pattern, normalized_text, re.IGNORECASE):
-        results['HTML'] += 0.8
-
-    # 일반적인 HTML 태그 확인
-    common_html_tags = r'<(div|span|p|a|img|table|tr|td|th|ul|ol|li|h[1-6]|form|input|button|script|style)[^>]*>'
-    if re.search(common_html_tags, normalized_text, re.IGNORECASE):
-        results['HTML'] += 0.6
 
-    # JSON 형식 확인
-    try:
-        json.loads(normalized_text)
-        results['JSON'] += 0.9
-    except json.JSONDecodeError:
-        # JSON 부분 일치 확인
-        if partial_match:
-            json_pattern = r'^\s*[\{\[].*[\}\]]\s*$'
-            if re.search(json_pattern, normalized_text, re.DOTALL):
-                results['JSON'] += 0.4
-
-    # SQL 패턴 확인
-    sql_keywords = r'\b(SELECT|INSERT|UPDATE|DELETE|CREATE|ALTER|DROP|FROM|WHERE|GROUP BY|ORDER BY|HAVING|JOIN)\b'
-    sql_matches = re.findall(sql_keywords, normalized_text, re.IGNORECASE)
-    if sql_matches:
-        # 더 많은 SQL 키워드가 있을수록 SQL일 가능성이 높음
-        # results['SQL'] += min(0.1 * len(sql_matches), 0.9)
-        # SQL 패턴 확인
-        sql_keyword_list = {
-            # 주요 DML 키워드 (높은 가중치)
-            'primary': r'\b(SELECT|INSERT|UPDATE|DELETE)\b',
-
-            # 일반적인 절 키워드 (중간 가중치)
-            'clauses': r'\b(FROM|WHERE|GROUP BY|ORDER BY|HAVING)\b',
-
-            # 조인 관련 키워드 (중간 가중치)
-            'joins': r'\b(JOIN|INNER JOIN|LEFT JOIN|RIGHT JOIN|FULL JOIN)\b',
-
-            # DDL 키워드 (낮은 가중치)
-            'ddl': r'\b(CREATE|ALTER|DROP|TRUNCATE)\b',
-
-            # 추가 SQL 표현 (낮은 가중치)
-            'additional': r'\b(AS|IN|BETWEEN|LIKE|IS NULL|IS NOT NULL|AND|OR|VALUES)\b'
-        }
-
-        # 각 키워드 그룹별로 매칭 확인
-        primary_matches = len(re.findall(sql_keyword_list['primary'], normalized_text, re.IGNORECASE)) * 0.3
-        clause_matches = len(re.findall(sql_keyword_list['clauses'], normalized_text, re.IGNORECASE)) * 0.2
-        join_matches = len(re.findall(sql_keyword_list['joins'], normalized_text, re.IGNORECASE)) * 0.2
-        ddl_matches = len(re.findall(sql_keyword_list['ddl'], normalized_text, re.IGNORECASE)) * 0.15
-        additional_matches = len(re.findall(sql_keyword_list['additional'], normalized_text, re.IGNORECASE)) * 0.1
-
-        # 전체 SQL 점수 계산
-        sql_score = primary_matches + clause_matches + join_matches + ddl_matches + additional_matches
-
-        # 최대 점수는 0.9로 제한
-        results['SQL'] += min(sql_score, 0.9)
-
-
-    # XML 선언 없는 XML 감지 추가
-    if not results['XML'] >= 0.5 and detect_xml_without_declaration(normalized_text):
-        results['XML'] += 0.7
-
-    # 가장 높은 점수를 가진 타입 결정
-    max_type = max(results, key=results.get)
-
-    # 모든 타입의 점수가 낮으면 UNKNOWN으로 설정
-    if results[max_type] < 0.3:
-        max_type = 'UNKNOWN'
-        results['UNKNOWN'] = 0.5
-
-    return {
-        'scores': results,
-        'primary_type': max_type
-    }
-
-
-def generate_filename_by_type(content, detected_type, default_name="file"):
+@instrument()
+def generate_filename_by_type(content, detected_type, default_name="file", identifier=None):
     """
     감지된 콘텐츠 타입에 따라 적절한 파일 이름과 확장자를 생성합니다.
+    같은 시각에 만든 이름도 겹치지 않도록 pid 와 순번을 붙입니다. (file_naming.FileNamer 참고)
 
     Args:
         content (str): 원본 콘텐츠
         detected_type (str): 감지된 콘텐츠 타입
         default_name (str): 기본 파일 이름
+        identifier (str): 이미 찾은 식별자 (None 이면 콘텐츠 앞부분에서 찾음)
 
     Returns:
         str: 생성된 파일 이름 (확장자 포함)
     """
-    # 현재 시간을 파일 이름에 포함시켜 고유성 보장
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-
-    # 콘텐츠에서 첫 번째 태그나 의미 있는 식별자 추출 시도
-    identifier = default_name
-
-    if detected_type == 'XML':
-        # XML 루트 요소 이름 추출 시도
-        root_match = re.search(r'<([a-zA-Z][a-zA-Z0-9_:-]*)[^>]*>', content)
-        if root_match:
-            identifier = root_match.group(1).lower()
-        extension = ".xml"
-
-    elif detected_type == 'HTML':
-        # HTML의 title 추출 시도
-        title_match = re.search(r'<title>(.*?)</title>', content, re.IGNORECASE)
-        if title_match:
-            identifier = re.sub(r'[^\w]', '_', title_match.group(1).lower())[:20]
-        extension = ".html"
-
-    elif detected_type == 'JSON':
-        # JSON에서 첫 번째 키 추출 시도
-        try:
-            data = json.loads(content)
-            if isinstance(data, dict) and data:
-                identifier = list(data.keys())[0].lower()
-        except:
-            pass
-        extension = ".json"
-
-    elif detected_type == 'SQL':
-        # SQL 문에서 동작 유형 추출 시도
-        sql_action = re.search(r'(SELECT|INSERT|UPDATE|DELETE|CREATE|ALTER|DROP)', content, re.IGNORECASE)
-        if sql_action:
-            identifier = sql_action.group(1).lower()
-        extension = ".sql"
-
-    else:
-        # 알 수 없는 타입은 기본 텍스트 파일로 처리
-        extension = ".txt"
-
-    # 식별자가 너무 길거나 특수 문자가 있는 경우 정리
-    identifier = re.sub(r'[^\w]', '_', identifier)[:20]
-
-    # 최종 파일 이름 생성
-    return f"{identifier}_{timestamp}{extension}"
-
-
-def save_detected_content(content, output_dir="."):
+    return default_namer.name(content, detected_type, identifier, default_name)
+
+
+@instrument()
+def save_detected_content(content, output_dir=".", detected_type=None, identifier=None):
     """
     콘텐츠 타입을 감지하고 적절한 파일 이름으로 저장합니다.
 
     Args:
         content (str): 저장할 콘텐츠
         output_dir (str): 출력 디렉토리
+        detected_type (str): 이미 감지한 타입 (None 이면 새로 감지)
+        identifier (str): 이미 찾은 식별자 (None 이고 타입을 새로 감지하면 감지 결과의 식별자를 사용)
 
     Returns:
         tuple: (저장된 파일 경로, 감지된 타입)
     """
     # 타입 감지
-    detection_result = improved_detect_string_type(content)
-    detected_type = detection_result['primary_type']
+    if detected_type is None:
+        detection_result = improved_detect_string_type(content)
+        detected_type = detection_result['primary_type']
+        if identifier is None:
+            identifier = detection_result['identifier']
 
     # 파일 이름 생성
-    filename = generate_filename_by_type(content, detected_type)
+    filename = generate_filename_by_type(content, detected_type, identifier=identifier)
 
     # 파일 저장 경로
     file_path = os.path.join(output_dir, filename)
@@ -297,82 +333,72 @@ def save_detected_content(content, output_dir="."):
     return file_path, detected_type
 
 
-def process_log_file(log_file_path):
+def iter_log_entries(log_file_path, encoding='utf-8', errors='replace'):
+    """
+    '타임스탬프(밀리초) [컴포넌트]' 로 시작하는 로그 항목을 순서대로 반환합니다.
+    첫 항목 이전의 줄과 내용이 없는 항목은 건너뜁니다.
+
+    Args:
+        log_file_path (str): 로그 파일 경로 또는 바이너리 스트림
+        encoding (str): 파일 인코딩
+        errors (str): 디코딩 오류 처리 방식
+
+    Yields:
+        dict: timestamp, component, level, start_line, end_line, content, content_type 을 가진 항목
+    """
+    reader = LogReader(component_level_start_pattern, encoding, errors)
+    for entry in reader.iter_entries(log_file_path):
+        entry['content_type'] = 'UNKNOWN'
+        yield entry
+
+
+@instrument()
+def process_log_file(log_file_path, encoding='utf-8', errors='replace'):
     """
     로그 파일을 처리하여 구조화된 내용을 추출합니다.
 
     Args:
         log_file_path (str): 로그 파일 경로
+        encoding (str): 파일 인코딩
+        errors (str): 디코딩 오류 처리 방식
 
     Returns:
-        list: 로그 항목 목록
+        list: 로그 항목 목록 (iter_log_entries 의 항목에 감지 단계에서 찾은 identifier 가 추가됨)
     """
-    log_entries = []
-
     try:
-        with open(log_file_path, 'r', encoding='utf-8') as f:
-            current_entry = None
-            content_buffer = []
-
-            for line in f:
-                # 새 로그 항목 시작 패턴 확인
-                entry_start = re.match(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}.\d{3}) \[([^\]]+)\]', line)
-
-                if entry_start:
-                    # 이전 항목이 있으면 저장
-                    if current_entry is not None and content_buffer:
-                        current_entry['content'] = ''.join(content_buffer)
-                        log_entries.append(current_entry)
-                        content_buffer = []
-
-                    # 새 항목 시작
-                    timestamp = entry_start.group(1)
-                    component = entry_start.group(2)
-
-                    current_entry = {
-                        'timestamp': timestamp,
-                        'component': component,
-                        'content': '',
-                        'content_type': 'UNKNOWN'
-                    }
-
-                    # 첫 줄에서 내용 부분 추출
-                    content_part = line[entry_start.end():].strip()
-                    if content_part:
-                        content_buffer.append(content_part + '\n')
-
-                else:
-                    # 현재 항목에 내용 추가
-                    if current_entry is not None:
-                        content_buffer.append(line)
-
-            # 마지막 항목 처리
-            if current_entry is not None and content_buffer:
-                current_entry['content'] = ''.join(content_buffer)
-                log_entries.append(current_entry)
-
-    except Exception as e:
+        # content_type 은 아래에서 채우므로 iter_log_entries 를 거치지 않고 항목을 그대로 받음
+        reader = LogReader(component_level_start_pattern, encoding, errors)
+        log_entries = list(reader.iter_entries(log_file_path))
+    except OSError as e:
         print(f"로그 파일 처리 중 오류 발생: {e}")
+        log_entries = []
 
-    # 각 항목의 콘텐츠 타입 감지
+    # 각 항목의 콘텐츠 타입 감지 (본문이 없는 항목은 iter_entries 가 건너뜀)
     for entry in log_entries:
-        if entry['content']:
-            detection_result = improved_detect_string_type(entry['content'])
-            entry['content_type'] = detection_result['primary_type']
+        detection_result = improved_detect_string_type(entry['content'])
+        entry['content_type'] = detection_result['primary_type']
+        entry['identifier'] = detection_result['identifier']
 
     return log_entries
 
 
-def extract_and_save_from_logs(log_file_path, output_dir="."):
+@instrument()
+def extract_and_save_from_logs(log_file_path, output_dir=".", bundle=False, max_workers=4):
     """
     로그 파일에서 구조화된 콘텐츠를 추출하여 타입별로 저장합니다.
 
+    타입과 파일 이름의 식별자는 process_log_file 에서 감지한 값을 그대로 사용하고 (다시 감지하지 않음),
+    파일 쓰기는 스레드 풀에서 처리합니다. bundle=True 이면 항목마다 파일을 만들지 않고
+    타입별 묶음 파일(<타입>.jsonl)과 색인(index.jsonl)에 이어 씁니다.
+
     Args:
         log_file_path (str): 로그 파일 경로
         output_dir (str): 출력 디렉토리
+        bundle (bool): 타입별 묶음 파일로 저장할지 여부
+        max_workers (int): 파일 쓰기 스레드 수 (bundle=False 일 때)
 
     Returns:
-        dict: 저장된 파일 정보
+        dict: 저장된 파일 정보 (bundle=True 이면 offset / length 포함)
     """
     saved_files = {
         'XML': [],
@@ -385,18 +411,21 @@ def extract_and_save_from_logs(log_file_path, output_dir="."):
     # 로그 파일 처리
     log_entries = process_log_file(log_file_path)
 
-    for entry in log_entries:
-        content = entry['content']
-        content_type = entry['content_type']
-
-        # 콘텐츠가 충분히 의미 있는 경우만 저장
-        if len(content) > 50:  # 최소 길이 기준
-            file_path, detected_type = save_detected_content(content, output_dir)
-            saved_files[detected_type].append({
-                'path': file_path,
-                'timestamp': entry['timestamp'],
-                'component': entry['component']
-            })
+    writer = BundleWriter(output_dir) if bundle else ThreadedFileWriter(output_dir, max_workers)
+    with writer:
+        for entry in log_entries:
+            content = entry['content']
+            content_type = entry['content_type']
+
+            # 콘텐츠가 충분히 의미 있는 경우만 저장
+            if len(content) > 50:  # 최소 길이 기준
+                filename = generate_filename_by_type(content, content_type, identifier=entry['identifier'])
+                location = writer.submit(filename, content, entry)
+                saved_files[content_type].append({
+                    **location,
+                    'timestamp': entry['timestamp'],
+                    'component': entry['component']
+                })
 
     return saved_files
 
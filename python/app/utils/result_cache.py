@@ -0,0 +1,207 @@
+import hashlib
+import pickle
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+# 캐시 값의 형식이 바뀌면 올려서 디스크에 남은 이전 결과를 사용하지 않도록 함
+CACHE_VERSION = b'1'
+
+# 메모리 캐시 기본 크기
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# 디스크 캐시에 몇 번 쓸 때마다 commit 할지
+DISK_COMMIT_INTERVAL = 500
+
+# 디스크 캐시에 보관할 최대 결과 수 (commit 할 때 오래 전에 쓴 결과부터 지움)
+DEFAULT_MAX_DISK_ENTRIES = 1000000
+
+# 메시지 앞의 타임스탬프 (밀리초 포함)
+_timestamp_prefix_pattern = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:[.,]\d+)?')
+
+# get 에서 '결과 없음' 을 None 결과와 구분하기 위한 값
+_MISSING = object()
+
+
+def content_key(content: str, namespace: bytes = b'') -> bytes:
+    """
+    메시지 앞의 타임스탬프를 뺀 본문의 해시를 반환합니다.
+    타임스탬프만 다른 같은 메시지(반복되는 SOAP 요청, SQL 등)는 같은 키가 됩니다.
+
+    Args:
+        content (str): 로그 메시지
+        namespace (bytes): 결과에 영향을 주는 설정 (설정이 다르면 다른 키)
+
+    Returns:
+        bytes: 캐시 키
+    """
+    match = _timestamp_prefix_pattern.match(content)
+    body = content[match.end():] if match else content
+    return hashlib.blake2b(body.encode('utf-8', 'surrogatepass'), digest_size=16,
+                           key=CACHE_VERSION + b':' + namespace).digest()
+
+
+class ResultCache:
+    """
+    메시지 본문 해시를 키로 하는 분석 결과 캐시 (LRU).
+
+    메모리에는 최대 max_entries 개, 추정 크기 합계 max_bytes 까지 보관하며 넘으면 가장 오래 사용하지 않은
+    결과부터 버립니다. disk_path 를 지정하면 SQLite 파일에도 저장하여 다음 실행에서 다시 사용하고,
+    디스크에는 최근에 쓴 max_disk_entries 개까지만 남깁니다. (실행을 거듭해도 파일이 계속 커지지 않음)
+    캐시된 결과는 여러 메시지가 함께 사용하므로 호출하는 쪽에서 수정하면 안 됩니다.
+
+    사용 예:
+        cache = ResultCache(disk_path='analysis-cache.db')
+        detected = cache.get_or_compute(content, improved_detect_string_type)
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 disk_path: Optional[str] = None, namespace: bytes = b'',
+                 max_disk_entries: Optional[int] = DEFAULT_MAX_DISK_ENTRIES):
+        """
+        Args:
+            max_entries (int): 메모리에 보관할 최대 결과 수
+            max_bytes (int): 메모리에 보관할 결과의 추정 크기 합계 (바이트)
+            disk_path (str): 디스크 캐시(SQLite) 파일 경로 (None 이면 메모리만 사용)
+            namespace (bytes): 결과에 영향을 주는 설정 (키에 포함, 최대 60 바이트)
+            max_disk_entries (int): 디스크 캐시에 보관할 최대 결과 수 (None 이면 제한 없음)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+        self.max_disk_entries = max_disk_entries
+        self.namespace = namespace
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self.size = 0
+        self._entries: 'OrderedDict[bytes, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        self._disk_writes = 0
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute("CREATE TABLE IF NOT EXISTS result_cache (key BLOB PRIMARY KEY, value BLOB)")
+            self._disk.commit()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def get(self, key: bytes, default: Any = None) -> Any:
+        """키에 해당하는 결과 (메모리 -> 디스크 순으로 찾음, 없으면 default)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            if self._disk is not None:
+                row = self._disk.execute("SELECT value FROM result_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self.disk_hits += 1
+                    value = pickle.loads(row[0])
+                    self._store(key, value, len(row[0]))
+                    return value
+
+            self.misses += 1
+            return default
+
+    def put(self, key: bytes, value: Any, size: Optional[int] = None) -> None:
+        """
+        결과를 저장합니다.
+
+        Args:
+            key (bytes): 캐시 키 (content_key)
+            value (Any): 저장할 결과
+            size (int): 결과의 추정 크기 (바이트, None 이면 pickle 크기)
+        """
+        data = None
+        if size is None or self._disk is not None:
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._store(key, value, len(data) if size is None else size)
+            if self._disk is not None:
+                self._disk.execute("INSERT OR REPLACE INTO result_cache (key, value) VALUES (?, ?)", (key, data))
+                self._disk_writes += 1
+                if self._disk_writes % DISK_COMMIT_INTERVAL == 0:
+                    self._commit_disk()
+
+    def get_or_compute(self, content: str, compute: Callable[[str], Any], size: Optional[int] = None) -> Any:
+        """
+        캐시된 결과가 있으면 반환하고, 없으면 compute(content) 결과를 저장한 뒤 반환합니다.
+
+        Args:
+            content (str): 로그 메시지 (키는 타임스탬프를 뺀 본문으로 계산)
+            compute (Callable): 결과를 계산하는 함수
+            size (int): 결과의 추정 크기 (None 이면 메시지 길이의 두 배)
+        """
+        key = content_key(content, self.namespace)
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute(content)
+            self.put(key, value, len(content) * 2 if size is None else size)
+        return value
+
+    def _store(self, key: bytes, value: Any, size: int) -> None:
+        entries = self._entries
+        previous = entries.pop(key, None)
+        if previous is not None:
+            self.size -= previous[1]
+        entries[key] = (value, size)
+        self.size += size
+
+        while entries and (len(entries) > self.max_entries or self.size > self.max_bytes):
+            _, (_, evicted_size) = entries.popitem(last=False)
+            self.size -= evicted_size
+            self.evictions += 1
+
+    def _commit_disk(self) -> None:
+        """디스크 캐시를 max_disk_entries 개로 줄이고 commit (잠금을 잡은 상태에서 호출)"""
+        if self.max_disk_entries is not None:
+            # INSERT OR REPLACE 는 항상 가장 큰 rowid 다음 값으로 넣으므로 rowid 순서가 쓴 순서
+            # (개수를 세지 않고 rowid 범위로 지우므로 수백만 행이어도 빠름)
+            newest = self._disk.execute("SELECT max(rowid) FROM result_cache").fetchone()[0]
+            if newest is not None and newest > self.max_disk_entries:
+                cursor = self._disk.execute("DELETE FROM result_cache WHERE rowid <= ?",
+                                            (newest - self.max_disk_entries,))
+                self.disk_evictions += cursor.rowcount
+        self._disk.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'size': self.size,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'disk_evictions': self.disk_evictions,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0
+        }
+
+    def clear(self) -> None:
+        """메모리 캐시만 비움 (디스크 캐시는 유지)"""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._disk is not None:
+                self._commit_disk()
+                self._disk.close()
+                self._disk = None
+
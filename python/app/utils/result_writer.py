@@ -0,0 +1,155 @@
+import csv
+import json
+import sys
+from typing import Optional, TextIO
+
+from app.utils.log_parser_utils import get_message_timestamp
+
+# 지원하는 출력 형식
+OUTPUT_FORMATS = ('text', 'jsonl', 'csv')
+
+# CSV 컬럼 (SQL / XML 은 여러 개일 수 있으므로 JSON 배열 문자열로 저장)
+CSV_COLUMNS = ('source', 'start_line', 'end_line', 'timestamp', 'primary_type', 'scores', 'sql_queries',
+               'xml_blocks', 'content')
+
+
+def result_record(result: dict, source: Optional[str] = None, include_content: bool = False) -> dict:
+    """
+    analyze_message 결과를 출력용 레코드로 변환합니다.
+
+    Args:
+        result (dict): analyze_message 결과
+        source (str): 로그 파일 경로 (표준 입력이면 '-')
+        include_content (bool): 메시지 원문을 포함할지 여부
+
+    Returns:
+        dict: source, start_line, end_line, timestamp, primary_type, scores, sql_queries, xml_blocks (, content)
+    """
+    detected = result['detected']
+    record = {
+        'source': source,
+        'start_line': result['start_line'],
+        'end_line': result['end_line'],
+        'timestamp': get_message_timestamp(result['content']),
+        'primary_type': detected['primary_type'],
+        'scores': detected['scores'],
+        'sql_queries': result['sql_queries'],
+        'xml_blocks': [xml for xml, _ in result['xml_blocks']] if result['xml_blocks'] is not None else None,
+    }
+    if include_content:
+        record['content'] = result['content']
+    return record
+
+
+class ResultWriter:
+    """
+    분석 결과를 만들어지는 즉시 한 건씩 출력합니다. (모든 결과를 모은 뒤 쓰지 않음)
+
+    사용 예:
+        with open_result_writer('jsonl', 'result.jsonl') as writer:
+            for result in iter_analyzed_messages('nohup.out'):
+                writer.write(result, 'nohup.out')
+    """
+
+    def __init__(self, stream: TextIO, include_content: bool = False, close_stream: bool = False):
+        self.stream = stream
+        self.include_content = include_content
+        self.close_stream = close_stream
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, result: dict, source: Optional[str] = None) -> None:
+        self._write(result, source)
+        self.count += 1
+
+    def _write(self, result: dict, source: Optional[str]) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+    def close(self) -> None:
+        if self.close_stream:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+class TextResultWriter(ResultWriter):
+    """사람이 읽는 형식 (기존 main.py 출력과 같음)"""
+
+    def _write(self, result: dict, source: Optional[str]) -> None:
+        write = self.stream.write
+        content = result['content'] if self.include_content else result['content'][:50] + ' + ...'
+        write(f"Message from line {result['start_line']} to {result['end_line']}  {content}\n")
+
+        detected = result['detected']
+        write(f"감지된 타입: [{detected['primary_type']}] 타입별 점수: [{detected['scores']}]\n")
+
+        if result['sql_queries'] is not None:
+            write(f"{result['content']}\n")
+            write(f"추출된 SQL 쿼리 수: {len(result['sql_queries'])}\n")
+            for query in result['sql_queries']:
+                write(f"{query}\n{'-' * 50}\n")
+
+        if result['xml_blocks'] is not None:
+            for _, single_line in result['xml_blocks']:
+                write(f"{single_line}\n")
+
+
+class JsonlResultWriter(ResultWriter):
+    """한 줄에 JSON 레코드 하나"""
+
+    def _write(self, result: dict, source: Optional[str]) -> None:
+        record = result_record(result, source, self.include_content)
+        self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+class CsvResultWriter(ResultWriter):
+    """CSV (scores / sql_queries / xml_blocks 는 JSON 문자열)"""
+
+    def __init__(self, stream: TextIO, include_content: bool = False, close_stream: bool = False):
+        super().__init__(stream, include_content, close_stream)
+        columns = CSV_COLUMNS if include_content else CSV_COLUMNS[:-1]
+        self._writer = csv.DictWriter(stream, fieldnames=columns)
+        self._writer.writeheader()
+
+    def _write(self, result: dict, source: Optional[str]) -> None:
+        record = result_record(result, source, self.include_content)
+        for key in ('scores', 'sql_queries', 'xml_blocks'):
+            if record[key] is not None:
+                record[key] = json.dumps(record[key], ensure_ascii=False)
+        self._writer.writerow(record)
+
+
+_WRITERS = {
+    'text': TextResultWriter,
+    'jsonl': JsonlResultWriter,
+    'csv': CsvResultWriter,
+}
+
+
+def open_result_writer(output_format: str = 'text', path: Optional[str] = None,
+                       include_content: bool = False) -> ResultWriter:
+    """
+    출력 형식에 맞는 ResultWriter 를 만듭니다.
+
+    Args:
+        output_format (str): 'text', 'jsonl' 또는 'csv'
+        path (str): 출력 파일 경로 (None 또는 '-' 이면 표준 출력)
+        include_content (bool): 메시지 원문을 포함할지 여부
+
+    Returns:
+        ResultWriter: 결과 출력기
+    """
+    if output_format not in _WRITERS:
+        raise ValueError(f"지원하지 않는 출력 형식: {output_format}")
+    if path is None or path == '-':
+        return _WRITERS[output_format](sys.stdout, include_content)
+    stream = open(path, 'w', encoding='utf-8', newline='' if output_format == 'csv' else None)
+    return _WRITERS[output_format](stream, include_content, close_stream=True)
@@ -0,0 +1,196 @@
+import csv
+import hashlib
+import heapq
+import json
+import re
+from itertools import count as sequence
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
+
+# 리터럴 / 숫자 / 공백을 한 번에 찾는 패턴
+sql_literal_pattern = re.compile(
+    r"(?P<string>'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")"
+    r"|(?P<number>\b0x[0-9a-fA-F]+\b|(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b)"
+    r"|(?P<space>\s+)"
+)
+
+# 자리표시자만 있는 IN 목록: in (?, ?, ?) -> in (?+)
+sql_in_list_pattern = re.compile(r'\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+
+
+def _replace_literal(match):
+    return ' ' if match.lastgroup == 'space' else '?'
+
+
+def normalize_sql(query: str) -> str:
+    """
+    SQL 문에서 문자열 / 숫자 리터럴과 IN 목록을 자리표시자로 바꾸고 공백과 대소문자를 정리합니다.
+    같은 형태의 쿼리는 같은 문자열이 됩니다.
+
+    Args:
+        query (str): SQL 문
+
+    Returns:
+        str: 정규화된 SQL 문
+    """
+    # 끝의 ';' 유무와 관계없이 같은 지문이 되도록 제거
+    normalized = sql_literal_pattern.sub(_replace_literal, query).strip().rstrip(';').rstrip().lower()
+    return sql_in_list_pattern.sub('in (?+)', normalized)
+
+
+def fingerprint_sql(query: str) -> Tuple[str, str]:
+    """
+    SQL 문의 지문(fingerprint)을 계산합니다.
+
+    Returns:
+        tuple: (지문 해시, 정규화된 SQL 문)
+    """
+    normalized = normalize_sql(query)
+    digest = hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).hexdigest()
+    return digest, normalized
+
+
+class SQLFingerprintStats:
+    """지문 하나에 대한 집계 정보"""
+    __slots__ = ('fingerprint', 'statement', 'count', 'error', 'first_timestamp', 'last_timestamp', 'line_ranges')
+
+    def __init__(self, fingerprint: str, statement: str, count: int = 0, error: int = 0):
+        self.fingerprint = fingerprint
+        self.statement = statement
+        self.count = count
+        # Space-Saving 교체로 생길 수 있는 최대 과대 집계 수
+        self.error = error
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.line_ranges = []
+
+    def to_dict(self) -> dict:
+        return {
+            'fingerprint': self.fingerprint,
+            'count': self.count,
+            'error': self.error,
+            'first_timestamp': self.first_timestamp,
+            'last_timestamp': self.last_timestamp,
+            'line_ranges': [list(line_range) for line_range in self.line_ranges],
+            'statement': self.statement
+        }
+
+
+class SQLFingerprintIndex:
+    """
+    SQL 지문별 실행 횟수, 처음 / 마지막 타임스탬프, 로그 줄 범위를 집계합니다.
+
+    Space-Saving 알고리즘으로 최대 capacity 개의 지문만 유지하므로
+    수백만 개의 SQL 문이 있는 로그에서도 메모리 사용량이 일정합니다.
+    자주 나오는 지문은 정확히 집계되고, 교체된 지문의 오차는 error 로 표시됩니다.
+    """
+
+    def __init__(self, capacity: int = 1000, max_line_ranges: int = 10):
+        """
+        Args:
+            capacity (int): 유지할 최대 지문 수
+            max_line_ranges (int): 지문별로 보관할 최대 줄 범위 수 (처음 나온 것부터)
+        """
+        self.capacity = capacity
+        self.max_line_ranges = max_line_ranges
+        self.total = 0
+        self._stats: Dict[str, SQLFingerprintStats] = {}
+        # (등록 당시 count, 순번, 지문) - count 는 늘어나기만 하므로 꺼낼 때 최신 값과 비교
+        self._heap = []
+        self._sequence = sequence()
+
+    def __len__(self):
+        return len(self._stats)
+
+    def add(self, query: str, timestamp: Optional[str] = None,
+            start_line: Optional[int] = None, end_line: Optional[int] = None) -> SQLFingerprintStats:
+        """
+        SQL 문 하나를 집계합니다.
+
+        Args:
+            query (str): SQL 문
+            timestamp (str): 로그 메시지의 타임스탬프
+            start_line (int): 로그 메시지 시작 줄
+            end_line (int): 로그 메시지 끝 줄
+
+        Returns:
+            SQLFingerprintStats: 갱신된 집계 정보
+        """
+        fingerprint, statement = fingerprint_sql(query)
+        self.total += 1
+
+        stats = self._stats.get(fingerprint)
+        if stats is None:
+            stats = self._insert(fingerprint, statement)
+
+        stats.count += 1
+        if timestamp is not None:
+            if stats.first_timestamp is None:
+                stats.first_timestamp = timestamp
+            stats.last_timestamp = timestamp
+        if start_line is not None and len(stats.line_ranges) < self.max_line_ranges:
+            stats.line_ranges.append((start_line, end_line if end_line is not None else start_line))
+
+        return stats
+
+    def add_many(self, queries: Iterable[str], timestamp: Optional[str] = None,
+                 start_line: Optional[int] = None, end_line: Optional[int] = None) -> None:
+        for query in queries:
+            self.add(query, timestamp, start_line, end_line)
+
+    def _insert(self, fingerprint: str, statement: str) -> SQLFingerprintStats:
+        if len(self._stats) < self.capacity:
+            stats = SQLFingerprintStats(fingerprint, statement)
+        else:
+            # 가장 적게 나온 지문을 교체하고 그 횟수를 이어받음 (Space-Saving)
+            evicted = self._pop_min()
+            stats = SQLFingerprintStats(fingerprint, statement, count=evicted.count, error=evicted.count)
+
+        self._stats[fingerprint] = stats
+        heapq.heappush(self._heap, (stats.count, next(self._sequence), fingerprint))
+        return stats
+
+    def _pop_min(self) -> SQLFingerprintStats:
+        while True:
+            count, _, fingerprint = heapq.heappop(self._heap)
+            stats = self._stats[fingerprint]
+            if stats.count == count:
+                del self._stats[fingerprint]
+                return stats
+            # 등록 이후 횟수가 늘었으면 최신 값으로 다시 넣음
+            heapq.heappush(self._heap, (stats.count, next(self._sequence), fingerprint))
+
+    def top(self, k: Optional[int] = None) -> List[SQLFingerprintStats]:
+        """실행 횟수가 많은 순서로 지문 집계 정보를 반환"""
+        ordered = sorted(self._stats.values(), key=lambda stats: stats.count, reverse=True)
+        return ordered if k is None else ordered[:k]
+
+    def export_json(self, fp: TextIO, k: Optional[int] = None) -> None:
+        """집계 결과를 JSON 으로 기록"""
+        json.dump({
+            'total': self.total,
+            'capacity': self.capacity,
+            'fingerprints': [stats.to_dict() for stats in self.top(k)]
+        }, fp, ensure_ascii=False, indent=2)
+
+    def export_csv(self, fp: TextIO, k: Optional[int] = None) -> None:
+        """집계 결과를 CSV 로 기록 (줄 범위는 'start-end;start-end' 형식)"""
+        writer = csv.writer(fp)
+        writer.writerow(['fingerprint', 'count', 'error', 'first_timestamp', 'last_timestamp', 'line_ranges', 'statement'])
+        for stats in self.top(k):
+            writer.writerow([
+                stats.fingerprint,
+                stats.count,
+                stats.error,
+                stats.first_timestamp or '',
+                stats.last_timestamp or '',
+                ';'.join(f'{start}-{end}' for start, end in stats.line_ranges),
+                stats.statement
+            ])
+
+    def export(self, path: str, k: Optional[int] = None) -> None:
+        """파일 확장자(.csv / 그 외 JSON)에 따라 집계 결과를 파일로 저장"""
+        with open(path, 'w', encoding='utf-8', newline='') as fp:
+            if path.lower().endswith('.csv'):
+                self.export_csv(fp, k)
+            else:
+                self.export_json(fp, k)
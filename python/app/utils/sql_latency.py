@@ -0,0 +1,422 @@
+import csv
+import datetime
+import heapq
+import json
+import re
+from functools import lru_cache
+from itertools import count as sequence
+from typing import Dict, Iterable, List, Optional, TextIO
+
+from app.utils.metrics import StageMetrics
+from app.utils.sql_fingerprint import fingerprint_sql
+from app.utils.sql_utils import iter_sql_spans
+
+# 실행 시간 단위
+_DURATION_UNITS = r'(?:ns|us|µs|msec|ms|millis|milliseconds|sec|seconds|s|min|mins|minutes)'
+
+# 실행 시간 표시: Hibernate 세션 통계, log4jdbc '{executed in N msec}', 'elapsed N ms', 'execution time: N ms',
+# 'executed in N ms', 'took N ms', 'duration: N ms'
+# 단위가 없는 숫자는 실행 시간으로 보지 않음 ('took 3 attempts', 'elapsed 10 rows' 제외)
+sql_duration_pattern = re.compile(
+    # 표시의 첫 글자가 아닌 위치는 바로 건너뛰도록 후보 위치를 좁힘
+    r'(?=[\d{etd])(?:'
+    r'(?P<nanos>\d+) nanoseconds spent executing (?P<statements>\d+) (?:JDBC )?statements'
+    r'|\{executed in (?P<log4jdbc>\d+) ?msec\}'
+    r'|\b(?:elapsed(?: time)?|execution time|executed in)\s*[:=]?\s*'
+    r'(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>' + _DURATION_UNITS + r')\b'
+    r'|\b(?:took|duration)\s*[:=]?\s*'
+    r'(?P<unit_value>\d+(?:\.\d+)?)\s*(?P<required_unit>' + _DURATION_UNITS + r')\b'
+    r')',
+    re.IGNORECASE
+)
+
+
+# 밀리초까지의 타임스탬프 (간격 계산용)
+sql_timestamp_pattern = re.compile(r'\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[.,]\d{1,6})?')
+
+_UNIT_NANOS = {
+    'ns': 1, 'us': 1000, 'µs': 1000,
+    'ms': 1000 ** 2, 'msec': 1000 ** 2, 'millis': 1000 ** 2, 'milliseconds': 1000 ** 2,
+    's': 1000 ** 3, 'sec': 1000 ** 3, 'seconds': 1000 ** 3,
+    'min': 60 * 1000 ** 3, 'mins': 60 * 1000 ** 3, 'minutes': 60 * 1000 ** 3,
+}
+
+# 실행 시간 표시를 기다리는 최대 메시지 수 (SQL 메시지 이후)
+DEFAULT_WINDOW = 3
+
+# 집계할 최대 SQL 지문 수 (넘으면 가장 적게 나온 지문을 교체)
+DEFAULT_CAPACITY = 1000
+
+# 같은 SQL 문의 지문을 재사용할 개수 (자리표시자(?)를 쓰는 SQL 은 같은 문장이 반복됨)
+FINGERPRINT_CACHE_SIZE = 4096
+
+# 실행 시간 출처
+SOURCE_MARKER = 'marker'
+SOURCE_GAP = 'gap'
+
+
+_cached_fingerprint = lru_cache(maxsize=FINGERPRINT_CACHE_SIZE)(fingerprint_sql)
+
+
+def parse_durations(content: str, exclude_sql: bool = False) -> List[int]:
+    """
+    메시지 안의 실행 시간 표시를 나노초 목록으로 반환합니다.
+    Hibernate 세션 통계('N nanoseconds spent executing M JDBC statements')는 문장 M 개의 평균으로 M 번 들어갑니다.
+    단위가 없는 숫자는 실행 시간으로 보지 않습니다. (단위 없이 밀리초를 쓰는 log4jdbc 는 '{executed in N msec}' 형식만 인정)
+
+    Args:
+        content (str): 메시지
+        exclude_sql (bool): SQL 문 안(sql_utils.iter_sql_spans 구간)의 표시를 제외할지 여부 ('where duration = 30' 등)
+                            log4jdbc 처럼 문장 끝에 붙는 '{executed in N msec}' 는 SQL 문 안에서도 사용
+    """
+    durations = []
+    # SQL 문 구간 (확인이 필요한 표시를 처음 만났을 때 계산)
+    spans = None
+    for match in sql_duration_pattern.finditer(content):
+        if exclude_sql and match.group('log4jdbc') is None and match.group('nanos') is None:
+            if spans is None:
+                spans = list(iter_sql_spans(content))
+            start = match.start()
+            if any(span_start <= start < span_end for span_start, span_end in spans):
+                continue
+        if match.group('nanos') is not None:
+            statements = int(match.group('statements'))
+            if statements:
+                durations.extend([int(match.group('nanos')) // statements] * statements)
+        elif match.group('log4jdbc') is not None:
+            durations.append(int(match.group('log4jdbc')) * _UNIT_NANOS['ms'])
+        elif match.group('value') is not None:
+            durations.append(int(float(match.group('value')) * _UNIT_NANOS[match.group('unit').lower()]))
+        else:
+            durations.append(int(float(match.group('unit_value')) * _UNIT_NANOS[match.group('required_unit').lower()]))
+    return durations
+
+
+def parse_timestamp_nanos(content: str) -> Optional[int]:
+    """메시지 시작 타임스탬프를 나노초 단위 정수로 (없으면 None, 두 값의 차이만 의미가 있음)"""
+    match = sql_timestamp_pattern.match(content)
+    if match is None:
+        return None
+    moment = datetime.datetime.fromisoformat(match.group(0).replace(',', '.'))
+    return (moment.toordinal() * 86400 + moment.hour * 3600 + moment.minute * 60 + moment.second) * 10 ** 9 \
+        + moment.microsecond * 1000
+
+
+def _histogram_summary(histogram: StageMetrics) -> dict:
+    """히스토그램의 실행 횟수, 누적 / 평균 / 분위 / 최대 시간(ms)과 가장 느린 실행"""
+    return {
+        'count': histogram.count,
+        'total_ms': histogram.total_ns / 1e6,
+        'mean_ms': histogram.total_ns / histogram.count / 1e6 if histogram.count else 0.0,
+        'p50_ms': histogram.quantile(0.5) * 1000,
+        'p95_ms': histogram.quantile(0.95) * 1000,
+        'p99_ms': histogram.quantile(0.99) * 1000,
+        'max_ms': histogram.max_ns / 1e6,
+        'slowest': [
+            {'ms': elapsed_ns / 1e6, 'start_line': start_line, 'end_line': end_line}
+            for elapsed_ns, _, start_line, end_line in sorted(histogram.slowest, reverse=True)
+        ],
+    }
+
+
+class StatementLatency:
+    """SQL 지문 하나의 실행 시간 히스토그램과 가장 느린 실행 (고정 크기)"""
+    __slots__ = ('fingerprint', 'statement', 'count', 'error', 'histogram', 'gap_histogram')
+
+    def __init__(self, fingerprint: str, statement: str, slowest: int, count: int = 0):
+        self.fingerprint = fingerprint
+        self.statement = statement
+        # Space-Saving 실행 횟수 추정값과 교체로 생길 수 있는 최대 과대 집계 수 (교체된 지문의 횟수를 이어받음)
+        # 히스토그램은 이어받지 않으므로 교체 이후에 기록한 실행만 들어 있음
+        self.count = count
+        self.error = count
+        # 로그-선형 히스토그램 (오차 12.5% 이내) 과 가장 느린 실행의 줄 범위
+        # 실행 시간 표시로 찾은 값과 타임스탬프 간격(대기 시간 포함)으로 추정한 값은 따로 집계
+        self.histogram = StageMetrics(slowest)
+        self.gap_histogram = StageMetrics(slowest)
+
+    def to_dict(self) -> dict:
+        """실행 시간 표시 기준의 분포 ('gap' 에 타임스탬프 간격으로 추정한 분포)"""
+        row = {
+            'fingerprint': self.fingerprint,
+            'estimated_count': self.count,
+            'error': self.error,
+            'marker_count': self.histogram.count,
+            'gap_count': self.gap_histogram.count,
+        }
+        row.update(_histogram_summary(self.histogram))
+        row['gap'] = _histogram_summary(self.gap_histogram)
+        row['statement'] = self.statement
+        return row
+
+
+class _PendingStatements:
+    """실행 시간을 기다리는 SQL 메시지"""
+    __slots__ = ('queries', 'timestamp', 'start_line', 'end_line', 'gap_ns', 'waited')
+
+    def __init__(self, queries: List[str], timestamp: Optional[int], start_line: int, end_line: int):
+        self.queries = queries
+        self.timestamp = timestamp
+        self.start_line = start_line
+        self.end_line = end_line
+        # 다음 메시지와의 타임스탬프 간격
+        self.gap_ns = None
+        self.waited = 0
+
+
+class SQLLatencyIndex:
+    """
+    추출한 SQL 문에 실행 시간을 연결하여 정규화한 문장(지문)별 지연 시간 분포를 집계합니다.
+
+    실행 시간은 다음 순서로 찾습니다.
+        1. SQL 과 같은 메시지 안의 실행 시간 표시 (p6spy 'took 3ms | ...' 등)
+        2. 뒤따르는 window 개 메시지 안의 실행 시간 표시 (Hibernate 통계, 'took N ms', 'elapsed' 등)
+        3. (use_gap=True 이면) SQL 메시지와 다음 메시지의 타임스탬프 간격
+           간격에는 다음 로그가 나올 때까지의 대기 시간이 들어가므로 실행 시간 표시와 따로 집계합니다.
+    한 메시지에 문장과 실행 시간 표시가 같은 개수이면 순서대로 짝짓고,
+    그렇지 않으면 첫 실행 시간을 문장 수로 나누어 각 문장에 연결합니다.
+
+    지문별 히스토그램은 로그-선형 구간(metrics.StageMetrics)이므로 실행 횟수와 관계없이 크기가 일정하고,
+    지문 수는 sql_fingerprint.SQLFingerprintIndex 와 같은 Space-Saving 방식으로 capacity 개까지만 유지합니다.
+    (가장 적게 나온 지문을 교체하므로 로그 뒤쪽에서 처음 나온 자주 실행되는 문장도 집계됨)
+
+    사용 예:
+        latency = SQLLatencyIndex()
+        for result in iter_analyzed_messages('nohup.out'):
+            latency.add(result)
+        latency.export('latency.json')
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, slowest: int = 5, window: int = DEFAULT_WINDOW,
+                 use_gap: bool = False, top_slowest: int = 20):
+        """
+        Args:
+            capacity (int): 유지할 최대 지문 수
+            slowest (int): 지문별로 보관할 가장 느린 실행 수
+            window (int): SQL 메시지 뒤에서 실행 시간 표시를 찾을 메시지 수
+            use_gap (bool): 실행 시간 표시가 없으면 다음 메시지와의 타임스탬프 간격을 사용할지 여부
+            top_slowest (int): 전체에서 출처별로 보관할 가장 느린 실행 수
+        """
+        self.capacity = capacity
+        self.slowest = slowest
+        self.window = window
+        self.use_gap = use_gap
+        self.top_slowest = top_slowest
+        self.total = 0
+        self.gap_matched = 0
+        self.unmatched = 0
+        self._stats: Dict[str, StatementLatency] = {}
+        # (등록 당시 count, 순번, 지문) - count 는 늘어나기만 하므로 꺼낼 때 최신 값과 비교
+        self._heap = []
+        # 실행 시간 출처별 (실행 시간, 순번, 지문, 정규화된 문장, 시작 줄, 끝 줄) 의 최소 힙
+        self._slowest_heaps = {SOURCE_MARKER: [], SOURCE_GAP: []}
+        self._sequence = sequence()
+        # 입력(source)별로 실행 시간을 기다리는 SQL 메시지
+        self._pending: Dict[Optional[str], _PendingStatements] = {}
+
+    def __len__(self):
+        return len(self._stats)
+
+    def add(self, result: dict, source: Optional[str] = None) -> None:
+        """
+        분석 결과(또는 start_line, end_line, content, sql_queries 를 가진 메시지)를 파일 순서대로 하나씩 넣습니다.
+        실행 시간 표시는 SQL 이 없는 메시지에 있을 수 있으므로 모든 메시지를 넣어야 합니다.
+
+        Args:
+            result (dict): analyze_message 결과
+            source (str): 로그 파일 경로 (여러 파일을 섞어 넣을 때 파일별로 연결)
+        """
+        content = result['content']
+        queries = result.get('sql_queries')
+        # 실행 시간 표시가 없는 메시지는 정규식 탐색을 건너뜀 (대소문자 구분 없이 확인)
+        lowered = content.lower()
+        if 'took' in lowered or 'elapsed' in lowered or 'execut' in lowered or 'duration' in lowered:
+            # SQL 문 안의 텍스트('where duration = 30' 등)는 실행 시간 표시로 보지 않음
+            durations = parse_durations(content, exclude_sql=bool(queries))
+        else:
+            durations = []
+
+        pending = self._pending.get(source)
+        if pending is not None:
+            if pending.gap_ns is None and pending.timestamp is not None:
+                timestamp = parse_timestamp_nanos(content)
+                if timestamp is not None:
+                    pending.gap_ns = max(timestamp - pending.timestamp, 0)
+            pending.waited += 1
+            if durations and not queries:
+                self._record_all(pending, durations, SOURCE_MARKER)
+                del self._pending[source]
+                return
+            if queries or pending.waited >= self.window:
+                self._resolve_without_marker(pending)
+                del self._pending[source]
+
+        if not queries:
+            return
+        if durations:
+            self._record_all(_PendingStatements(queries, None, result['start_line'], result['end_line']),
+                             durations, SOURCE_MARKER)
+        else:
+            self._pending[source] = _PendingStatements(queries, parse_timestamp_nanos(content), result['start_line'],
+                                                       result['end_line'])
+
+    def add_many(self, results: Iterable[dict], source: Optional[str] = None) -> None:
+        for result in results:
+            self.add(result, source)
+
+    def flush(self) -> None:
+        """입력이 끝났을 때 실행 시간을 기다리는 SQL 을 처리 (간격을 알 수 없으므로 연결하지 못함)"""
+        for pending in self._pending.values():
+            self._resolve_without_marker(pending)
+        self._pending.clear()
+
+    def _resolve_without_marker(self, pending: _PendingStatements) -> None:
+        if self.use_gap and pending.gap_ns is not None:
+            self._record_all(pending, [pending.gap_ns], SOURCE_GAP)
+        else:
+            self.unmatched += len(pending.queries)
+
+    def _record_all(self, pending: _PendingStatements, durations: List[int], source: str) -> None:
+        queries = pending.queries
+        if len(durations) != len(queries):
+            durations = [durations[0] // len(queries)] * len(queries)
+        for query, duration in zip(queries, durations):
+            self.record(query, duration, pending.start_line, pending.end_line, source)
+
+    def record(self, query: str, duration_ns: int, start_line: Optional[int] = None,
+               end_line: Optional[int] = None, source: str = SOURCE_MARKER) -> StatementLatency:
+        """
+        SQL 문 하나의 실행 시간을 기록합니다.
+
+        Args:
+            query (str): SQL 문
+            duration_ns (int): 실행 시간 (나노초)
+            start_line (int): 로그 메시지 시작 줄
+            end_line (int): 로그 메시지 끝 줄
+            source (str): 실행 시간 출처 ('marker' 또는 'gap')
+
+        Returns:
+            StatementLatency: 갱신된 집계 정보
+        """
+        fingerprint, statement = _cached_fingerprint(query)
+        stats = self._stats.get(fingerprint)
+        if stats is None:
+            stats = self._insert(fingerprint, statement)
+
+        self.total += 1
+        stats.count += 1
+        lines = (start_line, end_line if end_line is not None else start_line) if start_line is not None else None
+        if source == SOURCE_GAP:
+            self.gap_matched += 1
+            stats.gap_histogram.observe(duration_ns, len(query), lines)
+        else:
+            stats.histogram.observe(duration_ns, len(query), lines)
+
+        if lines is not None and self.top_slowest:
+            # 교체된 지문의 문장도 가장 느린 실행 목록에는 남김
+            slowest_heap = self._slowest_heaps[source]
+            item = (duration_ns, next(self._sequence), fingerprint, statement, lines[0], lines[1])
+            if len(slowest_heap) < self.top_slowest:
+                heapq.heappush(slowest_heap, item)
+            elif duration_ns > slowest_heap[0][0]:
+                heapq.heapreplace(slowest_heap, item)
+        return stats
+
+    def _insert(self, fingerprint: str, statement: str) -> StatementLatency:
+        if len(self._stats) < self.capacity:
+            stats = StatementLatency(fingerprint, statement, self.slowest)
+        else:
+            # 가장 적게 나온 지문을 교체하고 그 횟수를 이어받음 (Space-Saving)
+            stats = StatementLatency(fingerprint, statement, self.slowest, count=self._pop_min().count)
+
+        self._stats[fingerprint] = stats
+        heapq.heappush(self._heap, (stats.count, next(self._sequence), fingerprint))
+        return stats
+
+    def _pop_min(self) -> StatementLatency:
+        while True:
+            count, _, fingerprint = heapq.heappop(self._heap)
+            stats = self._stats[fingerprint]
+            if stats.count == count:
+                del self._stats[fingerprint]
+                return stats
+            # 등록 이후 횟수가 늘었으면 최신 값으로 다시 넣음
+            heapq.heappush(self._heap, (stats.count, next(self._sequence), fingerprint))
+
+    def top(self, k: Optional[int] = None) -> List[StatementLatency]:
+        """누적 실행 시간(실행 시간 표시 기준, 같으면 타임스탬프 간격 기준)이 긴 순서로 지문별 집계 정보를 반환"""
+        ordered = sorted(self._stats.values(),
+                         key=lambda stats: (stats.histogram.total_ns, stats.gap_histogram.total_ns), reverse=True)
+        return ordered if k is None else ordered[:k]
+
+    def slowest_executions(self, source: str = SOURCE_MARKER) -> List[dict]:
+        """
+        전체에서 가장 느린 실행 (느린 순서, 줄 범위 포함)
+
+        Args:
+            source (str): 실행 시간 출처 ('marker' 또는 'gap')
+        """
+        return [
+            {'ms': duration_ns / 1e6, 'source': source, 'fingerprint': fingerprint, 'start_line': start_line,
+             'end_line': end_line, 'statement': statement}
+            for duration_ns, _, fingerprint, statement, start_line, end_line
+            in sorted(self._slowest_heaps[source], reverse=True)
+        ]
+
+    def export_json(self, fp: TextIO, k: Optional[int] = None) -> None:
+        """집계 결과를 JSON 으로 기록 (타임스탬프 간격으로 추정한 가장 느린 실행은 'gap_slowest')"""
+        json.dump({
+            'total': self.total,
+            'gap_matched': self.gap_matched,
+            'unmatched': self.unmatched,
+            'statements': [stats.to_dict() for stats in self.top(k)],
+            'slowest': self.slowest_executions(),
+            'gap_slowest': self.slowest_executions(SOURCE_GAP)
+        }, fp, ensure_ascii=False, indent=2)
+
+    def export_csv(self, fp: TextIO, k: Optional[int] = None) -> None:
+        """
+        지문별 집계 결과를 CSV 로 기록 (가장 느린 실행은 'ms@start-end;...' 형식)
+        gap_ 으로 시작하는 열은 타임스탬프 간격으로 추정한 실행 시간
+        """
+        writer = csv.writer(fp)
+        writer.writerow(['fingerprint', 'count', 'error', 'total_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'gap_count',
+                         'gap_p50_ms', 'gap_p95_ms', 'gap_max_ms', 'slowest', 'statement'])
+        for stats in self.top(k):
+            row = stats.to_dict()
+            writer.writerow([
+                row['fingerprint'],
+                row['count'],
+                row['error'],
+                f"{row['total_ms']:.3f}",
+                f"{row['p50_ms']:.3f}",
+                f"{row['p95_ms']:.3f}",
+                f"{row['p99_ms']:.3f}",
+                f"{row['max_ms']:.3f}",
+                row['gap_count'],
+                f"{row['gap']['p50_ms']:.3f}",
+                f"{row['gap']['p95_ms']:.3f}",
+                f"{row['gap']['max_ms']:.3f}",
+                ';'.join(f"{slow['ms']:.3f}@{slow['start_line']}-{slow['end_line']}" for slow in row['slowest']),
+                row['statement']
+            ])
+
+    def export(self, path: str, k: Optional[int] = None) -> None:
+        """파일 확장자(.csv / 그 외 JSON)에 따라 집계 결과를 파일로 저장"""
+        with open(path, 'w', encoding='utf-8', newline='') as fp:
+            if path.lower().endswith('.csv'):
+                self.export_csv(fp, k)
+            else:
+                self.export_json(fp, k)
+
+    def print_summary(self, k: int = 5, file=None) -> None:
+        print(f"{'count':>8}{'total(ms)':>12}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}  statement",
+              file=file)
+        for stats in self.top(k):
+            row = stats.to_dict()
+            print(f"{row['count']:>8}{row['total_ms']:>12.1f}{row['p50_ms']:>10.3f}{row['p95_ms']:>10.3f}"
+                  f"{row['p99_ms']:>10.3f}{row['max_ms']:>10.3f}  {row['statement'][:80]}", file=file)
+        for source in (SOURCE_MARKER, SOURCE_GAP):
+            for slow in self.slowest_executions(source)[:k]:
+                print(f"    {slow['ms']:.3f}ms ({source})  line {slow['start_line']}-{slow['end_line']}  "
+                      f"{slow['statement'][:60]}", file=file)
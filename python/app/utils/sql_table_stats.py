@@ -0,0 +1,526 @@
+import csv
+import json
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, TextIO, Tuple
+
+from app.utils.metrics import instrument
+
+# SQL 토큰: 앞의 공백은 토큰에 포함하고, 문자열 리터럴 / 숫자 / 주석은 건너뛰며
+# 식별자(따옴표 / 점 포함), 비교 연산자, 괄호, 쉼표만 구분
+sql_token_pattern = re.compile(
+    r"\s*(?:(?P<skip>'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/|\d+(?:\.\d+)?|$)"
+    r"|(?P<name>(?:[A-Za-z_][\w$#]*|`[^`]+`|\"[^\"]+\"|\[[^\]]+\])"
+    r"(?:\s*\.\s*(?:[A-Za-z_][\w$#]*|`[^`]+`|\"[^\"]+\"|\[[^\]]+\]|\*))*)"
+    r"|(?P<operator><=|>=|<>|!=|=|<|>)"
+    r"|(?P<open>\()|(?P<close>\))|(?P<comma>,)"
+    r"|(?P<other>.))",
+    re.DOTALL
+)
+
+# 식별자에서 지우는 문자 (따옴표와 점 주변 공백)
+_IDENTIFIER_STRIP = str.maketrans('', '', ' \t\r\n`"[]')
+
+# 한 번에 건너뛰는 구간 (테이블 / 필터 컬럼이 있을 수 없는 부분은 토큰으로 나누지 않음)
+# SELECT 목록: 괄호 / 따옴표 없이 FROM 까지 이어지는 부분
+sql_select_list_pattern = re.compile(r"""[^()'"`]*?(?=\bfrom\b)""", re.IGNORECASE)
+# 문장 맨 앞의 SELECT 토큰 (뒤에 SELECT 목록이 이어짐)
+sql_leading_select_pattern = re.compile(r'\s*select(?![\w$#]|\s*\.)', re.IGNORECASE)
+# UPDATE 의 SET 목록: 괄호 없이 WHERE / FROM 또는 문장 끝까지 이어지는 부분 (작은따옴표 문자열 포함)
+sql_set_list_pattern = re.compile(r"""(?:[^()'"`]|'[^']*')*?(?=\b(?:where|from)\b|\Z)""", re.IGNORECASE)
+# 하위 쿼리가 없는 괄호 묶음: 컬럼 목록, VALUES 목록, 함수 인자 (WHERE 절 밖에서만 건너뜀)
+sql_flat_group_pattern = re.compile(r"""\((?![^()]*\bselect\b)[^()'"`]*\)""", re.IGNORECASE)
+# JOIN ... USING 뒤의 컬럼 목록 (DELETE / MERGE 의 USING 뒤 테이블과 구분)
+sql_using_columns_pattern = re.compile(r'\s*' + sql_flat_group_pattern.pattern, re.IGNORECASE)
+
+# 테이블 별칭이 될 수 없는 예약어
+_RESERVED = frozenset({
+    'SELECT', 'FROM', 'WHERE', 'JOIN', 'INNER', 'LEFT', 'RIGHT', 'FULL', 'OUTER', 'CROSS', 'NATURAL', 'ON', 'USING',
+    'GROUP', 'ORDER', 'BY', 'HAVING', 'LIMIT', 'OFFSET', 'FETCH', 'UNION', 'INTERSECT', 'EXCEPT', 'MINUS', 'SET',
+    'VALUES', 'VALUE', 'INTO', 'AS', 'AND', 'OR', 'NOT', 'IN', 'IS', 'NULL', 'LIKE', 'BETWEEN', 'EXISTS', 'FOR',
+    'WITH', 'UPDATE', 'DELETE', 'INSERT', 'MERGE', 'WHEN', 'THEN', 'ELSE', 'END', 'CASE', 'RETURNING', 'WINDOW',
+    'CONNECT', 'START', 'LATERAL', 'ALL', 'DISTINCT', 'ANY', 'SOME', 'ESCAPE',
+})
+
+# 필터 조건의 연산자로 쓰이는 키워드 (컬럼 바로 뒤에 오면 필터 컬럼으로 봄)
+_FILTER_KEYWORDS = frozenset({'IN', 'LIKE', 'BETWEEN', 'IS', 'NOT'})
+
+# 뒤따르는 식별자가 테이블인 키워드
+_TABLE_KEYWORDS = frozenset({'FROM', 'JOIN', 'INTO', 'UPDATE'})
+
+# FROM 목록 / WHERE 절을 끝내는 키워드
+_CLAUSE_KEYWORDS = frozenset({'GROUP', 'ORDER', 'HAVING', 'LIMIT', 'OFFSET', 'FETCH', 'UNION', 'INTERSECT',
+                              'EXCEPT', 'MINUS', 'FOR', 'RETURNING', 'WINDOW', 'CONNECT', 'START', 'SET', 'VALUES',
+                              'ON', 'USING'})
+
+# 문장 종류 키워드 (WITH 로 시작하면 본문의 첫 키워드를 문장 종류로 사용)
+_STATEMENT_KEYWORDS = frozenset({'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'MERGE'})
+
+# USING 뒤에 테이블이 오는 문장 (DELETE ... USING b, MERGE INTO t USING s)
+_USING_TABLE_STATEMENTS = frozenset({'DELETE', 'MERGE'})
+
+# 같은 SQL 문의 분석 결과를 재사용할 개수 (자리표시자(?)를 쓰는 SQL 은 같은 문장이 반복됨)
+# SELECT 로 시작하는 문장은 분석에 쓰지 않는 SELECT 목록을 뺀 나머지로 재사용하므로 목록만 다른 문장도 같은 항목을 씀
+PARSE_CACHE_SIZE = 4096
+
+# 컬럼의 테이블을 알 수 없을 때 사용하는 이름
+UNKNOWN_TABLE = '?'
+
+
+class SQLAccess(NamedTuple):
+    """SQL 문 하나가 접근하는 테이블과 필터 컬럼"""
+    statement_type: str
+    read_tables: Tuple[str, ...]
+    write_tables: Tuple[str, ...]
+    # (테이블, 컬럼) 목록
+    filter_columns: Tuple[Tuple[str, str], ...]
+
+
+def _identifier(name: str) -> str:
+    """따옴표를 벗기고 공백을 없앤 소문자 식별자 (schema.table 형식 유지)"""
+    return name.translate(_IDENTIFIER_STRIP).lower()
+
+
+@instrument()
+def parse_sql(query: str) -> SQLAccess:
+    """
+    SQL 문의 문장 종류, 읽기 / 쓰기 테이블, WHERE 절의 필터 컬럼을 찾습니다. (_parse_sql 참고)
+    첫 토큰이 SELECT 이고 목록이 FROM 까지 괄호 / 따옴표 없이 이어지면 분석 결과와 무관한 목록을 빼고
+    캐시를 찾으므로, 조회 컬럼만 다른 문장은 다시 분석하지 않습니다.
+
+    Args:
+        query (str): SQL 문
+
+    Returns:
+        SQLAccess: 문장 종류와 테이블 / 컬럼 (식별자는 소문자, 테이블을 알 수 없는 컬럼은 제외)
+    """
+    select = sql_leading_select_pattern.match(query)
+    if select is not None:
+        select_list = sql_select_list_pattern.match(query, select.end())
+        if select_list is not None and select_list.end() > select.end():
+            query = query[:select.end()] + ' ' + query[select_list.end():]
+    return _parse_sql(query)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_sql(query: str) -> SQLAccess:
+    """
+    SQL 문을 한 번 훑어 문장 종류, 읽기 / 쓰기 테이블, WHERE 절의 필터 컬럼을 찾습니다.
+    완전한 SQL 파서가 아니며 FROM / JOIN / INTO / UPDATE 뒤의 테이블과
+    WHERE 절에서 비교 연산자(=, <, IN, LIKE, BETWEEN, IS 등) 앞에 오는 컬럼만 찾습니다.
+    UPDATE 는 문장을 시작할 때만 테이블 키워드로 보고 (MERGE 의 THEN UPDATE SET, FOR UPDATE 제외),
+    DELETE / MERGE 의 USING 뒤 테이블은 읽기 테이블입니다.
+
+    Args:
+        query (str): SQL 문
+
+    Returns:
+        SQLAccess: 문장 종류와 테이블 / 컬럼 (식별자는 소문자, 테이블을 알 수 없는 컬럼은 제외)
+    """
+    statement_type = ''
+    read_tables = []
+    write_tables = []
+    aliases = {}
+    # (컬럼, 컬럼이 나온 쿼리 범위의 테이블 목록)
+    columns = []
+    # 쿼리 범위의 테이블 목록 (SELECT 마다 새 범위, 하위 쿼리 범위는 여는 괄호의 깊이와 함께 위에 쌓음)
+    # 조건을 묶는 괄호는 범위를 만들지 않으므로 괄호 안의 컬럼도 가장 가까운 쿼리 범위에서 찾음
+    scope_depths = [0]
+    scope = []
+    scopes = [scope]
+    # WITH 절에서 정의한 이름 (테이블이 아님)
+    cte_names = set()
+    cte_expected = False
+
+    depth = 0
+    # 다음 식별자를 테이블로 읽을 때의 키워드 ('FROM', 'JOIN', 'INTO', 'UPDATE')
+    table_keyword = None
+    # 쉼표로 이어지는 FROM 목록의 깊이
+    from_depth = None
+    # 방금 읽은 테이블 (바로 뒤의 식별자는 별칭). 하위 쿼리 뒤의 별칭은 UNKNOWN_TABLE 로 연결
+    last_table = None
+    # FROM / JOIN 뒤에 연 하위 쿼리 괄호의 깊이
+    derived_depths = []
+    # 진행 중인 WHERE 절의 깊이 (하위 쿼리의 WHERE 가 위에 쌓임)
+    where_depths = []
+    # WHERE 절에서 비교 연산자를 기다리는 컬럼
+    pending_column = None
+
+    match_token = sql_token_pattern.match
+    position = 0
+    length = len(query)
+    while position < length:
+        match = match_token(query, position)
+        position = match.end()
+        kind = match.lastgroup
+        if kind == 'skip':
+            continue
+
+        if kind == 'open' and table_keyword is None and not where_depths:
+            group = sql_flat_group_pattern.match(query, match.start(kind))
+            if group is not None:
+                pending_column = None
+                last_table = None
+                position = group.end()
+                continue
+
+        if kind != 'name':
+            if kind == 'operator' and pending_column is not None:
+                columns.append((pending_column, scope))
+            pending_column = None
+            last_table = None
+            if kind == 'open':
+                if table_keyword in ('FROM', 'JOIN'):
+                    # FROM ( 하위 쿼리 ) 는 하위 쿼리 안의 FROM 이 테이블을 읽음
+                    derived_depths.append(depth)
+                depth += 1
+                table_keyword = None
+            elif kind == 'close':
+                depth -= 1
+                if scope_depths[-1] > depth:
+                    scope_depths.pop()
+                    scopes.pop()
+                    scope = scopes[-1]
+                while where_depths and where_depths[-1] > depth:
+                    where_depths.pop()
+                if from_depth is not None and from_depth > depth:
+                    from_depth = None
+                if derived_depths and derived_depths[-1] == depth:
+                    # 하위 쿼리의 별칭이 뒤따르고, 쉼표로 FROM 목록이 이어질 수 있음
+                    derived_depths.pop()
+                    last_table = UNKNOWN_TABLE
+                    from_depth = depth
+                    scope.append(UNKNOWN_TABLE)
+            elif kind == 'comma':
+                if from_depth == depth:
+                    table_keyword = 'FROM'
+                elif statement_type == 'WITH' and depth == 0:
+                    cte_expected = True
+            continue
+
+        text = match.group(kind)
+        word = text.upper()
+        if word in _RESERVED:
+            starts_statement = not statement_type or (
+                statement_type == 'WITH' and depth == 0 and word in _STATEMENT_KEYWORDS)
+            if starts_statement:
+                statement_type = word
+                cte_expected = word == 'WITH'
+            if word == 'SELECT':
+                # 하위 쿼리는 새 범위를 쌓고, 같은 깊이의 SELECT (UNION 등) 는 범위를 바꿈
+                scope = []
+                if scope_depths[-1] < depth:
+                    scope_depths.append(depth)
+                    scopes.append(scope)
+                else:
+                    scopes[-1] = scope
+                select_list = sql_select_list_pattern.match(query, position)
+                if select_list is not None:
+                    position = select_list.end()
+            elif word == 'SET' and not where_depths:
+                # SET 목록의 컬럼 / 값은 테이블이나 필터 컬럼이 아님
+                set_list = sql_set_list_pattern.match(query, position)
+                if set_list is not None:
+                    position = set_list.end()
+            if pending_column is not None and word in _FILTER_KEYWORDS:
+                columns.append((pending_column, scope))
+            pending_column = None
+            if word != 'AS':
+                last_table = None
+
+            if word in _TABLE_KEYWORDS and (word != 'UPDATE' or starts_statement):
+                table_keyword = word
+                from_depth = depth if word == 'FROM' else None
+            elif word == 'UPDATE':
+                table_keyword = None
+            elif word == 'USING' and statement_type in _USING_TABLE_STATEMENTS:
+                using_columns = sql_using_columns_pattern.match(query, position)
+                if using_columns is not None:
+                    # JOIN ... USING (컬럼 목록)
+                    position = using_columns.end()
+                    from_depth = None
+                else:
+                    # FROM 목록처럼 읽음 (쉼표로 이어지는 테이블, 하위 쿼리)
+                    table_keyword = 'FROM'
+                    from_depth = depth
+                if where_depths and where_depths[-1] == depth:
+                    where_depths.pop()
+            elif word == 'WHERE':
+                where_depths.append(depth)
+                from_depth = None
+            elif word in _CLAUSE_KEYWORDS:
+                from_depth = None
+                if where_depths and where_depths[-1] == depth:
+                    where_depths.pop()
+            continue
+
+        if cte_expected:
+            cte_names.add(_identifier(text))
+            cte_expected = False
+        elif table_keyword is not None:
+            table = _identifier(text)
+            if table in cte_names:
+                aliases[table] = last_table = UNKNOWN_TABLE
+            else:
+                write = table_keyword in ('INTO', 'UPDATE') or (
+                    table_keyword == 'FROM' and statement_type == 'DELETE' and depth == 0 and not write_tables)
+                (write_tables if write else read_tables).append(table)
+                aliases[table.rsplit('.', 1)[-1]] = last_table = table
+            scope.append(last_table)
+            table_keyword = None
+        elif last_table is not None:
+            aliases[_identifier(text)] = last_table
+            last_table = None
+        elif where_depths:
+            pending_column = _identifier(text)
+
+    filter_columns = []
+    for column, scope_tables in columns:
+        qualifier, _, name = column.rpartition('.')
+        if qualifier:
+            table = aliases.get(qualifier, qualifier)
+        else:
+            # 한정자가 없으면 같은 쿼리 범위의 테이블이 하나일 때만 그 테이블의 컬럼으로 봄
+            table = scope_tables[0] if len(set(scope_tables)) == 1 else UNKNOWN_TABLE
+        if table != UNKNOWN_TABLE:
+            filter_columns.append((table, name))
+
+    return SQLAccess(statement_type, tuple(dict.fromkeys(read_tables)), tuple(dict.fromkeys(write_tables)),
+                     tuple(dict.fromkeys(filter_columns)))
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _columns_by_table(filter_columns: Tuple[Tuple[str, str], ...]
+                      ) -> Tuple[Tuple[str, Tuple[str, ...], Tuple[str, ...]], ...]:
+    """필터 컬럼을 테이블별로 묶은 (테이블, 컬럼 목록, 정렬한 컬럼 묶음) 목록 (같은 SQL 문이면 재사용)"""
+    by_table = defaultdict(list)
+    for table, column in filter_columns:
+        by_table[table].append(column)
+    return tuple((table, tuple(columns), tuple(sorted(columns))) for table, columns in by_table.items())
+
+
+class TableStats:
+    """테이블 하나의 읽기 / 쓰기 횟수, 필터 컬럼 빈도, 분당 접근 횟수"""
+    __slots__ = ('table', 'reads', 'writes', 'filtered', 'columns', 'column_sets', 'per_minute')
+
+    def __init__(self, table: str):
+        self.table = table
+        self.reads = 0
+        self.writes = 0
+        # 이 테이블의 컬럼으로 필터링한 문장 수
+        self.filtered = 0
+        self.columns = Counter()
+        # 한 문장에서 함께 필터링한 컬럼 묶음 (복합 인덱스 후보)
+        self.column_sets = Counter()
+        self.per_minute = Counter()
+
+    @property
+    def total(self) -> int:
+        return self.reads + self.writes
+
+    def to_dict(self, top_columns: int = 10) -> dict:
+        minutes = len(self.per_minute)
+        return {
+            'table': self.table,
+            'reads': self.reads,
+            'writes': self.writes,
+            'filtered': self.filtered,
+            'peak_per_minute': max(self.per_minute.values(), default=0),
+            'mean_per_minute': self.total / minutes if minutes else 0.0,
+            'columns': dict(self.columns.most_common(top_columns)),
+        }
+
+
+class TableAccessStats:
+    """
+    추출된 SQL 문을 받아 테이블별 읽기 / 쓰기 횟수, 필터 컬럼 빈도, 분당 접근 횟수를 집계하고
+    자주 필터링되는 컬럼으로 인덱스 후보를 제안합니다.
+
+    사용 예:
+        stats = TableAccessStats()
+        for result in iter_analyzed_messages('nohup.out'):
+            if result['sql_queries']:
+                stats.add_many(result['sql_queries'], get_message_timestamp(result['content']))
+        stats.export('tables.json')
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.statement_types = Counter()
+        self._tables: Dict[str, TableStats] = {}
+
+    def __len__(self):
+        return len(self._tables)
+
+    def _table(self, table: str) -> TableStats:
+        stats = self._tables.get(table)
+        if stats is None:
+            stats = self._tables[table] = TableStats(table)
+        return stats
+
+    def add(self, query: str, timestamp: Optional[str] = None) -> SQLAccess:
+        """
+        SQL 문 하나를 집계합니다.
+
+        Args:
+            query (str): SQL 문
+            timestamp (str): 로그 메시지의 타임스탬프 ('YYYY-MM-DD HH:MM' 까지를 분 단위로 사용)
+
+        Returns:
+            SQLAccess: 분석 결과
+        """
+        access = parse_sql(query)
+        self.total += 1
+        self.statement_types[access.statement_type] += 1
+        minute = timestamp[:16] if timestamp else None
+
+        for table in access.read_tables:
+            stats = self._table(table)
+            stats.reads += 1
+            if minute is not None:
+                stats.per_minute[minute] += 1
+        for table in access.write_tables:
+            stats = self._table(table)
+            stats.writes += 1
+            if minute is not None:
+                stats.per_minute[minute] += 1
+
+        if access.filter_columns:
+            for table, table_columns, column_set in _columns_by_table(access.filter_columns):
+                stats = self._table(table)
+                stats.filtered += 1
+                columns = stats.columns
+                for column in table_columns:
+                    columns[column] += 1
+                stats.column_sets[column_set] += 1
+        return access
+
+    def add_many(self, queries: Iterable[str], timestamp: Optional[str] = None) -> None:
+        for query in queries:
+            self.add(query, timestamp)
+
+    def top(self, k: Optional[int] = None) -> List[TableStats]:
+        """접근 횟수가 많은 순서로 테이블 집계 정보를 반환 (알 수 없는 테이블 제외)"""
+        tables = [stats for stats in self._tables.values() if stats.table != UNKNOWN_TABLE]
+        ordered = sorted(tables, key=lambda stats: (stats.total, stats.filtered), reverse=True)
+        return ordered if k is None else ordered[:k]
+
+    def suggest_indexes(self, k: int = 10, min_share: float = 0.1) -> List[dict]:
+        """
+        필터링이 많은 테이블부터 가장 자주 함께 필터링된 컬럼 묶음을 인덱스 후보로 제안합니다.
+        컬럼 순서는 단독 필터 빈도가 높은 순서입니다.
+
+        Args:
+            k (int): 최대 후보 수
+            min_share (float): 테이블 필터 문장 중 이 비율 이상에서 쓰인 컬럼 묶음만 제안
+
+        Returns:
+            list: table, columns, statements, share, ddl 을 가진 후보 목록
+        """
+        suggestions = []
+        for stats in sorted(self._tables.values(), key=lambda stats: stats.filtered, reverse=True):
+            if stats.table == UNKNOWN_TABLE or not stats.filtered:
+                continue
+            column_set, statements = stats.column_sets.most_common(1)[0]
+            share = statements / stats.filtered
+            if share < min_share:
+                continue
+            columns = sorted(column_set, key=lambda column: -stats.columns[column])
+            name = re.sub(r'\W', '_', f"ix_{stats.table.rsplit('.', 1)[-1]}_{'_'.join(columns)}")
+            suggestions.append({
+                'table': stats.table,
+                'columns': columns,
+                'statements': statements,
+                'share': share,
+                'ddl': f"CREATE INDEX {name} ON {stats.table} ({', '.join(columns)})"
+            })
+            if len(suggestions) >= k:
+                break
+        return suggestions
+
+    def export_json(self, fp: TextIO, k: Optional[int] = None) -> None:
+        """집계 결과를 JSON 으로 기록"""
+        json.dump({
+            'total': self.total,
+            'statement_types': dict(self.statement_types.most_common()),
+            'tables': [stats.to_dict() for stats in self.top(k)],
+            'index_suggestions': self.suggest_indexes()
+        }, fp, ensure_ascii=False, indent=2)
+
+    def export_csv(self, fp: TextIO, k: Optional[int] = None) -> None:
+        """테이블별 집계 결과를 CSV 로 기록 (컬럼은 'column:count;column:count' 형식)"""
+        writer = csv.writer(fp)
+        writer.writerow(['table', 'reads', 'writes', 'filtered', 'peak_per_minute', 'mean_per_minute', 'columns'])
+        for stats in self.top(k):
+            row = stats.to_dict()
+            writer.writerow([
+                row['table'],
+                row['reads'],
+                row['writes'],
+                row['filtered'],
+                row['peak_per_minute'],
+                f"{row['mean_per_minute']:.2f}",
+                ';'.join(f'{column}:{count}' for column, count in row['columns'].items())
+            ])
+
+    def export(self, path: str, k: Optional[int] = None) -> None:
+        """파일 확장자(.csv / 그 외 JSON)에 따라 집계 결과를 파일로 저장"""
+        with open(path, 'w', encoding='utf-8', newline='') as fp:
+            if path.lower().endswith('.csv'):
+                self.export_csv(fp, k)
+            else:
+                self.export_json(fp, k)
+
+
+# parse_sql 자체 점검용 예제 (괄호 / 하위 쿼리 범위, UNION, MERGE, USING, FOR UPDATE 등)
+_SELF_CHECK_CASES = [
+    ("select * from t where (a = 1 or b = 2)",
+     SQLAccess('SELECT', ('t',), (), (('t', 'a'), ('t', 'b')))),
+    ("select * from t where a = 1 and (b = 2 or c = 3)",
+     SQLAccess('SELECT', ('t',), (), (('t', 'a'), ('t', 'b'), ('t', 'c')))),
+    ("select a from t where id in (select uid from u where u.x = 1) and t.y = 2",
+     SQLAccess('SELECT', ('t', 'u'), (), (('t', 'id'), ('u', 'x'), ('t', 'y')))),
+    ("select a from t where x = 1 union select b from u where y = 2",
+     SQLAccess('SELECT', ('t', 'u'), (), (('t', 'x'), ('u', 'y')))),
+    ("insert into t (a, b) select a, b from s where s.k = 1",
+     SQLAccess('INSERT', ('s',), ('t',), (('s', 'k'),))),
+    # 파생 테이블의 컬럼과, 파생 테이블과 함께 쓰인 테이블 없는 컬럼은 제외
+    ("select * from t, (select id from u) d where d.id = 1 and z = 2",
+     SQLAccess('SELECT', ('t', 'u'), (), ())),
+    ("select * from t join (select id from u) d on d.id = t.id where z = 2",
+     SQLAccess('SELECT', ('t', 'u'), (), ())),
+    ("merge into t using s on (t.id = s.id) when matched then update set t.v = s.v"
+     " when not matched then insert (id, v) values (s.id, s.v)",
+     SQLAccess('MERGE', ('s',), ('t',), ())),
+    ("select * from t where id = 1 for update nowait",
+     SQLAccess('SELECT', ('t',), (), (('t', 'id'),))),
+    ("insert into t (a) values (1) on duplicate key update a = 2",
+     SQLAccess('INSERT', (), ('t',), ())),
+    ("delete from a using b, c where a.id = b.id",
+     SQLAccess('DELETE', ('b', 'c'), ('a',), (('a', 'id'),))),
+    ("select * from a join b using (id) where a.x = 1",
+     SQLAccess('SELECT', ('a', 'b'), (), (('a', 'x'),))),
+    ("update t set a = 1, b = 'x' where id = 3",
+     SQLAccess('UPDATE', (), ('t',), (('t', 'id'),))),
+    ("with c as (select id from u where u.k = 1) select * from t join c on c.id = t.id where t.z = 2",
+     SQLAccess('SELECT', ('u', 't'), (), (('u', 'k'), ('t', 'z')))),
+    ("SELECT a, b FROM T WHERE T.ID = ?",
+     SQLAccess('SELECT', ('t',), (), (('t', 'id'),))),
+]
+
+
+if __name__ == "__main__":
+    import sys
+
+    failures = 0
+    for query, expected in _SELF_CHECK_CASES:
+        # 조회 목록을 빼고 캐시를 찾는 parse_sql 과 원래 문장을 그대로 분석한 결과가 모두 같아야 함
+        for name, actual in (('parse_sql', parse_sql(query)), ('_parse_sql', _parse_sql.__wrapped__(query))):
+            if actual != expected:
+                failures += 1
+                print(f"FAIL {name}: {query}\n  expected: {expected}\n  actual:   {actual}")
+
+    if failures:
+        sys.exit(1)
+    print(f"OK: {len(_SELF_CHECK_CASES)} cases")
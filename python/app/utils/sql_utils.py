@@ -1,6 +1,9 @@
 import re
 
+from app.utils.metrics import instrument
+
 # 다양한 패턴을 고려한 통합 추출 함수
+@instrument()
 def extract_all_sql_queries(log_text):
     patterns = [
         # 기존 패턴
@@ -33,6 +36,7 @@ def extract_all_sql_queries(log_text):
     return list(set(cleaned_queries))
 
 
+@instrument()
 def extract_all_sql_queries_v2(log_text):
     patterns = [
         # 기존 패턴
@@ -71,3 +75,98 @@ def extract_all_sql_queries_v2(log_text):
 
     # 중복 제거하고 반환
     return list(set(cleaned_queries))
+
+
+# SQL 시작 표시: 실행 로그 접두어, Hibernate 로거, DML 키워드를 하나의 정규식으로 탐색
+sql_marker_pattern = re.compile(
+    # 표시의 첫 글자가 아닌 위치는 바로 건너뛰도록 후보 위치를 좁힘
+    r'(?=[ESoDdIiSsUuſİı])(?:'
+    r'(?P<prefix>Executing SQL:|SQL Query:)\s*'
+    r'|(?P<hibernate>org\.hibernate\.SQL\s*:)\s*'
+    r'|\b(?P<dml>(?i:SELECT|INSERT|UPDATE|DELETE))\b'
+    r')'
+)
+
+# 문장 본문: 따옴표 안의 ';' 는 건너뛰고 ';' / 다음 로그 줄(\n + 숫자 4개) / 문자열 끝 직전까지
+sql_body_pattern = re.compile(
+    r"""(?:[^;'"\n]+"""
+    r"""|'[^'\n]*(?:\n(?!\d{4})[^'\n]*)*'"""
+    r"""|"[^"\n]*(?:\n(?!\d{4})[^"\n]*)*\""""
+    r"""|\n(?!\d{4})"""
+    r"""|['"])*"""
+)
+
+
+@instrument()
+def extract_all_sql_queries_v3(log_text):
+    """
+    로그 텍스트에서 SQL 문을 한 번의 탐색으로 추출합니다.
+
+    extract_all_sql_queries_v2 와 같은 시작 표시(Executing SQL:, SQL Query:, org.hibernate.SQL, DML 키워드)를
+    하나의 정규식으로 찾고, 따옴표를 고려해서 문장 끝까지 읽습니다. (구간은 iter_sql_spans 와 같음)
+    공백 정리는 한 번만 하고, 중복은 처음 나온 순서를 유지하면서 제거합니다.
+
+    v2 는 패턴 4개를 각각 findall 하므로 결과가 다음과 같이 다릅니다.
+        - DML 키워드는 단어 전체가 일치해야 하므로, JSON / XML 내용 안의 'updated_at' 같은 이름에서
+          시작하는 문장은 추출하지 않습니다. (v2 는 이런 메시지에서 'updated_at ...' 를 SQL 로 반환함)
+          대신 v2 가 그런 단어('updated_at', 'preselected')에서 시작해 읽은 범위 안의 문장은 따로 반환합니다.
+          ('updated_at select b' 는 v3 'select b', v2 'updated_at select b')
+        - 따옴표 안의 ';' 에서는 끝나지 않습니다. ('update "q;"' 는 v3 'update "q;"', v2 'update "q;')
+        - org.hibernate.SQL 문장도 ';' 에서 끝납니다.
+          ('org.hibernate.SQL : a ; a' 는 v3 'a ;', v2 는 다음 로그 줄까지 읽은 'a ; a')
+        - 다음 로그 줄(줄바꿈 + 숫자 4개) 직전에서 끝나고 그 숫자를 포함하지 않습니다.
+          ('select a\\n1234 rows' 는 v3 'select a', v2 'select a 1234')
+        - 한 위치에서 읽은 문장 안의 다른 시작 표시에서 다시 시작하지 않으므로, v2 가 다른 패턴으로 함께 반환하던
+          겹치는 부분 문장은 반환하지 않습니다.
+          ('SQL Query: x select a;' 는 v3 'x select a;' 만, v2 는 'select a;' 도 반환)
+
+    Args:
+        log_text (str): 로그 텍스트
+
+    Returns:
+        list: 추출된 SQL 문 목록 (처음 나온 순서)
+    """
+    queries = {}
+    for start, end in iter_sql_spans(log_text):
+        # 여러 줄의 공백과 연속된 공백을 단일 공백으로 변환
+        query = ' '.join(log_text[start:end].split())
+
+        # 단일 키워드만 있는 경우 제외
+        if ' ' in query:
+            queries.setdefault(query, None)
+
+    return list(queries)
+
+
+def iter_sql_spans(log_text):
+    """
+    extract_all_sql_queries_v3 가 SQL 문으로 읽는 구간을 순서대로 반환합니다. (공백 정리 전의 원래 위치)
+    다른 분석에서 SQL 문 안의 텍스트를 제외할 때도 사용합니다.
+
+    Args:
+        log_text (str): 로그 텍스트
+
+    Yields:
+        tuple: (시작 위치, 끝 위치) - 끝 위치는 ';' 를 포함한 다음 위치
+    """
+    position = 0
+    text_length = len(log_text)
+
+    while True:
+        marker = sql_marker_pattern.search(log_text, position)
+        if not marker:
+            break
+
+        body_start = marker.start('dml') if marker.group('dml') else marker.end()
+        end = sql_body_pattern.match(log_text, body_start).end()
+
+        if end < text_length and log_text[end] == ';':
+            end += 1
+        elif marker.group('prefix'):
+            # 'Executing SQL:' / 'SQL Query:' 는 ';' 로 끝나는 경우만 사용 (v2 와 동일)
+            position = marker.end()
+            continue
+
+        yield body_start, end
+
+        position = max(end, marker.end())
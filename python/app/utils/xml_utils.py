@@ -1,160 +1,400 @@
+import io
 import re
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import sys
+import threading
+from types import MappingProxyType
+from typing import List, Dict, Any, Iterable, Iterator, Optional, TextIO
+from dataclasses import dataclass, field
+
+from app.utils.metrics import instrument
+
+# 속성 / 자식이 없는 요소가 공유하는 빈 값 (요소마다 빈 dict / list 를 만들지 않음)
+_NO_ATTRIBUTES = MappingProxyType({})
+_NO_CHILDREN = ()
 
 
-@dataclass
 class XMLElement:
+    """
+    로그 텍스트에서 찾은 XML 요소.
+
+    요소마다 문자열을 복사해 두지 않고 원문(source) 하나를 공유하며 위치만 저장합니다.
+    raw_text, content, declaration_text 는 접근할 때 원문을 잘라서 만듭니다.
+    """
+    __slots__ = ('tag', 'attributes', 'children', 'start_pos', 'end_pos',
+                 'source', 'content_start', 'content_end', 'declaration_end')
+
+    def __init__(self, tag: str, attributes: Dict[str, str], children: List['XMLElement'], source: str,
+                 start_pos: int, end_pos: int, content_start: int, content_end: int,
+                 declaration_end: Optional[int] = None):
+        self.tag = tag
+        self.attributes = attributes
+        self.children = children
+        self.source = source
+        self.start_pos = start_pos
+        self.end_pos = end_pos
+        # 시작 태그 끝 ~ 닫는 태그 시작 (자체 닫힘 태그는 같은 위치)
+        self.content_start = content_start
+        self.content_end = content_end
+        # XML 선언이 붙은 경우 선언이 끝나는 위치 (선언은 start_pos 에서 시작)
+        self.declaration_end = declaration_end
+
+    @property
+    def raw_text(self) -> str:
+        return self.source[self.start_pos:self.end_pos]
+
+    @property
+    def content(self) -> Optional[str]:
+        """자식 요소를 제외한 순수 콘텐츠 (앞뒤 공백 제거, 없으면 None)"""
+        if self.content_start == self.content_end:
+            return None
+
+        source = self.source
+        if not self.children:
+            content = source[self.content_start:self.content_end].strip()
+        else:
+            parts = []
+            position = self.content_start
+            for child in self.children:
+                parts.append(source[position:child.start_pos])
+                position = child.end_pos
+            parts.append(source[position:self.content_end])
+            content = ''.join(parts).strip()
+
+        return content if content else None
+
+    @property
+    def has_declaration(self) -> bool:
+        return self.declaration_end is not None
+
+    @property
+    def declaration_text(self) -> str:
+        if self.declaration_end is None:
+            return ""
+        return self.source[self.start_pos:self.declaration_end]
+
+    def __repr__(self):
+        return (f"XMLElement(tag={self.tag!r}, attributes={self.attributes!r}, "
+                f"children={len(self.children)}, start_pos={self.start_pos}, end_pos={self.end_pos})")
+
+
+@dataclass
+class _OpenElement:
+    """find_xml_blocks 에서 아직 닫는 태그를 만나지 않은 요소"""
     tag: str
     attributes: Dict[str, str]
-    content: Optional[str]
-    children: List['XMLElement']
-    raw_text: str
     start_pos: int
-    end_pos: int
-    has_declaration: bool = False
-    declaration_text: str = ""
+    content_start: int
+    declaration_end: Optional[int] = None
+    children: List[XMLElement] = field(default_factory=list)
 
 
 class XMLLogExtractor:
-    def __init__(self):
+    def __init__(self, target_tag: Optional[str] = None, indent_char: str = "    "):
+        # extract / extract_single_line 에서 사용하는 옵션
+        self.target_tag = target_tag
+        self.indent_char = indent_char
+
         self.xml_declaration_pattern = re.compile(r'(<\?xml[^>]+\?>)')
-        self.tag_pattern = re.compile(
-            r'(?:(<\?xml[^>]+\?>)\s*)?\s*<([a-zA-Z][a-zA-Z0-9]*)((?:\s+[a-zA-Z][a-zA-Z0-9]*="[^"]*")*)[^>]*>(.*?)</\2>',
-            re.DOTALL
+        # 태그 이벤트 토큰: 주석 / CDATA 시작 (끝은 str.find 로 찾아 건너뜀), XML 선언, 시작 / 종료 / 자체 닫힘 태그
+        # 모든 토큰이 '<' 로 시작하므로 앞으로 묶어서 '<' 가 아닌 위치는 바로 건너뜀
+        self.token_pattern = re.compile(
+            r'<(?:(?P<skip>!--|!\[CDATA\[)'
+            r'|(?P<declaration>\?xml[^>]+\?>)'
+            r'|(?P<close>/)?(?P<tag>[a-zA-Z][\w:.-]*)'
+            r'(?P<attrs>(?:[^<>"\'/]|/(?!>)|"[^"<]*"|\'[^\'<]*\')*)(?P<self_close>/)?>)'
         )
-        self.attr_pattern = re.compile(r'([a-zA-Z][a-zA-Z0-9]*)="([^"]*)"')
+        self.whitespace_pattern = re.compile(r'\s*')
+        self.attr_pattern = re.compile(r'([a-zA-Z_][\w:.-]*)\s*=\s*"([^"]*)"')
 
     def extract_attributes(self, attr_string: str) -> Dict[str, str]:
-        return dict(self.attr_pattern.findall(attr_string))
+        if not attr_string.strip():
+            return _NO_ATTRIBUTES
+        return {sys.intern(name): value for name, value in self.attr_pattern.findall(attr_string)}
 
+    @instrument()
     def find_xml_blocks(self, log_text: str) -> List[XMLElement]:
+        """
+        로그 텍스트에서 XML 요소를 찾아 트리로 구성합니다.
+
+        태그 이벤트(시작 / 종료 / 자체 닫힘)를 한 번만 훑으면서 스택으로 트리를 만들기 때문에
+        중첩 깊이와 관계없이 선형 시간에 동작하고 재귀 한도에 걸리지 않습니다.
+        start_pos / end_pos 는 log_text 기준의 절대 위치입니다.
+        """
         results = []
-        position = 0
+        stack = []           # 아직 닫히지 않은 요소
+        open_counts = {}     # 스택에 열려 있는 태그 이름별 개수
+        declaration = None   # 바로 뒤의 요소에 붙일 XML 선언
+
+        for match in self._iter_tokens(log_text):
+            tag = match.group('tag')
+
+            if tag is None:
+                # XML 선언 (주석 / CDATA 는 _iter_tokens 에서 건너뜀)
+                declaration = match
+                continue
+
+            if match.group('close'):
+                if not open_counts.get(tag):
+                    # 짝이 없는 닫는 태그는 내용으로 취급
+                    continue
+
+                # 닫히지 않은 채 남은 요소는 버리고, 그 자식 요소는 닫히는 요소로 올림
+                # (단계마다 상위 요소로 복사하지 않고 닫히는 요소에 한 번만 옮김)
+                frame = stack.pop()
+                open_counts[frame.tag] -= 1
+                unclosed = []
+                while frame.tag != tag:
+                    unclosed.append(frame)
+                    frame = stack.pop()
+                    open_counts[frame.tag] -= 1
+                for unclosed_frame in reversed(unclosed):
+                    frame.children.extend(unclosed_frame.children)
+
+                element = self._build_element(log_text, frame, match.start(), match.end())
+                (stack[-1].children if stack else results).append(element)
+                continue
+
+            # 시작 태그 / 자체 닫힘 태그
+            declaration_match = None
+            if declaration is not None:
+                if self.whitespace_pattern.fullmatch(log_text, declaration.end(), match.start()):
+                    declaration_match = declaration
+                declaration = None
+
+            frame = _OpenElement(
+                tag=sys.intern(tag),
+                attributes=self.extract_attributes(match.group('attrs')),
+                start_pos=declaration_match.start() if declaration_match else match.start(),
+                content_start=match.end(),
+                declaration_end=declaration_match.end() if declaration_match else None
+            )
 
-        while position < len(log_text):
-            match = self.tag_pattern.search(log_text, position)
-            if not match:
-                break
+            if match.group('self_close'):
+                element = self._build_element(log_text, frame, match.end(), match.end())
+                (stack[-1].children if stack else results).append(element)
+            else:
+                stack.append(frame)
+                open_counts[tag] = open_counts.get(tag, 0) + 1
 
-            declaration_text = match.group(1) or ""
-            tag = match.group(2)
-            attrs = self.extract_attributes(match.group(3))
-            content = match.group(4).strip()
-
-            # 중첩된 XML 처리
-            children = self.find_xml_blocks(content)
-
-            # 자식 요소가 있는 경우 순수 콘텐츠 추출
-            if children:
-                for child in children:
-                    content = content.replace(child.raw_text, '').strip()
-
-            element = XMLElement(
-                tag=tag,
-                attributes=attrs,
-                content=content if content else None,
-                children=children,
-                raw_text=match.group(0),
-                start_pos=match.start(),
-                end_pos=match.end(),
-                has_declaration=bool(declaration_text),
-                declaration_text=declaration_text
-            )
-            results.append(element)
-            position = match.end()
+        # 끝까지 닫히지 않은 요소의 자식들은 최상위 요소로 취급
+        for frame in stack:
+            results.extend(frame.children)
 
         return results
 
-    def to_xml_string(self, element: XMLElement, indent_level: int = 0, indent_char: str = "    ") -> str:
-        """XML 요소를 문자열로 변환"""
-        lines = []
-        indent = indent_char * indent_level
+    def _iter_tokens(self, log_text: str) -> Iterator[re.Match]:
+        """
+        XML 선언과 시작 / 종료 / 자체 닫힘 태그 토큰을 순서대로 반환합니다. 주석 / CDATA 안은 내용으로 보고 건너뜁니다.
 
-        # XML 선언부 추가
-        if element.has_declaration and indent_level == 0:
-            lines.append(element.declaration_text)
+        주석 / CDATA 의 끝은 str.find 로 한 번만 찾고, 끝이 없으면 여는 부분만 내용으로 취급합니다.
+        끝이 없다는 것을 한 번 확인한 종류는 다시 찾지 않으므로 닫히지 않은 주석이 많아도 선형 시간입니다.
+        """
+        missing_terminators = set()  # 남은 텍스트에 없는 것으로 확인한 주석 / CDATA 끝 표시
+        position = 0
+        while position is not None:
+            matches = self.token_pattern.finditer(log_text, position)
+            position = None
+            for match in matches:
+                skip = match.group('skip')
+                if skip is None:
+                    yield match
+                    continue
+
+                terminator = '-->' if skip == '!--' else ']]>'
+                if terminator in missing_terminators:
+                    continue
+                terminator_pos = log_text.find(terminator, match.end())
+                if terminator_pos < 0:
+                    missing_terminators.add(terminator)
+                    continue
+                # 끝 표시 뒤에서 탐색을 다시 시작 (주석 안에서 시작하는 토큰을 읽지 않음)
+                position = terminator_pos + len(terminator)
+                break
 
-        # 시작 태그 생성
-        tag_start = f"{indent}<{element.tag}"
+    @staticmethod
+    def _build_element(log_text: str, frame: '_OpenElement', content_end: int, end_pos: int) -> XMLElement:
+        return XMLElement(
+            tag=frame.tag,
+            attributes=frame.attributes,
+            children=frame.children or _NO_CHILDREN,
+            source=log_text,
+            start_pos=frame.start_pos,
+            end_pos=end_pos,
+            content_start=frame.content_start,
+            content_end=content_end,
+            declaration_end=frame.declaration_end
+        )
 
-        # 속성 추가
+    @staticmethod
+    def _tag_start(element: XMLElement) -> str:
+        """시작 태그 앞부분 (속성 포함, '>' 제외)"""
         if element.attributes:
             attributes = ' '.join(f'{k}="{v}"' for k, v in element.attributes.items())
-            tag_start += f" {attributes}"
-
-        # 내용이나 자식이 없는 경우 self-closing 태그 사용
-        if not element.content and not element.children:
-            lines.append(f"{tag_start}/>")
-            return '\n'.join(lines)
-
-        lines.append(f"{tag_start}>")
-
-        # 자식 요소 추가
-        if element.children:
-            for child in element.children:
-                lines.append(self.to_xml_string(child, indent_level + 1, indent_char))
-
-        # 내용 추가
-        if element.content:
-            content_indent = indent_char * (indent_level + 1)
-            lines.append(f"{content_indent}{element.content}")
-
-        # 닫는 태그 추가
-        lines.append(f"{indent}</{element.tag}>")
-
-        return '\n'.join(lines)
+            return f"<{element.tag} {attributes}"
+        return f"<{element.tag}"
+
+    def write_xml(self, element: XMLElement, fp: TextIO, indent_level: int = 0, indent_char: str = "    ") -> None:
+        """
+        XML 요소를 들여쓰기 한 형태로 fp 에 기록합니다. (to_xml_string 과 같은 결과)
+
+        중간 문자열을 만들어 합치지 않고 줄 단위로 바로 기록하며, 재귀 대신 스택으로 트리를 순회합니다.
+
+        Args:
+            element (XMLElement): 기록할 요소
+            fp (TextIO): 기록 대상 (파일, 소켓, StringIO 등 write() 를 가진 객체)
+            indent_level (int): 시작 들여쓰기 단계
+            indent_char (str): 들여쓰기 문자열
+        """
+        write = fp.write
+        first_line = True
+
+        # 스택 항목: (요소, 들여쓰기 단계) 또는 (이미 만들어진 줄, None)
+        stack = [(element, indent_level)]
+        while stack:
+            item, level = stack.pop()
+
+            if level is None:
+                lines = (item,)
+            else:
+                indent = indent_char * level
+                content = item.content
+                lines = []
+
+                # XML 선언부 추가
+                if item.has_declaration and level == indent_level == 0:
+                    lines.append(item.declaration_text)
+
+                tag_start = indent + self._tag_start(item)
+
+                # 내용이나 자식이 없는 경우 self-closing 태그 사용
+                if not content and not item.children:
+                    lines.append(f"{tag_start}/>")
+                else:
+                    lines.append(f"{tag_start}>")
+
+                    # 닫는 태그, 내용, 자식 요소 순서로 쌓아서 자식 요소가 먼저 기록되도록 함
+                    stack.append((f"{indent}</{item.tag}>", None))
+                    if content:
+                        stack.append((f"{indent}{indent_char}{content}", None))
+                    for child in reversed(item.children):
+                        stack.append((child, level + 1))
+
+            for line in lines:
+                if first_line:
+                    first_line = False
+                else:
+                    write('\n')
+                write(line)
 
+    def to_xml_string(self, element: XMLElement, indent_level: int = 0, indent_char: str = "    ") -> str:
+        """XML 요소를 문자열로 변환"""
+        buffer = io.StringIO()
+        self.write_xml(element, buffer, indent_level, indent_char)
+        return buffer.getvalue()
+
+    def format_xml_to(self, xml_string: str, fp: TextIO, indent_char: str = "    ") -> None:
+        """XML 문자열을 파싱하고 포맷팅한 결과를 fp 에 바로 기록"""
+        for index, block in enumerate(self.find_xml_blocks(xml_string)):
+            if index:
+                fp.write('\n')
+            self.write_xml(block, fp, indent_char=indent_char)
+
+    @instrument()
     def format_xml(self, xml_string: str) -> str:
         """XML 문자열을 파싱하고 다시 포맷팅"""
-        blocks = self.find_xml_blocks(xml_string)
-        return '\n'.join(self.to_xml_string(block) for block in blocks)
+        buffer = io.StringIO()
+        self.format_xml_to(xml_string, buffer)
+        return buffer.getvalue()
 
-    def to_single_line_xml(self, element: XMLElement) -> str:
-        """XML 요소를 한 줄의 문자열로 변환"""
-        parts = []
+    def write_single_line_xml(self, element: XMLElement, fp: TextIO) -> None:
+        """XML 요소를 한 줄 형태로 fp 에 기록 (to_single_line_xml 과 같은 결과, 재귀 없이 처리)"""
+        write = fp.write
 
-        # XML 선언부 추가
-        if element.has_declaration:
-            parts.append(element.declaration_text)
+        # 스택 항목: 요소 또는 이미 만들어진 문자열
+        stack = [element]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                write(item)
+                continue
 
-        # 시작 태그 생성
-        tag_start = f"<{element.tag}"
+            content = item.content
 
-        # 속성 추가
-        if element.attributes:
-            attributes = ' '.join(f'{k}="{v}"' for k, v in element.attributes.items())
-            tag_start += f" {attributes}"
+            # XML 선언부 추가
+            if item.has_declaration:
+                write(item.declaration_text)
 
-        # 내용이나 자식이 없는 경우 self-closing 태그 사용
-        if not element.content and not element.children:
-            parts.append(f"{tag_start}/>")
-            return ''.join(parts)
+            tag_start = self._tag_start(item)
 
-        parts.append(f"{tag_start}>")
+            # 내용이나 자식이 없는 경우 self-closing 태그 사용
+            if not content and not item.children:
+                write(f"{tag_start}/>")
+                continue
 
-        # 자식 요소 추가
-        if element.children:
-            for child in element.children:
-                parts.append(self.to_single_line_xml(child))
+            write(f"{tag_start}>")
 
-        # 내용 추가
-        if element.content:
-            parts.append(element.content)
+            stack.append(f"</{item.tag}>")
+            if content:
+                stack.append(content)
+            stack.extend(reversed(item.children))
 
-        # 닫는 태그 추가
-        parts.append(f"</{element.tag}>")
+    def to_single_line_xml(self, element: XMLElement) -> str:
+        """XML 요소를 한 줄의 문자열로 변환"""
+        buffer = io.StringIO()
+        self.write_single_line_xml(element, buffer)
+        return buffer.getvalue()
+
+    def _target_blocks(self, log_text: str) -> List[XMLElement]:
+        return [block for block in self.find_xml_blocks(log_text)
+                if self.target_tag is None or block.tag == self.target_tag]
+
+    @instrument()
+    def extract(self, log_text: str) -> List[str]:
+        """target_tag 에 해당하는 XML 블록을 찾아 들여쓰기 한 문자열 목록으로 반환"""
+        return [self.to_xml_string(block, indent_char=self.indent_char) for block in self._target_blocks(log_text)]
+
+    @instrument()
+    def extract_single_line(self, log_text: str) -> List[str]:
+        """target_tag 에 해당하는 XML 블록을 찾아 한 줄 문자열 목록으로 반환"""
+        return [self.to_single_line_xml(block) for block in self._target_blocks(log_text)]
+
+    @instrument()
+    def extract_many(self, messages: Iterable[str], single_line: bool = False) -> List[List[str]]:
+        """
+        여러 메시지를 하나의 추출기로 처리합니다.
+
+        Args:
+            messages (Iterable[str]): 메시지 목록 또는 이터레이터
+            single_line (bool): True 면 한 줄 형태로 반환
+
+        Returns:
+            List[List[str]]: 메시지 순서대로 각 메시지에서 추출한 XML 문자열 목록
+        """
+        extract = self.extract_single_line if single_line else self.extract
+        return [extract(message) for message in messages]
+
+# 옵션별로 한 번만 만들어 재사용하는 추출기 (정규식 컴파일 비용 제거)
+_extractor_registry: Dict[tuple, XMLLogExtractor] = {}
+_extractor_registry_lock = threading.Lock()
+
+
+def get_xml_extractor(target_tag: Optional[str] = None, indent_char: str = "    ") -> XMLLogExtractor:
+    """
+    옵션(target_tag, indent_char)에 해당하는 공유 XMLLogExtractor 를 반환합니다.
+    추출기는 상태를 갖지 않으므로 여러 스레드에서 함께 사용해도 됩니다.
+    """
+    key = (target_tag, indent_char)
+    extractor = _extractor_registry.get(key)
+    if extractor is None:
+        with _extractor_registry_lock:
+            extractor = _extractor_registry.get(key)
+            if extractor is None:
+                extractor = XMLLogExtractor(target_tag, indent_char)
+                _extractor_registry[key] = extractor
+    return extractor
 
-        return ''.join(parts)
 
 # 특정 XML 블록만 추출하여 포맷팅하는 예시
+@instrument()
 def extract_and_format_specific_xml(log_text: str, target_tag: str = None) -> List[str]:
-    extractor = XMLLogExtractor()
-    xml_blocks = extractor.find_xml_blocks(log_text)
-
-    formatted_blocks = []
-    for block in xml_blocks:
-        if target_tag is None or block.tag == target_tag:
-            formatted_blocks.append(extractor.to_xml_string(block))
-
-    return formatted_blocks
+    return get_xml_extractor(target_tag).extract(log_text)